@@ -7,6 +7,8 @@ from sqlalchemy import select
 from app.core.database import get_db
 from app.models.schemas import AgentLog
 from app.models.pydantic_models import AgentLogResponse
+from app.services.cache import result_cache
+from app.services.alert_engine import alert_engine
 
 
 router = APIRouter(prefix="/agents", tags=["Agents"])
@@ -62,3 +64,17 @@ async def get_agents_status():
             }
         ]
     }
+
+
+@router.get("/cache/stats")
+async def get_cache_stats():
+    """Get hit/miss counters for the agent result cache."""
+    
+    return result_cache.stats()
+
+
+@router.get("/alerts/stats")
+async def get_alert_engine_stats():
+    """Get size and evaluation counters for the inventory alert engine."""
+    
+    return alert_engine.stats()
@@ -6,11 +6,15 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.core.database import get_db
-from app.models.schemas import Transaction, User
+from app.models.schemas import Transaction, User, AgentLog, AgentSeverity
 from app.models.pydantic_models import (
-    TransactionCreate, TransactionResponse, CashflowAnalysis, SpivotScore
+    TransactionCreate, TransactionResponse, CashflowAnalysis, SpivotScore,
+    BatchScoreRequest, BatchScoreResult
 )
 from app.services.agents import treasurer, underwriter
+from app.services.ledger import ledger
+from app.services.cache import result_cache, ledger_versions, cache_key
+from app.services.batch_scoring import batch_scorer
 
 
 router = APIRouter(prefix="/cashflow", tags=["Cashflow"])
@@ -43,8 +47,10 @@ async def create_transaction(
     
     transaction = Transaction(user_id=user_id, **tx.model_dump())
     db.add(transaction)
+    await ledger.record_transactions(db, user_id, [(tx.date, tx.amount, tx.type)])
     await db.commit()
     await db.refresh(transaction)
+    ledger_versions.bump(user_id)
     
     return transaction
 
@@ -56,17 +62,10 @@ async def analyze_cashflow(
 ):
     """Get Treasurer cashflow analysis."""
     
-    result = await db.execute(
-        select(Transaction).where(Transaction.user_id == user_id)
+    return await result_cache.get_or_compute(
+        cache_key(user_id, "treasurer"),
+        lambda: treasurer.analyze_cashflow_from_db(db, user_id)
     )
-    transactions = result.scalars().all()
-    
-    tx_dicts = [
-        {"date": t.date, "amount": t.amount, "type": t.type.value}
-        for t in transactions
-    ]
-    
-    return treasurer.analyze_cashflow(tx_dicts)
 
 
 @router.get("/score", response_model=SpivotScore)
@@ -76,38 +75,86 @@ async def get_spivot_score(
 ):
     """Get Underwriter credit score (Spivot Score)."""
     
-    result = await db.execute(
-        select(Transaction).where(Transaction.user_id == user_id)
+    async def compute():
+        result = await db.stream(
+            select(Transaction.date, Transaction.amount, Transaction.type)
+            .where(Transaction.user_id == user_id)
+            .execution_options(yield_per=1000)
+        )
+        return await underwriter.acalculate_from_transactions(result)
+    
+    return await result_cache.get_or_compute(cache_key(user_id, "underwriter"), compute)
+
+
+@router.post("/score/batch", response_model=BatchScoreResult)
+async def batch_spivot_scores(
+    request: BatchScoreRequest,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Score many users at once and store results in `spivot_scores`.
+    
+    For whole-portfolio runs prefer the CLI (`python -m app.cli score-batch`),
+    which is not bound by the API gateway timeout.
+    """
+    
+    result = await batch_scorer.run(
+        db,
+        user_ids=request.user_ids,
+        workers=request.workers,
+        shard_size=request.shard_size
     )
-    transactions = result.scalars().all()
     
-    tx_dicts = [
-        {"date": t.date, "amount": t.amount, "type": t.type.value}
-        for t in transactions
-    ]
+    db.add(AgentLog(
+        agent_name="Underwriter",
+        action="Portfolio batch scoring completed",
+        result=f"Scored {result['scored']} businesses in {result['elapsed_seconds']}s",
+        severity=AgentSeverity.INFO
+    ))
+    await db.commit()
     
-    return underwriter.calculate_from_transactions(tx_dicts)
+    return result
 
 
 @router.get("/projection")
 async def project_balance(
     days: int = 30,
     user_id: int = 1,
+    mode: str = "linear",
+    paths: int = 10_000,
     db: AsyncSession = Depends(get_db)
 ):
-    """Project cash balance over time."""
+    """
+    Project cash balance over time.
     
-    result = await db.execute(
-        select(Transaction).where(Transaction.user_id == user_id)
+    Args:
+        mode: "linear" (constant burn rate) or "simulate" (Monte Carlo
+            bootstrap of historical daily net flows)
+        days: Days to project (1-365)
+        paths: Number of simulated paths in simulate mode
+    """
+    
+    if mode not in ("linear", "simulate"):
+        raise HTTPException(status_code=400, detail="mode must be 'linear' or 'simulate'")
+    
+    # simulate_balance allocates a (days, paths) matrix
+    days = min(max(days, 1), 365)
+    
+    analysis = await result_cache.get_or_compute(
+        cache_key(user_id, "treasurer"),
+        lambda: treasurer.analyze_cashflow_from_db(db, user_id)
     )
-    transactions = result.scalars().all()
     
-    tx_dicts = [
-        {"date": t.date, "amount": t.amount, "type": t.type.value}
-        for t in transactions
-    ]
+    if mode == "simulate":
+        history = await treasurer.daily_net_flows(db, user_id)
+        simulation = treasurer.simulate_balance(
+            daily_net_flows=history,
+            current_balance=analysis.current_balance,
+            days=days,
+            paths=min(max(paths, 100), 50_000)
+        )
+        return {"mode": mode, "history_days": len(history), **simulation}
     
-    analysis = treasurer.analyze_cashflow(tx_dicts)
     projections = treasurer.project_balance(
         current_balance=analysis.current_balance,
         burn_rate=analysis.burn_rate,
@@ -8,6 +8,8 @@ from app.core.database import get_db
 from app.models.schemas import User, Inventory, Transaction, AgentLog, TransactionType
 from app.models.pydantic_models import DashboardMetrics, CashflowAnalysis
 from app.services.agents import treasurer, underwriter
+from app.services.backtesting import forecast_tracker
+from app.services.cache import result_cache, cache_key
 
 
 router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
@@ -25,21 +27,22 @@ async def get_dashboard_metrics(
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    # Get transactions for cashflow analysis
-    result = await db.execute(
-        select(Transaction).where(Transaction.user_id == user_id)
+    # Analyze cashflow (aggregated in the database)
+    cashflow = await result_cache.get_or_compute(
+        cache_key(user_id, "treasurer"),
+        lambda: treasurer.analyze_cashflow_from_db(db, user_id)
     )
-    transactions = result.scalars().all()
     
-    # Analyze cashflow
-    tx_dicts = [
-        {"date": t.date, "amount": t.amount, "type": t.type.value}
-        for t in transactions
-    ]
-    cashflow = treasurer.analyze_cashflow(tx_dicts)
+    # Calculate Spivot Score in one pass over a streamed cursor
+    async def compute_score():
+        result = await db.stream(
+            select(Transaction.date, Transaction.amount, Transaction.type)
+            .where(Transaction.user_id == user_id)
+            .execution_options(yield_per=1000)
+        )
+        return await underwriter.acalculate_from_transactions(result)
     
-    # Calculate Spivot Score
-    spivot = underwriter.calculate_from_transactions(tx_dicts)
+    spivot = await result_cache.get_or_compute(cache_key(user_id, "underwriter"), compute_score)
     
     # Count pending orders (items below reorder level)
     result = await db.execute(
@@ -58,11 +61,14 @@ async def get_dashboard_metrics(
     )
     inventory_value = result.scalar() or 0
     
+    # Live accuracy of issued forecasts, else the latest backtest
+    forecast_accuracy = await forecast_tracker.get_accuracy(db, user_id)
+    
     return DashboardMetrics(
         cash_runway_days=cashflow.cash_runway_days,
         spivot_score=spivot.score,
         pending_orders=pending_orders,
-        forecast_accuracy=0.87,  # Simulated
+        forecast_accuracy=forecast_accuracy if forecast_accuracy is not None else 0.0,
         burn_rate=cashflow.burn_rate,
         total_inventory_value=round(inventory_value, 2)
     )
@@ -75,17 +81,10 @@ async def get_cashflow_analysis(
 ):
     """Get detailed cashflow analysis."""
     
-    result = await db.execute(
-        select(Transaction).where(Transaction.user_id == user_id)
+    return await result_cache.get_or_compute(
+        cache_key(user_id, "treasurer"),
+        lambda: treasurer.analyze_cashflow_from_db(db, user_id)
     )
-    transactions = result.scalars().all()
-    
-    tx_dicts = [
-        {"date": t.date, "amount": t.amount, "type": t.type.value}
-        for t in transactions
-    ]
-    
-    return treasurer.analyze_cashflow(tx_dicts)
 
 
 @router.get("/expense-breakdown")
@@ -1,18 +1,34 @@
 """
 API Endpoints - Demo Mode & Data Reset
 """
-from fastapi import APIRouter, Depends
+from typing import Optional
+from fastapi import APIRouter, BackgroundTasks, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.core.database import get_db
+from app.core.database import get_db, AsyncSessionLocal
+from app.core.seeding import seeded_random
 from app.services.mock_data import mock_generator
+from app.services.backtesting import backtester
+from app.services.cache import ledger_versions
+from app.services.alert_engine import alert_engine
 
 
 router = APIRouter(prefix="/demo", tags=["Demo"])
 
 
+async def _backtest_tenant(user_id: int) -> None:
+    """Backtest a freshly seeded tenant so forecast accuracy is available (runs after the response)."""
+    try:
+        async with AsyncSessionLocal() as db:
+            await backtester.run(db, user_ids=[user_id], workers=0)
+    except Exception as e:
+        print(f"⚠️ Demo backtest failed for user {user_id}: {e}")
+
+
 @router.post("/reset")
 async def reset_demo_data(
+    background_tasks: BackgroundTasks,
     crisis_mode: bool = True,
+    seed: Optional[int] = None,
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -20,12 +36,22 @@ async def reset_demo_data(
     
     Args:
         crisis_mode: If True, generate crisis scenario (low cash, high demand, low stock)
+        seed: Optional seed for reproducible data (default: derived from mode and date)
     """
     # Clear existing data
     await mock_generator.clear_all_data(db)
     
     # Generate fresh demo data
-    result = await mock_generator.generate_demo_data(db, crisis_mode=crisis_mode)
+    result = await mock_generator.generate_demo_data(
+        db,
+        crisis_mode=crisis_mode,
+        rng=seeded_random("demo", crisis_mode, seed) if seed is not None else None
+    )
+    ledger_versions.bump_all()
+    alert_engine.invalidate_all()
+    
+    # Backtest the seeded history so forecast accuracy is available shortly
+    background_tasks.add_task(_backtest_tenant, result["user_id"])
     
     return {
         "message": "Demo data reset successfully",
@@ -36,13 +62,23 @@ async def reset_demo_data(
 
 @router.post("/seed")
 async def seed_demo_data(
+    background_tasks: BackgroundTasks,
     crisis_mode: bool = False,
+    seed: Optional[int] = None,
     db: AsyncSession = Depends(get_db)
 ):
     """
     Seed demo data without clearing existing data.
     """
-    result = await mock_generator.generate_demo_data(db, crisis_mode=crisis_mode)
+    result = await mock_generator.generate_demo_data(
+        db,
+        crisis_mode=crisis_mode,
+        rng=seeded_random("demo", crisis_mode, seed) if seed is not None else None
+    )
+    ledger_versions.bump(result["user_id"])
+    alert_engine.invalidate(result["user_id"])
+    
+    background_tasks.add_task(_backtest_tenant, result["user_id"])
     
     return {
         "message": "Demo data seeded",
@@ -1,86 +1,564 @@
 """
 API Endpoints - Document Upload & OCR Processing
 """
+import asyncio
+import json
 import os
+import tempfile
+import time
+import zipfile
 from datetime import datetime
+from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from app.core.config import get_settings
+from app.core.database import get_db, AsyncSessionLocal
+from app.models.schemas import Document, DocumentStatus
+from app.models.pydantic_models import DocumentResponse, ExtractedDocumentData
+from app.services.uploads import read_head, sha256_hex, sniff_mime_type, source_size, spool
 
 router = APIRouter(prefix="/documents", tags=["Documents"])
 
+settings = get_settings()
 
-@router.post("/upload")
+ALLOWED_TYPES = [".pdf", ".png", ".jpg", ".jpeg", ".webp"]
+DOCUMENT_MIME_TYPES = {"application/pdf", "image/png", "image/jpeg", "image/webp"}
+
+# Comment line sent on quiet event streams (keeps proxies from closing them)
+SSE_KEEPALIVE_SECONDS = 15
+
+# Row re-read interval while no event arrives (workers in other processes don't publish here)
+SSE_POLL_SECONDS = 2
+
+
+def _is_supported(file_name: str) -> bool:
+    return os.path.splitext(file_name)[1].lower() in ALLOWED_TYPES
+
+
+def _resolve_profile(profile: Optional[str]) -> str:
+    """Extraction profile for an upload (400 for unknown names)."""
+    from app.services.agents.visual_eye import visual_eye
+    
+    try:
+        return visual_eye.resolve_profile(profile)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _document_result(
+    document_id: int,
+    file_name: Optional[str],
+    extracted: ExtractedDocumentData,
+    cached: bool
+) -> dict:
+    """Upload response body for one processed document."""
+    return {
+        "id": document_id,
+        "file_name": file_name,
+        "document_type": extracted.document_type,
+        "vendor_name": extracted.vendor_name,
+        "date": extracted.date,
+        "total_amount": extracted.total_amount,
+        "line_items": extracted.line_items,
+        "status": "completed" if extracted.document_type != "Other" else "failed",
+        "raw_text": extracted.raw_text[:500] if extracted.raw_text else None,
+        "extraction_tier": extracted.extraction_tier,
+        "extraction_profile": extracted.extraction_profile,
+        "cached": cached
+    }
+
+
+@router.post("/upload", status_code=202)
 async def upload_document(
     file: UploadFile = File(...),
-    user_id: int = 1
+    user_id: int = 1,
+    profile: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
 ):
-    """Upload and process a document using Visual Eye OCR."""
+    """
+    Upload a document for Visual Eye OCR and return without waiting for it.
     
-    # Validate file type
-    allowed_types = [".pdf", ".png", ".jpg", ".jpeg", ".webp"]
-    file_ext = os.path.splitext(file.filename or "")[1].lower()
+    The document is saved as `pending` and extracted by the background
+    queue; follow it at `status_url` (poll) or `events_url` (server-sent
+    events). Identical files uploaded again by the same user return the
+    stored extraction right away (200, `cached` is true). When the queue is
+    full the upload is refused with 503 and a Retry-After header; without an
+    upload bucket, files above DOCUMENT_QUEUE_MAX_ROW_BYTES get 413.
     
-    if file_ext not in allowed_types:
+    `profile` picks what is extracted (header_only, line_items or
+    full_transcript; see /documents/profiles). Smaller profiles finish
+    sooner; cached results are only reused within a profile.
+    """
+    profile = _resolve_profile(profile)
+    
+    # Validate file type
+    if not _is_supported(file.filename or ""):
         raise HTTPException(
             status_code=400,
-            detail=f"File type not supported. Allowed: {allowed_types}"
+            detail=f"File type not supported. Allowed: {ALLOWED_TYPES}"
         )
     
-    # Read file content
-    try:
-        content = await file.read()
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Failed to read file: {str(e)}")
+    # Size and content checks from the spooled file, before anything is buffered
+    error = _check_document(file.file)
+    if error:
+        raise HTTPException(status_code=error[0], detail=error[1])
+    
+    from app.services.document_queue import document_queue, ContentTooLargeError, QueueFullError
     
-    # Process with Visual Eye
     try:
-        from app.services.agents.visual_eye import visual_eye
-        
-        mime_type = visual_eye.get_mime_type(file.filename or "")
-        extracted = await visual_eye.process_document(
-            file_content=content,
+        document_id, status, extracted, position = await document_queue.submit(
+            db,
+            user_id,
+            source=file.file,
             file_name=file.filename or "",
-            mime_type=mime_type
+            mime_type=sniff_mime_type(read_head(file.file)),
+            profile=profile
         )
-        
-        return JSONResponse(content={
-            "id": 1,
-            "file_name": file.filename,
-            "document_type": extracted.document_type,
-            "vendor_name": extracted.vendor_name,
-            "date": extracted.date,
-            "total_amount": extracted.total_amount,
-            "line_items": extracted.line_items,
-            "status": "completed" if extracted.document_type != "Other" else "failed",
-            "raw_text": extracted.raw_text[:500] if extracted.raw_text else None
-        })
-        
+    except QueueFullError as e:
+        raise HTTPException(
+            status_code=503,
+            detail=f"{e}; retry in {e.retry_after} s",
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    except ContentTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
         import traceback
         error_details = traceback.format_exc()
-        print(f"❌ Document processing error: {error_details}")
+        print(f"❌ Document upload error: {error_details}")
         return JSONResponse(
             status_code=500,
             content={
                 "error": str(e),
-                "detail": "Failed to process document with Visual Eye agent",
+                "detail": "Failed to queue document for the Visual Eye agent",
                 "file_name": file.filename
             }
         )
+    
+    if extracted is not None:
+        return JSONResponse(content=_document_result(document_id, file.filename, extracted, True))
+    
+    return JSONResponse(
+        status_code=202,
+        headers={"Location": f"/documents/{document_id}"},
+        content={
+            "id": document_id,
+            "file_name": file.filename,
+            "status": status.value,
+            "queue_position": position,
+            "status_url": f"/documents/{document_id}",
+            "events_url": f"/documents/{document_id}/events"
+        }
+    )
+
+
+@router.post("/upload/stream")
+async def upload_document_stream(
+    file: UploadFile = File(...),
+    user_id: int = 1,
+    profile: Optional[str] = None
+):
+    """
+    Upload a document and stream its fields as NDJSON while the model writes them.
+    
+    Lines are `{"event": "field", "name", "value"}` for each top-level field
+    as soon as it is complete (document_type, vendor_name, date and
+    total_amount come first; full_text last), `{"event": "line_item",
+    "index", "value"}` per line item, and finally `{"event": "done", ...}`
+    with the same body as a completed /upload result. Identical files
+    uploaded again replay the stored extraction. `profile` works as for
+    /upload (no line_item events for header_only, no full_text unless
+    full_transcript).
+    """
+    profile = _resolve_profile(profile)
+    if not _is_supported(file.filename or ""):
+        raise HTTPException(
+            status_code=400,
+            detail=f"File type not supported. Allowed: {ALLOWED_TYPES}"
+        )
+    
+    error = _check_document(file.file)
+    if error:
+        raise HTTPException(status_code=error[0], detail=error[1])
+    
+    # The upload file is closed once this handler returns
+    content = spool(file.file, settings.document_max_bytes)
+    
+    return StreamingResponse(
+        _stream_extraction(content, file.filename or "", user_id, profile),
+        media_type="application/x-ndjson"
+    )
+
+
+async def _stream_extraction(content: tempfile.SpooledTemporaryFile, name: str, user_id: int, profile: str):
+    """NDJSON lines for one streamed extraction, ending with the stored result."""
+    from app.services.agents.visual_eye import field_events, visual_eye
+    from app.services.document_cache import document_cache
+    
+    try:
+        async with AsyncSessionLocal() as db:
+            # Sniff before hashing: hashing leaves the file at the end
+            mime_type = sniff_mime_type(read_head(content))
+            content_hash = await asyncio.to_thread(sha256_hex, content)
+            cached = await document_cache.lookup(db, user_id, content_hash, profile)
+            if cached is not None:
+                document_id, extracted = cached
+                for event in field_events(extracted):
+                    yield json.dumps(event) + "\n"
+                yield json.dumps({"event": "done", **_document_result(document_id, name, extracted, True)}) + "\n"
+                return
+            
+            start = time.perf_counter()
+            extracted = None
+            async for event in visual_eye.stream_document(content, name, mime_type, profile):
+                if event["event"] == "result":
+                    extracted = event["extracted"]
+                else:
+                    yield json.dumps(event) + "\n"
+            
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            document_id = (await document_cache.store(
+                db, user_id, content_hash, name, extracted, elapsed_ms, profile=profile
+            ))[0]
+            yield json.dumps({"event": "done", **_document_result(document_id, name, extracted, False)}) + "\n"
+    except Exception as e:
+        print(f"❌ Streaming document error ({name}): {e}")
+        yield json.dumps({"event": "done", "file_name": name, "status": "failed", "error": str(e)}) + "\n"
+    finally:
+        content.close()
+
+
+@router.post("/upload/batch")
+async def upload_documents_batch(
+    files: list[UploadFile] = File(...),
+    user_id: int = 1,
+    concurrency: Optional[int] = None,
+    profile: Optional[str] = None
+):
+    """
+    Upload many documents (or ZIP archives of them) and stream results as NDJSON.
+    
+    Every file is spooled before the first line, so a batch is limited to
+    document_batch_max_files documents and document_batch_max_bytes in total
+    (after unzipping; 413 otherwise). Files are extracted `concurrency` at a time (default and maximum: the
+    Visual Eye pool size); each result line is written as soon as that file
+    finishes, so lines arrive out of upload order (`index` gives the
+    position). The last line is a summary with `"done": true`. Documents are
+    typed by their content, not their names. `profile` applies to every
+    document (see /upload).
+    """
+    from app.services.agents.visual_eye import visual_eye
+    
+    profile = _resolve_profile(profile)
+    
+    # Spool everything up front (disk beyond a small threshold): upload files
+    # are closed once this handler returns
+    documents: list[tuple[str, Optional[tempfile.SpooledTemporaryFile]]] = []
+    try:
+        for upload in files:
+            name = upload.filename or ""
+            remaining_bytes = settings.document_batch_max_bytes - _spooled_bytes(documents)
+            
+            if sniff_mime_type(read_head(upload.file)) == "application/zip":
+                try:
+                    documents.extend(_unpack_zip(
+                        upload.file,
+                        settings.document_batch_max_files - len(documents),
+                        remaining_bytes
+                    ))
+                except zipfile.BadZipFile:
+                    raise HTTPException(status_code=400, detail=f"Not a valid ZIP archive: {name}")
+            else:
+                documents.append((name, _spool_batch_document(upload.file, remaining_bytes)))
+            
+            if len(documents) > settings.document_batch_max_files:
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"Too many documents (max {settings.document_batch_max_files} per batch)"
+                )
+    except HTTPException:
+        _close_all(documents)
+        raise
+    
+    limit = max(1, min(concurrency or visual_eye.max_concurrency, visual_eye.max_concurrency))
+    
+    return StreamingResponse(
+        _stream_batch(documents, user_id, limit, profile),
+        media_type="application/x-ndjson"
+    )
 
 
-@router.get("/")
+def _check_document(source) -> Optional[tuple[int, str]]:
+    """(status code, message) if a document is too large or not a supported type."""
+    if source is None or source_size(source) > settings.document_max_bytes:
+        return 413, f"Document larger than {settings.document_max_bytes / (1024 * 1024):.1f} MB"
+    if sniff_mime_type(read_head(source)) not in DOCUMENT_MIME_TYPES:
+        return 415, "File content is not a PDF, PNG, JPEG or WEBP document"
+    return None
+
+
+def _spool_batch_document(stream, remaining_bytes: int) -> Optional[tempfile.SpooledTemporaryFile]:
+    """
+    Spool one batch document, stopping as soon as it passes either limit.
+    
+    Returns:
+        Spooled file, or None if the document is over document_max_bytes
+        
+    Raises:
+        HTTPException: 413 if the batch would pass document_batch_max_bytes
+    """
+    spooled = spool(stream, min(settings.document_max_bytes, remaining_bytes))
+    if spooled is None and remaining_bytes < settings.document_max_bytes:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch larger than {settings.document_batch_max_bytes / (1024 * 1024):.1f} MB"
+        )
+    return spooled
+
+
+def _spooled_bytes(documents: list[tuple[str, Optional[tempfile.SpooledTemporaryFile]]]) -> int:
+    return sum(source_size(spooled) for _, spooled in documents if spooled is not None)
+
+
+def _unpack_zip(
+    archive_file,
+    max_files: int,
+    max_bytes: int
+) -> list[tuple[str, Optional[tempfile.SpooledTemporaryFile]]]:
+    """
+    Spool the files inside a ZIP archive (folders and macOS metadata skipped).
+    
+    Entries over the size limit are returned as None without being
+    decompressed in full. Stops after max_files + 1 entries so the caller
+    can reject the batch; raises 413 once the decompressed total passes
+    max_bytes.
+    """
+    documents = []
+    remaining_bytes = max_bytes
+    try:
+        with zipfile.ZipFile(archive_file) as archive:
+            for entry in archive.infolist():
+                name = entry.filename
+                if entry.is_dir() or name.startswith("__MACOSX/") or os.path.basename(name).startswith("."):
+                    continue
+                
+                spooled = None
+                if entry.file_size <= settings.document_max_bytes:
+                    # Declared sizes can lie, so the budget is enforced while decompressing
+                    with archive.open(entry) as stream:
+                        spooled = _spool_batch_document(stream, remaining_bytes)
+                    if spooled is not None:
+                        remaining_bytes -= source_size(spooled)
+                documents.append((name, spooled))
+                
+                if len(documents) > max_files:
+                    break
+    except Exception:
+        _close_all(documents)
+        raise
+    return documents
+
+
+def _close_all(documents: list[tuple[str, Optional[tempfile.SpooledTemporaryFile]]]) -> None:
+    for _, spooled in documents:
+        if spooled is not None:
+            spooled.close()
+
+
+async def _stream_batch(
+    documents: list[tuple[str, Optional[tempfile.SpooledTemporaryFile]]],
+    user_id: int,
+    concurrency: int,
+    profile: str
+):
+    """Extract documents with bounded concurrency, yielding NDJSON lines as they finish."""
+    from app.services.document_cache import document_cache
+    
+    semaphore = asyncio.Semaphore(concurrency)
+    start = time.perf_counter()
+    
+    async def process(index: int, name: str, content: Optional[tempfile.SpooledTemporaryFile]) -> dict:
+        error = _check_document(content)
+        if error:
+            return {"index": index, "file_name": name, "status": "failed", "error": error[1]}
+        
+        async with semaphore:
+            try:
+                # One session per document: a session can't be shared by concurrent tasks
+                async with AsyncSessionLocal() as db:
+                    document_id, extracted, cached = await document_cache.extract(
+                        db,
+                        user_id,
+                        content=content,
+                        file_name=name,
+                        mime_type=sniff_mime_type(read_head(content)),
+                        profile=profile
+                    )
+                return {"index": index, **_document_result(document_id, name, extracted, cached)}
+            except Exception as e:
+                print(f"❌ Batch document error ({name}): {e}")
+                return {"index": index, "file_name": name, "status": "failed", "error": str(e)}
+    
+    tasks = [asyncio.create_task(process(i, name, content)) for i, (name, content) in enumerate(documents)]
+    counts = {"completed": 0, "failed": 0, "cached": 0}
+    
+    try:
+        for finished in asyncio.as_completed(tasks):
+            result = await finished
+            counts[result["status"]] += 1
+            counts["cached"] += int(result.get("cached", False))
+            yield json.dumps(result) + "\n"
+    finally:
+        # Client went away: stop the documents that haven't started
+        for task in tasks:
+            task.cancel()
+        _close_all(documents)
+    
+    yield json.dumps({
+        "done": True,
+        "files": len(documents),
+        **counts,
+        "concurrency": concurrency,
+        "elapsed_seconds": round(time.perf_counter() - start, 3)
+    }) + "\n"
+
+
+@router.get("/", response_model=list[DocumentResponse])
 async def list_documents(
     user_id: int = 1,
-    limit: int = 20
+    limit: int = 20,
+    status: Optional[DocumentStatus] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """List a user's documents, newest first (optionally by status)."""
+    query = (
+        select(Document)
+        .where(Document.user_id == user_id)
+        .order_by(Document.id.desc())
+        .limit(max(1, min(limit, 100)))
+    )
+    if status is not None:
+        query = query.where(Document.status == status)
+    
+    result = await db.execute(query)
+    return result.scalars().all()
+
+
+@router.get("/cache/stats")
+async def get_document_cache_stats():
+    """Get hit rate and model time saved by extraction dedup."""
+    from app.services.document_cache import document_cache
+    
+    return document_cache.stats()
+
+
+@router.get("/queue/stats")
+async def get_document_queue_stats():
+    """Get processing queue depth, throughput and average wait/processing times."""
+    from app.services.document_queue import document_queue
+    
+    return document_queue.stats()
+
+
+@router.get("/profiles")
+async def get_extraction_profiles():
+    """Get extraction profiles with their token budgets, latency percentiles and average tokens."""
+    from app.services.agents.visual_eye import visual_eye
+    
+    return visual_eye.profile_metrics()
+
+
+@router.get("/{doc_id}", response_model=DocumentResponse)
+async def get_document(
+    doc_id: int,
+    user_id: int = 1,
+    db: AsyncSession = Depends(get_db)
 ):
-    """List all documents for a user (demo mode - returns empty)."""
-    return []
+    """Get a specific document with its status and extracted data."""
+    return await _get_user_document(db, doc_id, user_id)
 
 
-@router.get("/{doc_id}")
-async def get_document(doc_id: int):
-    """Get a specific document with extracted data."""
-    raise HTTPException(status_code=404, detail="Document not found")
+@router.get("/{doc_id}/events")
+async def document_events(
+    doc_id: int,
+    user_id: int = 1,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Stream a document's status changes as server-sent events.
+    
+    Each `status` event carries `id` and `status` (plus `document_type` or
+    `error` when it finishes). The current status is sent first and the
+    stream ends after `completed` or `failed` (also sent if the document is
+    deleted meanwhile).
+    """
+    from app.services.document_queue import document_queue
+    
+    # Subscribe before reading the status so no change falls in between
+    events = document_queue.subscribe(doc_id)
+    try:
+        document = await _get_user_document(db, doc_id, user_id)
+    except HTTPException:
+        document_queue.unsubscribe(doc_id, events)
+        raise
+    
+    return StreamingResponse(
+        _stream_status(doc_id, _status_event(document), events),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+async def _get_user_document(db: AsyncSession, doc_id: int, user_id: int) -> Document:
+    result = await db.execute(
+        select(Document).where(Document.id == doc_id, Document.user_id == user_id)
+    )
+    document = result.scalar_one_or_none()
+    if document is None:
+        raise HTTPException(status_code=404, detail="Document not found")
+    return document
+
+
+def _status_event(document: Document) -> dict:
+    """Status event for a documents row."""
+    event = {"id": document.id, "status": document.status.value}
+    if document.status == DocumentStatus.COMPLETED:
+        event["document_type"] = document.document_type
+    elif document.status == DocumentStatus.FAILED and document.extracted_json:
+        event["error"] = document.extracted_json.get("error") or document.extracted_json.get("raw_text")
+    return event
+
+
+async def _stream_status(doc_id: int, current: dict, events: asyncio.Queue):
+    """SSE frames until the document is final; quiet periods re-read the row (other workers)."""
+    from app.services.document_queue import document_queue, TERMINAL_STATUSES
+    
+    terminal = {status.value for status in TERMINAL_STATUSES}
+    try:
+        event = current
+        yield f"event: status\ndata: {json.dumps(event)}\n\n"
+        last_frame = time.monotonic()
+        while event["status"] not in terminal:
+            try:
+                update = await asyncio.wait_for(events.get(), timeout=SSE_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                async with AsyncSessionLocal() as db:
+                    document = await db.get(Document, doc_id)
+                if document is None:
+                    # Deleted (e.g. demo reset): nothing will ever finish it
+                    update = {"id": doc_id, "status": DocumentStatus.FAILED.value, "error": "Document was deleted"}
+                else:
+                    update = _status_event(document)
+                if update["status"] == event["status"]:
+                    if time.monotonic() - last_frame >= SSE_KEEPALIVE_SECONDS:
+                        yield ": keep-alive\n\n"
+                        last_frame = time.monotonic()
+                    continue
+            
+            event = update
+            yield f"event: status\ndata: {json.dumps(event)}\n\n"
+            last_frame = time.monotonic()
+    finally:
+        document_queue.unsubscribe(doc_id, events)
@@ -1,13 +1,14 @@
 """
 API Endpoints - Demand Forecasting
 """
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.core.database import get_db
 from app.models.schemas import Transaction, User, TransactionType
 from app.models.pydantic_models import DemandForecast
 from app.services.agents import prophet
+from app.services.backtesting import forecast_tracker
 
 
 router = APIRouter(prefix="/forecast", tags=["Forecast"])
@@ -17,9 +18,18 @@ router = APIRouter(prefix="/forecast", tags=["Forecast"])
 async def get_demand_forecast(
     user_id: int = 1,
     days: int = 30,
+    mode: str = "ets",
     db: AsyncSession = Depends(get_db)
 ):
-    """Get Prophet demand forecast."""
+    """
+    Get Prophet demand forecast.
+    
+    Args:
+        mode: "ets" (Holt-Winters, fitted state cached per user) or "simulated"
+    """
+    
+    if mode not in ("ets", "simulated"):
+        raise HTTPException(status_code=400, detail="mode must be 'ets' or 'simulated'")
     
     # Get user's business type
     user = await db.get(User, user_id)
@@ -29,6 +39,14 @@ async def get_demand_forecast(
     else:
         business_type = user.business_type
     
+    if mode == "ets":
+        forecast = await prophet.forecast_for_user(
+            db, user_id, business_type, forecast_days=days
+        )
+        await forecast_tracker.record_forecast(db, user_id, forecast)
+        await db.commit()
+        return forecast
+    
     # Get historical credit transactions as proxy for sales/demand
     result = await db.execute(
         select(Transaction)
@@ -49,7 +67,8 @@ async def get_demand_forecast(
     return prophet.forecast_demand(
         historical_data=historical_data,
         business_type=business_type,
-        forecast_days=days
+        forecast_days=days,
+        mode="simulated"
     )
 
 
@@ -67,10 +86,9 @@ async def get_forecast_summary(
     else:
         business_type = user.business_type
     
-    forecast = prophet.forecast_demand(
-        historical_data=[],
-        business_type=business_type
-    )
+    forecast = await prophet.forecast_for_user(db, user_id, business_type)
+    await forecast_tracker.record_forecast(db, user_id, forecast)
+    await db.commit()
     
     return {
         "summary": prophet.get_forecast_summary(forecast),
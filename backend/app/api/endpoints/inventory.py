@@ -1,16 +1,24 @@
 """
 API Endpoints - Inventory Management
 """
+from datetime import date
+from typing import Optional
+import numpy as np
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import func, select, update
 from app.core.database import get_db
-from app.models.schemas import Inventory, AgentLog, AgentSeverity
+from app.models.schemas import (
+    Inventory, StockMovement, AgentLog, AgentSeverity,
+    REORDER_MARGIN, inventory_daily_usage, inventory_reorder_gap
+)
 from app.models.pydantic_models import (
-    InventoryCreate, InventoryResponse, InventoryAlert, PurchaseOrderDraft
+    InventoryCreate, InventoryResponse, InventoryAlert, PurchaseOrderDraft, PurchasePlan,
+    StockMovementCreate, StockMovementResponse
 )
-from app.services.agents import quartermaster, prophet
-from app.models.schemas import BusinessType
+from app.services.agents import quartermaster, prophet, treasurer
+from app.services.cache import result_cache, cache_key
+from app.services.alert_engine import alert_engine
 
 
 router = APIRouter(prefix="/inventory", tags=["Inventory"])
@@ -41,40 +49,103 @@ async def create_inventory_item(
     db.add(inventory)
     await db.commit()
     await db.refresh(inventory)
+    await alert_engine.refresh(db, user_id, [inventory.id])
     
     return inventory
 
 
+async def _load_inventory_columns(
+    db: AsyncSession,
+    user_id: int,
+    reorder_candidates: bool = False,
+    limit: Optional[int] = None,
+    offset: int = 0
+) -> dict:
+    """
+    Fetch a user's inventory as columns (no ORM objects).
+    
+    With reorder_candidates, only items within REORDER_MARGIN of their
+    reorder point are fetched (via idx_inventory_reorder_gap), most urgent
+    first (fewest days of stock) and paginated in the database.
+    """
+    query = select(
+        Inventory.id, Inventory.sku, Inventory.name, Inventory.unit,
+        Inventory.qty, Inventory.lead_time_days, Inventory.unit_cost,
+        Inventory.reorder_level, Inventory.daily_usage
+    ).where(Inventory.user_id == user_id)
+    
+    if reorder_candidates:
+        days_of_stock = Inventory.qty / func.nullif(inventory_daily_usage(), 0)
+        query = (
+            query
+            .where(inventory_reorder_gap(quartermaster.safety_stock_days) < REORDER_MARGIN)
+            .order_by(days_of_stock.asc().nulls_last(), Inventory.id)
+            .limit(limit)
+            .offset(offset)
+        )
+    else:
+        query = query.order_by(Inventory.id)
+    
+    result = await db.execute(query)
+    rows = result.all()
+    ids, skus, names, units, qty, lead_time, unit_cost, reorder_level, daily_usage = (
+        [list(column) for column in zip(*rows)] if rows else [[] for _ in range(9)]
+    )
+    
+    return {
+        "id": ids,
+        "sku": skus,
+        "name": names,
+        "unit": units,
+        "qty": np.array(qty, dtype=np.float64),
+        "lead_time_days": np.array(lead_time, dtype=np.int64),
+        "unit_cost": np.array(unit_cost, dtype=np.float64),
+        "reorder_level": np.array(reorder_level, dtype=np.float64),
+        "daily_usage": np.array(daily_usage, dtype=np.float64)  # None -> NaN
+    }
+
+
+def _estimated_daily_usage(columns: dict) -> np.ndarray:
+    """Vectorized QuartermasterAgent.estimate_daily_usage."""
+    return np.where(
+        np.isnan(columns["daily_usage"]),
+        columns["reorder_level"] / 10,
+        columns["daily_usage"]
+    )
+
+
 @router.get("/alerts", response_model=list[InventoryAlert])
 async def get_inventory_alerts(
     user_id: int = 1,
+    limit: int = 100,
+    offset: int = 0,
     db: AsyncSession = Depends(get_db)
 ):
-    """Get items below reorder point (Quartermaster analysis)."""
+    """
+    Get items below reorder point (Quartermaster analysis), most urgent first.
     
-    result = await db.execute(
-        select(Inventory).where(Inventory.user_id == user_id)
+    The reorder predicate runs in the database; Quartermaster re-checks the
+    candidates exactly, so a page can hold slightly fewer than `limit` alerts.
+    """
+    
+    columns = await _load_inventory_columns(
+        db, user_id,
+        reorder_candidates=True,
+        limit=max(1, min(limit, 1000)),
+        offset=max(0, offset)
+    )
+    
+    # Per-SKU forecast from the last optimization run, else reorder-level heuristic
+    _, alerts = quartermaster.batch_optimize_columnar(
+        qty=columns["qty"],
+        lead_time_days=columns["lead_time_days"],
+        unit_cost=columns["unit_cost"],
+        predicted_demand=_estimated_daily_usage(columns) * 30,
+        skus=columns["sku"],
+        names=columns["name"],
+        units=columns["unit"],
+        with_alerts=True
     )
-    items = result.scalars().all()
-    
-    alerts = []
-    for item in items:
-        # Simple demand estimate based on current stock and reorder level
-        estimated_daily = item.reorder_level / 10
-        predicted_demand = estimated_daily * 30
-        
-        needs_reorder, alert, _ = quartermaster.optimize_inventory(
-            current_stock=item.qty,
-            lead_time_days=item.lead_time_days,
-            predicted_demand=predicted_demand,
-            sku=item.sku,
-            name=item.name,
-            unit=item.unit,
-            unit_cost=item.unit_cost
-        )
-        
-        if alert:
-            alerts.append(alert)
     
     return alerts
 
@@ -86,39 +157,31 @@ async def optimize_inventory(
 ):
     """Run Quartermaster optimization and get suggested purchase orders."""
     
-    result = await db.execute(
-        select(Inventory).where(Inventory.user_id == user_id)
-    )
-    items = result.scalars().all()
-    
-    # Get demand forecast from Prophet
-    forecast = prophet.forecast_demand(
-        historical_data=[],  # Would use real sales data
-        business_type=BusinessType.MANUFACTURING,
-        forecast_days=30
-    )
-    
-    total_demand = sum(d.get("value", 0) for d in forecast.predicted_demand)
+    columns = await _load_inventory_columns(db, user_id)
     
-    # Convert to dict for batch optimization
-    item_dicts = [
-        {
-            "sku": i.sku,
-            "name": i.name,
-            "qty": i.qty,
-            "unit": i.unit,
-            "lead_time_days": i.lead_time_days,
-            "unit_cost": i.unit_cost,
-            "reorder_level": i.reorder_level
-        }
-        for i in items
-    ]
+    # Per-SKU demand forecasts from stock movements (one vectorized Prophet call)
+    forecasts = await prophet.forecast_inventory(db, user_id, columns["id"], forecast_days=30)
     
-    # Distribute demand across items (simplified)
-    demand_per_item = total_demand / len(items) if items else 0
-    demand_forecasts = {i["sku"]: demand_per_item for i in item_dicts}
+    if forecasts:
+        row_of = {item_id: row for row, item_id in enumerate(columns["id"])}
+        updates = [
+            {"id": item_id, "daily_usage": round(total / 30, 4)}
+            for item_id, total in forecasts.items()
+        ]
+        await db.execute(update(Inventory), updates)
+        for u in updates:
+            columns["daily_usage"][row_of[u["id"]]] = u["daily_usage"]
     
-    orders = quartermaster.batch_optimize(item_dicts, demand_forecasts)
+    # Items without movement history fall back to the reorder-level heuristic
+    orders, _ = quartermaster.batch_optimize_columnar(
+        qty=columns["qty"],
+        lead_time_days=columns["lead_time_days"],
+        unit_cost=columns["unit_cost"],
+        predicted_demand=_estimated_daily_usage(columns) * 30,
+        skus=columns["sku"],
+        names=columns["name"],
+        units=columns["unit"]
+    )
     
     # Log the optimization
     if orders:
@@ -129,11 +192,96 @@ async def optimize_inventory(
             severity=AgentSeverity.INFO if len(orders) < 3 else AgentSeverity.WARNING
         )
         db.add(log)
-        await db.commit()
+    
+    await db.commit()
+    
+    # Daily usage forecasts changed, so every item's reorder point may have moved
+    if forecasts:
+        await alert_engine.refresh(db, user_id)
     
     return orders
 
 
+@router.get("/plan", response_model=PurchasePlan)
+async def plan_purchases(
+    user_id: int = 1,
+    budget: Optional[float] = None,
+    stockout_penalty: float = 1.0,
+    deferred_limit: int = 100,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Plan purchase orders within the cash Treasurer can spare.
+    
+    The default budget is the current balance minus Treasurer's critical
+    runway reserve; pass `budget` to override it. Quartermaster funds the
+    most urgent stock-out cover first and defers the rest (only the
+    `deferred_limit` most urgent deferred lines are listed).
+    """
+    
+    analysis = await result_cache.get_or_compute(
+        cache_key(user_id, "treasurer"),
+        lambda: treasurer.analyze_cashflow_from_db(db, user_id)
+    )
+    available, reserve = treasurer.purchase_budget(analysis)
+    
+    columns = await _load_inventory_columns(db, user_id)
+    
+    plan = quartermaster.plan_purchases(
+        qty=columns["qty"],
+        lead_time_days=columns["lead_time_days"],
+        unit_cost=columns["unit_cost"],
+        predicted_demand=_estimated_daily_usage(columns) * 30,
+        skus=columns["sku"],
+        names=columns["name"],
+        units=columns["unit"],
+        budget=available if budget is None else budget,
+        stockout_penalty=stockout_penalty,
+        max_deferred=max(0, min(deferred_limit, 1000))
+    )
+    plan.current_balance = analysis.current_balance
+    plan.cash_reserve = round(reserve, 2)
+    
+    return plan
+
+
+@router.post("/{item_id}/movements", response_model=StockMovementResponse)
+async def record_stock_movement(
+    item_id: int,
+    movement: StockMovementCreate,
+    db: AsyncSession = Depends(get_db)
+):
+    """Record a stock movement (sale, consumption, receipt) and adjust the item's quantity."""
+    
+    item = await db.get(Inventory, item_id)
+    if not item:
+        raise HTTPException(status_code=404, detail="Item not found")
+    
+    record = StockMovement(
+        user_id=item.user_id,
+        inventory_id=item.id,
+        day=movement.day or date.today(),
+        qty=movement.qty,
+        reason=movement.reason
+    )
+    db.add(record)
+    item.qty += movement.qty
+    
+    await db.commit()
+    await db.refresh(record)
+    await db.refresh(item)
+    await alert_engine.refresh(db, item.user_id, [item.id])
+    
+    return StockMovementResponse(
+        id=record.id,
+        inventory_id=record.inventory_id,
+        day=record.day,
+        qty=record.qty,
+        reason=record.reason,
+        balance_qty=item.qty
+    )
+
+
 @router.get("/{item_id}", response_model=InventoryResponse)
 async def get_inventory_item(
     item_id: int,
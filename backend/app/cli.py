@@ -0,0 +1,103 @@
+"""
+Spivot Backend - Maintenance Commands
+
+Usage (from the backend directory):
+    python -m app.cli rebuild-ledger [--user-id N]
+    python -m app.cli score-batch [--user-ids 1 2 3] [--workers N] [--shard-size 500]
+    python -m app.cli backtest [--user-ids 1 2 3] [--workers N] [--horizon 7]
+"""
+import argparse
+import asyncio
+
+
+async def rebuild_ledger(user_id: int = None) -> dict:
+    """Rebuild daily balance snapshots from the transactions table."""
+    from app.core.database import AsyncSessionLocal, init_db
+    from app.services.ledger import ledger
+
+    await init_db()
+    async with AsyncSessionLocal() as db:
+        return await ledger.rebuild(db, user_id=user_id)
+
+
+async def score_batch(user_ids: list[int] = None, workers: int = None, shard_size: int = 500) -> dict:
+    """Score users with the process pool and store results in spivot_scores."""
+    from app.core.database import AsyncSessionLocal, init_db
+    from app.services.batch_scoring import batch_scorer
+
+    def progress(scored: int, total: int):
+        print(f"\r⏳ Scored {scored}/{total}", end="", flush=True)
+
+    await init_db()
+    async with AsyncSessionLocal() as db:
+        result = await batch_scorer.run(
+            db,
+            user_ids=user_ids,
+            workers=workers,
+            shard_size=shard_size,
+            on_progress=progress
+        )
+    print()
+    return result
+
+
+async def backtest(user_ids: list[int] = None, workers: int = None, horizon: int = 7) -> dict:
+    """Backtest Prophet forecasts and store metrics in forecast_accuracy."""
+    from app.core.database import AsyncSessionLocal, init_db
+    from app.services.backtesting import backtester
+
+    def progress(done: int, total: int):
+        print(f"\r⏳ Backtested {done}/{total}", end="", flush=True)
+
+    await init_db()
+    async with AsyncSessionLocal() as db:
+        result = await backtester.run(
+            db,
+            user_ids=user_ids,
+            workers=workers,
+            horizon=horizon,
+            on_progress=progress
+        )
+    print()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="Spivot maintenance commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    rebuild = commands.add_parser("rebuild-ledger", help="Rebuild daily balance snapshots")
+    rebuild.add_argument("--user-id", type=int, default=None, help="Only rebuild this user")
+
+    batch = commands.add_parser("score-batch", help="Compute Spivot Scores for many users")
+    batch.add_argument("--user-ids", type=int, nargs="+", default=None, help="Users to score (default: all)")
+    batch.add_argument("--workers", type=int, default=None, help="Worker processes (0 = in-process)")
+    batch.add_argument("--shard-size", type=int, default=500, help="Users per worker task")
+
+    bt = commands.add_parser("backtest", help="Rolling-origin backtest of Prophet forecasts")
+    bt.add_argument("--user-ids", type=int, nargs="+", default=None, help="Tenants to backtest (default: all)")
+    bt.add_argument("--workers", type=int, default=None, help="Worker processes (0 = in-process)")
+    bt.add_argument("--horizon", type=int, default=7, help="Days forecast from each origin")
+
+    args = parser.parse_args()
+
+    if args.command == "rebuild-ledger":
+        result = asyncio.run(rebuild_ledger(args.user_id))
+        print(f"✅ Rebuilt {result['snapshots']} snapshots for {result['users']} users")
+    elif args.command == "score-batch":
+        result = asyncio.run(score_batch(args.user_ids, args.workers, args.shard_size))
+        print(
+            f"✅ Scored {result['scored']} users in {result['elapsed_seconds']}s "
+            f"({result['tenants_per_hour']:,.0f}/hour, {result['workers']} workers)"
+        )
+    elif args.command == "backtest":
+        result = asyncio.run(backtest(args.user_ids, args.workers, args.horizon))
+        print(
+            f"✅ Backtested {result['backtested']}/{result['tenants']} tenants over {result['origins']} origins "
+            f"in {result['elapsed_seconds']}s: median WAPE {result['median_wape']}, "
+            f"median MAPE {result['median_mape']}, {result['mean_fit_ms']} ms/fit"
+        )
+
+
+if __name__ == "__main__":
+    main()
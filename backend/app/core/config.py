@@ -21,6 +21,59 @@ class Settings(BaseSettings):
     # Google Gemini
     google_api_key: str = ""
     
+    # AWS Bedrock (Visual Eye)
+    bedrock_region: str = "ap-south-1"
+    bedrock_model_id: str = "anthropic.claude-3-haiku-20240307-v1:0"
+    bedrock_endpoint_url: str = ""  # Empty = AWS default endpoint
+    bedrock_max_concurrency: int = 4  # Concurrent invocations per process
+    bedrock_read_timeout_seconds: float = 120
+    bedrock_max_attempts: int = 3  # Per call; throttling and 5xx are retried with backoff
+    
+    # Visual Eye preprocessing (shrinks what is sent to the model)
+    ocr_preprocess: bool = True
+    ocr_image_max_side: int = 1568  # Longest image edge in pixels after downscaling
+    ocr_image_quality: int = 85  # JPEG quality of recompressed images
+    ocr_image_max_pixels: int = 50_000_000  # Larger images are refused instead of decoded
+    ocr_pdf_pages_per_request: int = 1  # Multi-page PDFs are split into parts of this many pages
+    ocr_pdf_max_requests: int = 8  # Per PDF (parts grow beyond pages_per_request to fit)
+    
+    # Visual Eye text tier (digital PDFs parsed locally, no model call)
+    ocr_text_tier: bool = True
+    ocr_text_min_confidence: float = 0.8  # Below this the document goes to the model
+    ocr_text_max_pages: int = 10  # Longer PDFs go to the model
+    
+    # Visual Eye extraction profile when an upload doesn't pick one
+    # (header_only, line_items or full_transcript)
+    ocr_default_profile: str = "full_transcript"
+    
+    # Result cache (per Lambda instance)
+    cache_max_entries: int = 1024
+    cache_max_bytes: int = 8 * 1024 * 1024
+    cache_ttl_seconds: float = 300
+    
+    # Document extraction dedup (in-memory LRU in front of the documents table)
+    document_cache_memory: bool = True
+    document_cache_max_entries: int = 512
+    document_cache_max_bytes: int = 16 * 1024 * 1024
+    document_cache_ttl_seconds: float = 3600
+    document_max_bytes: int = 20 * 1024 * 1024  # Per document (ZIP entries included)
+    document_batch_max_files: int = 500  # Per /documents/upload/batch request (after unzipping)
+    document_batch_max_bytes: int = 200 * 1024 * 1024  # Spooled per batch request (after unzipping)
+    
+    # Document processing queue (pending documents rows, claimed by workers)
+    document_queue_inline: bool = True  # Drain in the API process; set false on Lambda (frozen after the response)
+    document_queue_workers: int = 4  # Documents extracted at once per process
+    document_queue_max_depth: int = 500  # Pending uploads beyond this are refused (503)
+    document_worker_function: str = ""  # Lambda invoked asynchronously after each upload (schedule only if empty)
+    document_pending_timeout_seconds: float = 3600  # Older pending uploads are failed by the sweeper
+    document_processing_timeout_seconds: float = 1200  # Longer than a worker invocation: its worker died
+    document_upload_bucket: str = ""  # S3 bucket holding queued uploads (kept on the documents row if empty)
+    document_queue_max_row_bytes: int = 5 * 1024 * 1024  # Largest upload kept on the row; larger ones need the bucket (413)
+    
+    # Inventory alert engine (per Lambda instance)
+    alert_engine_max_users: int = 10_000
+    alert_engine_ttl_seconds: float = 300
+    
     # CORS
     cors_origins: str = "http://localhost:3000"
     
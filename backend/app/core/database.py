@@ -75,7 +75,11 @@ async def init_db():
     print(f"🔧 Initializing database... (URL: {DATABASE_URL[:30]}... )")
     try:
         # Import all models so SQLAlchemy knows about them
-        from app.models.schemas import User, Inventory, Transaction, Document, AgentLog
+        from app.models.schemas import (
+            User, Inventory, StockMovement, Transaction, BalanceSnapshot, SpivotScoreRecord, ForecastModel,
+            ForecastRecord, ForecastAccuracy,
+            Document, AgentLog
+        )
         
         async with engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
@@ -0,0 +1,43 @@
+"""
+Spivot Backend - Deterministic Random Sources
+Agents draw randomness from generators seeded by their inputs, so identical
+requests over identical data produce byte-identical responses.
+"""
+import hashlib
+import json
+import random
+import numpy as np
+
+
+def derive_seed(*parts) -> int:
+    """
+    Derive a stable 64-bit seed from request inputs.
+
+    Arrays and bytes are hashed by content; everything else by its JSON form.
+
+    Args:
+        parts: Inputs identifying the computation (user, data, params)
+
+    Returns:
+        Seed suitable for random.Random or numpy.random.default_rng
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, np.ndarray):
+            digest.update(np.ascontiguousarray(part).tobytes())
+        elif isinstance(part, (bytes, bytearray)):
+            digest.update(part)
+        else:
+            digest.update(json.dumps(part, sort_keys=True, default=str).encode())
+        digest.update(b"\x00")
+    return int.from_bytes(digest.digest()[:8], "little")
+
+
+def seeded_random(*parts) -> random.Random:
+    """Standard-library generator seeded from `parts` (see derive_seed)."""
+    return random.Random(derive_seed(*parts))
+
+
+def seeded_generator(*parts) -> np.random.Generator:
+    """NumPy generator seeded from `parts` (see derive_seed)."""
+    return np.random.default_rng(derive_seed(*parts))
@@ -21,6 +21,10 @@ async def lifespan(app: FastAPI):
         from app.core.database import init_db
         await init_db()
         print("✅ Database initialized")
+        
+        # Uploads left pending by the previous run (inline queue only)
+        from app.services.document_queue import document_queue
+        document_queue.start()
     except Exception as e:
         print(f"⚠️ Database connection failed: {e}")
         print("📝 Running in DEMO MODE (no database)")
@@ -29,6 +33,10 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     print("👋 Shutting down Spivot Backend...")
+    
+    # Uploads this process was extracting go back to pending for the next worker
+    from app.services.document_queue import document_queue
+    await document_queue.stop()
 
 
 # Create FastAPI app
@@ -1,24 +1,30 @@
 """Models module exports."""
 from app.models.schemas import (
-    Base, User, Inventory, Transaction, Document, AgentLog,
+    Base, User, Inventory, StockMovement, Transaction, BalanceSnapshot, SpivotScoreRecord, ForecastModel,
+    ForecastRecord, ForecastAccuracy,
+    Document, AgentLog,
     BusinessType, TransactionType, DocumentStatus, AgentSeverity
 )
 from app.models.pydantic_models import (
     UserCreate, UserResponse,
-    InventoryCreate, InventoryResponse, InventoryAlert,
+    InventoryCreate, InventoryResponse, InventoryAlert, InventoryAlertEvent, StockMovementCreate, StockMovementResponse,
     TransactionCreate, TransactionResponse,
     DocumentResponse, ExtractedDocumentData,
     AgentLogResponse,
-    DashboardMetrics, CashflowAnalysis, DemandForecast, SpivotScore, PurchaseOrderDraft
+    DashboardMetrics, CashflowAnalysis, DemandForecast, SpivotScore, PurchaseOrderDraft, PurchasePlan,
+    BatchScoreRequest, BatchScoreResult
 )
 
 __all__ = [
-    "Base", "User", "Inventory", "Transaction", "Document", "AgentLog",
+    "Base", "User", "Inventory", "StockMovement", "Transaction", "BalanceSnapshot", "SpivotScoreRecord", "ForecastModel",
+    "ForecastRecord", "ForecastAccuracy",
+    "Document", "AgentLog",
     "BusinessType", "TransactionType", "DocumentStatus", "AgentSeverity",
     "UserCreate", "UserResponse",
-    "InventoryCreate", "InventoryResponse", "InventoryAlert",
+    "InventoryCreate", "InventoryResponse", "InventoryAlert", "InventoryAlertEvent", "StockMovementCreate", "StockMovementResponse",
     "TransactionCreate", "TransactionResponse",
     "DocumentResponse", "ExtractedDocumentData",
     "AgentLogResponse",
-    "DashboardMetrics", "CashflowAnalysis", "DemandForecast", "SpivotScore", "PurchaseOrderDraft"
+    "DashboardMetrics", "CashflowAnalysis", "DemandForecast", "SpivotScore", "PurchaseOrderDraft", "PurchasePlan",
+    "BatchScoreRequest", "BatchScoreResult"
 ]
@@ -1,9 +1,9 @@
 """
 Spivot Backend - Pydantic Request/Response Models
 """
-from datetime import datetime
+from datetime import date, datetime
 from typing import Optional, Any
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 from app.models.schemas import BusinessType, TransactionType, DocumentStatus, AgentSeverity
 
 
@@ -48,12 +48,28 @@ class InventoryResponse(BaseModel):
     reorder_level: float
     lead_time_days: int
     unit_cost: float
+    daily_usage: Optional[float] = None
     last_updated: datetime
 
     class Config:
         from_attributes = True
 
 
+class StockMovementCreate(BaseModel):
+    qty: float  # Negative = consumed/sold, positive = received
+    reason: str = "sale"
+    day: Optional[date] = None  # Defaults to today
+
+
+class StockMovementResponse(BaseModel):
+    id: int
+    inventory_id: int
+    day: date
+    qty: float
+    reason: str
+    balance_qty: float  # Item quantity after the movement
+
+
 class InventoryAlert(BaseModel):
     """Inventory reorder alert from Quartermaster."""
     sku: str
@@ -64,6 +80,14 @@ class InventoryAlert(BaseModel):
     urgency: str  # low, medium, high
 
 
+class InventoryAlertEvent(BaseModel):
+    """Change to a user's reorder alerts, published by the alert engine."""
+    user_id: int
+    item_id: int
+    change: str  # raised, updated, cleared
+    alert: InventoryAlert  # Current alert (last known one when cleared)
+
+
 # ============== Transaction Models ==============
 class TransactionCreate(BaseModel):
     date: datetime
@@ -112,6 +136,8 @@ class ExtractedDocumentData(BaseModel):
     tax: Optional[float] = None
     full_text: Optional[str] = None
     raw_text: Optional[str] = None
+    extraction_tier: Optional[str] = None  # "text" (local PDF text layer) or "model"
+    extraction_profile: Optional[str] = None  # header_only, line_items or full_transcript
 
 
 # ============== Agent Log Models ==============
@@ -155,6 +181,7 @@ class DemandForecast(BaseModel):
     predicted_demand: list[dict]  # [{date, value}]
     market_sentiment: float  # 0.8 - 1.2
     confidence: float
+    mode: Optional[str] = None  # ets, simulated
 
 
 class SpivotScore(BaseModel):
@@ -166,6 +193,22 @@ class SpivotScore(BaseModel):
     risk_level: str  # low, medium, high
 
 
+class BatchScoreRequest(BaseModel):
+    """Portfolio batch scoring request."""
+    user_ids: Optional[list[int]] = None  # None = every user
+    workers: Optional[int] = Field(None, ge=0)  # None = one per CPU, 0 = in-process; capped at CPU count
+    shard_size: int = Field(500, ge=1, le=10_000)
+
+
+class BatchScoreResult(BaseModel):
+    """Portfolio batch scoring summary."""
+    scored: int
+    shards: int
+    workers: int
+    elapsed_seconds: float
+    tenants_per_hour: float
+
+
 class PurchaseOrderDraft(BaseModel):
     """Quartermaster suggested purchase order."""
     sku: str
@@ -175,3 +218,16 @@ class PurchaseOrderDraft(BaseModel):
     estimated_cost: float
     suggested_vendor: Optional[str] = None
     urgency: str
+
+
+class PurchasePlan(BaseModel):
+    """Cash-constrained purchase plan (Quartermaster orders within Treasurer's budget)."""
+    budget: float
+    committed: float
+    cover_ratio: float  # Share of stock-out cover spend that is funded
+    deferred_count: int
+    deferred_cost: float
+    current_balance: Optional[float] = None
+    cash_reserve: Optional[float] = None  # Balance held back for the critical runway
+    orders: list[PurchaseOrderDraft]  # Funded, most urgent first
+    deferred: list[PurchaseOrderDraft]  # Unfunded remainders, most urgent first (may be truncated)
@@ -1,10 +1,14 @@
 """
 Spivot Backend - SQLAlchemy Database Models
 """
-from datetime import datetime
+from datetime import date, datetime
 from enum import Enum
 from typing import Optional
-from sqlalchemy import String, Integer, Float, DateTime, Text, JSON, ForeignKey, Enum as SQLEnum
+from sqlalchemy import (
+    String, Integer, Float, Date, DateTime, Text, JSON, LargeBinary, ForeignKey, Index, Enum as SQLEnum,
+    func, literal_column
+)
+from sqlalchemy.sql.elements import ColumnElement
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.core.database import Base
 
@@ -70,12 +74,52 @@ class Inventory(Base):
     reorder_level: Mapped[float] = mapped_column(Float, default=0)
     lead_time_days: Mapped[int] = mapped_column(Integer, default=7)
     unit_cost: Mapped[float] = mapped_column(Float, default=0)
+    daily_usage: Mapped[Optional[float]] = mapped_column(Float, nullable=True)  # Forecast, from stock movements
     last_updated: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
     user: Mapped["User"] = relationship(back_populates="inventory_items")
 
 
+def inventory_daily_usage() -> ColumnElement:
+    """Forecast daily usage, else the reorder_level / 10 heuristic."""
+    return func.coalesce(Inventory.daily_usage, Inventory.reorder_level.op("/")(literal_column("10.0")))
+
+
+def inventory_reorder_gap(safety_stock_days: int = 3) -> ColumnElement:
+    """
+    Stock minus the reorder point, daily_usage x (lead_time + safety_stock_days).
+    
+    Negative means the item needs reordering. Constants are rendered inline
+    so queries match the expression index below.
+    """
+    return Inventory.qty - inventory_daily_usage() * (
+        Inventory.lead_time_days + literal_column(str(int(safety_stock_days)), Integer)
+    )
+
+
+# Reorder points are rounded to 2 decimals, so prefilters on inventory_reorder_gap()
+# keep items slightly above the raw threshold and Quartermaster decides exactly
+REORDER_MARGIN = 0.01
+
+# Lets /inventory/alerts fetch only items at or below their reorder point
+Index("idx_inventory_reorder_gap", Inventory.user_id, inventory_reorder_gap())
+
+
+class StockMovement(Base):
+    """Signed inventory quantity changes (negative = consumed/sold)."""
+    __tablename__ = "stock_movements"
+    __table_args__ = (Index("idx_stock_movements_user_day", "user_id", "day"),)
+    
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
+    inventory_id: Mapped[int] = mapped_column(ForeignKey("inventory.id"), nullable=False)
+    day: Mapped[date] = mapped_column(Date, nullable=False)
+    qty: Mapped[float] = mapped_column(Float, nullable=False)
+    reason: Mapped[str] = mapped_column(String(50), default="sale")  # sale, consumption, receipt, adjustment
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+
 class Transaction(Base):
     """Financial Transactions (Bank Statement entries)."""
     __tablename__ = "transactions"
@@ -92,6 +136,68 @@ class Transaction(Base):
     user: Mapped["User"] = relationship(back_populates="transactions")
 
 
+class BalanceSnapshot(Base):
+    """Daily ledger balance per user, maintained alongside Transactions."""
+    __tablename__ = "balance_snapshots"
+    
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    inflow: Mapped[float] = mapped_column(Float, default=0)
+    outflow: Mapped[float] = mapped_column(Float, default=0)
+    balance: Mapped[float] = mapped_column(Float, default=0)  # Running balance at end of day
+
+
+class SpivotScoreRecord(Base):
+    """Latest Spivot Score per user, written back by batch scoring."""
+    __tablename__ = "spivot_scores"
+    
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), primary_key=True)
+    score: Mapped[int] = mapped_column(Integer, nullable=False)
+    cash_consistency: Mapped[float] = mapped_column(Float, default=0)
+    revenue_growth: Mapped[float] = mapped_column(Float, default=0)
+    vendor_payment_history: Mapped[float] = mapped_column(Float, default=0)
+    risk_level: Mapped[str] = mapped_column(String(20), nullable=False)
+    computed_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+
+class ForecastModel(Base):
+    """Fitted Prophet forecast state per user and series."""
+    __tablename__ = "forecast_models"
+    
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), primary_key=True)
+    series: Mapped[str] = mapped_column(String(100), primary_key=True)
+    state: Mapped[dict] = mapped_column(JSON, nullable=False)  # HoltWintersState
+    last_date: Mapped[date] = mapped_column(Date, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class ForecastRecord(Base):
+    """Forecast issued in production for a future day, awaiting its actual."""
+    __tablename__ = "forecast_records"
+    
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), primary_key=True)
+    series: Mapped[str] = mapped_column(String(100), primary_key=True)
+    target_day: Mapped[date] = mapped_column(Date, primary_key=True)
+    predicted: Mapped[float] = mapped_column(Float, nullable=False)
+    issued_on: Mapped[date] = mapped_column(Date, nullable=False)
+
+
+class ForecastAccuracy(Base):
+    """Backtest metrics and running live accuracy per user and series."""
+    __tablename__ = "forecast_accuracy"
+    
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), primary_key=True)
+    series: Mapped[str] = mapped_column(String(100), primary_key=True)
+    backtest_mape: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    backtest_wape: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    backtest_origins: Mapped[int] = mapped_column(Integer, default=0)
+    backtest_fit_ms: Mapped[Optional[float]] = mapped_column(Float, nullable=True)  # Mean per origin
+    backtested_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    live_abs_error: Mapped[float] = mapped_column(Float, default=0)  # Sum of |predicted - actual|
+    live_abs_actual: Mapped[float] = mapped_column(Float, default=0)  # Sum of |actual|
+    live_count: Mapped[int] = mapped_column(Integer, default=0)  # Scored forecast days
+
+
 class Document(Base):
     """Uploaded Documents (Invoices, POs, Bank Statements)."""
     __tablename__ = "documents"
@@ -105,9 +211,25 @@ class Document(Base):
     status: Mapped[DocumentStatus] = mapped_column(
         SQLEnum(DocumentStatus), default=DocumentStatus.PENDING
     )
+    # Dedup key: SHA-256 of the file bytes + hash of the prompt/model that extracted it
+    content_hash: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+    extraction_version: Mapped[Optional[str]] = mapped_column(String(32), nullable=True)
+    extraction_ms: Mapped[Optional[float]] = mapped_column(Float, nullable=True)  # Model time
+    # Processing queue: the upload waits in S3 (content_url) or, capped at
+    # document_queue_max_row_bytes, on the row (content) until a worker claims it; cleared when final
+    content: Mapped[Optional[bytes]] = mapped_column(LargeBinary, nullable=True, deferred=True)
+    content_url: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    mime_type: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
+    extraction_profile: Mapped[Optional[str]] = mapped_column(String(32), nullable=True)
+    claimed_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     processed_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
     
+    __table_args__ = (
+        Index("idx_documents_content", "user_id", "content_hash", "extraction_version"),
+        Index("idx_documents_status", "status", "id"),
+    )
+    
     # Relationships
     user: Mapped["User"] = relationship(back_populates="documents")
 
@@ -3,20 +3,39 @@ The Prophet Agent - Demand Intelligence & Forecasting
 Forecasts demand based on business type and historical data.
 """
 import random
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from typing import Optional
-from app.models.schemas import BusinessType
+import numpy as np
+from sqlalchemy import case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.seeding import seeded_random
+from app.models.schemas import BusinessType, ForecastModel, StockMovement, Transaction, TransactionType
 from app.models.pydantic_models import DemandForecast
+from app.services.forecasting import (
+    HoltWintersState, SEASON_LENGTH, daily_series, holt_winters
+)
 
 
 class ProphetAgent:
-    """Demand forecasting agent with market sentiment simulation."""
+    """Demand forecasting agent (Holt-Winters, or simulated market sentiment)."""
+    
+    # Fully refit after this many incrementally absorbed days
+    REFIT_INTERVAL_DAYS = 28
+    
+    FORECAST_LABELS = {
+        BusinessType.RETAIL: "Sales Volume",
+        BusinessType.MANUFACTURING: "Raw Material Usage",
+        BusinessType.TRADING: "Order Volume",
+        BusinessType.SERVICE: "Service Demand"
+    }
     
     def forecast_demand(
         self,
         historical_data: list[dict],
         business_type: BusinessType,
-        forecast_days: int = 30
+        forecast_days: int = 30,
+        mode: str = "ets",
+        rng: Optional[random.Random] = None
     ) -> DemandForecast:
         """
         Forecast demand based on historical data and business type.
@@ -25,12 +44,278 @@ class ProphetAgent:
             historical_data: List of {date, value} historical data points
             business_type: Type of business (retail, manufacturing, etc.)
             forecast_days: Number of days to forecast
+            mode: "ets" (Holt-Winters on the daily series) or "simulated";
+                ets falls back to simulated with less than a week of history
+            rng: Random source for simulated mode (default: seeded from the inputs)
             
         Returns:
             DemandForecast with predictions and market sentiment
         """
+        if mode == "ets":
+            points = [
+                (self._to_date(d.get("date")), d.get("value", 0))
+                for d in historical_data
+                if d.get("date") is not None
+            ]
+            values, last_date = daily_series(points, end=date.today() - timedelta(days=1))
+            
+            if values.size >= SEASON_LENGTH:
+                state = holt_winters.fit(values, last_date)
+                return self.forecast_from_state(state, business_type, forecast_days)
+        
+        return self._simulated_forecast(historical_data, business_type, forecast_days, rng)
+    
+    async def forecast_for_user(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        business_type: BusinessType,
+        forecast_days: int = 30,
+        series: str = "credits",
+        rng: Optional[random.Random] = None
+    ) -> DemandForecast:
+        """
+        Holt-Winters forecast with fitted state persisted per (user, series).
+        
+        A stored state is advanced over only the days since its last
+        observation; the model is fully refit every REFIT_INTERVAL_DAYS.
+        The caller commits the session.
+        
+        Args:
+            db: Database session
+            user_id: User whose credit transactions form the series
+            business_type: Type of business (for the forecast label)
+            forecast_days: Number of days to forecast
+            series: Name of the persisted series
+            rng: Random source if it falls back to simulated mode
+            
+        Returns:
+            DemandForecast (simulated if there is too little history)
+        """
+        yesterday = date.today() - timedelta(days=1)
+        
+        record = await db.get(ForecastModel, (user_id, series))
+        state = HoltWintersState.model_validate(record.state) if record else None
+        
+        if state is not None and state.last_date >= yesterday:
+            pass  # Up to date: O(horizon) extrapolation only
+        elif (
+            state is not None
+            and state.n_obs - state.fitted_n_obs + (yesterday - state.last_date).days
+            < self.REFIT_INTERVAL_DAYS
+        ):
+            first_new = state.last_date + timedelta(days=1)
+            points = await self.load_daily_credits(db, user_id, since=first_new, until=yesterday)
+            values, _ = daily_series(points + [(first_new, 0.0)], end=yesterday)
+            state = holt_winters.update(state, values)
+        else:
+            points = await self.load_daily_credits(db, user_id, until=yesterday)
+            values, last_date = daily_series(points, end=yesterday)
+            state = holt_winters.fit(values, last_date) if values.size >= SEASON_LENGTH else None
+        
+        if state is None:
+            return self._simulated_forecast(
+                [], business_type, forecast_days,
+                rng or seeded_random("prophet", user_id, series, business_type.value, forecast_days, date.today())
+            )
+        
+        if record is None:
+            db.add(ForecastModel(
+                user_id=user_id,
+                series=series,
+                state=state.model_dump(mode="json"),
+                last_date=state.last_date
+            ))
+        elif record.last_date != state.last_date or record.state.get("n_obs") != state.n_obs:
+            record.state = state.model_dump(mode="json")
+            record.last_date = state.last_date
+        
+        return self.forecast_from_state(state, business_type, forecast_days)
+    
+    def forecast_from_state(
+        self,
+        state: HoltWintersState,
+        business_type: BusinessType,
+        forecast_days: int = 30
+    ) -> DemandForecast:
+        """Extrapolate a fitted Holt-Winters state from tomorrow onwards."""
+        today = date.today()
+        skip = max(0, (today - state.last_date).days)  # Days between last_date and tomorrow
+        values = holt_winters.forecast(state, skip + forecast_days)[skip:]
+        
+        forecast_label = self.FORECAST_LABELS.get(business_type, "Service Demand")
+        predicted_demand = [
+            {
+                "date": (today + timedelta(days=day + 1)).strftime("%Y-%m-%d"),
+                "value": round(float(value), 2),
+                "label": forecast_label
+            }
+            for day, value in enumerate(values)
+        ]
+        
+        # Confidence from in-sample one-step accuracy
+        confidence = max(0.05, min(0.95, 1 - state.wape))
+        
+        return DemandForecast(
+            forecast_period_days=forecast_days,
+            predicted_demand=predicted_demand,
+            market_sentiment=1.0,
+            confidence=round(confidence, 2),
+            mode="ets"
+        )
+    
+    def forecast_matrix(
+        self,
+        demand: np.ndarray,
+        last_date: date,
+        forecast_days: int = 30
+    ) -> np.ndarray:
+        """
+        Forecast every row of an SKU x day demand matrix in one vectorized call.
+        
+        Args:
+            demand: (n_skus, n_days) daily demand, oldest day first
+            last_date: Date of the last column
+            forecast_days: Number of days to forecast, starting tomorrow
+            
+        Returns:
+            (n_skus, forecast_days) matrix of daily demand forecasts
+        """
+        skip = max(0, (date.today() - last_date).days)  # Days between last_date and tomorrow
+        return holt_winters.forecast_matrix(demand, last_date, skip + forecast_days)[:, skip:]
+    
+    async def forecast_inventory(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        inventory_ids: list[int],
+        forecast_days: int = 30,
+        lookback_days: int = 90
+    ) -> dict[int, float]:
+        """
+        Per-SKU demand forecasts from stock movement history.
+        
+        Args:
+            db: Database session
+            user_id: Owner of the inventory
+            inventory_ids: Items to forecast
+            forecast_days: Number of days to forecast
+            lookback_days: Days of movement history to fit on
+            
+        Returns:
+            Dict of inventory_id -> total predicted demand over forecast_days,
+            only for items with movements in the lookback window
+        """
+        demand, has_history, last_date = await self._load_demand_matrix(
+            db, user_id, inventory_ids, lookback_days
+        )
+        if not has_history.any():
+            return {}
+        
+        totals = self.forecast_matrix(demand[has_history], last_date, forecast_days).sum(axis=1)
+        item_ids = np.asarray(inventory_ids)[has_history]
+        
+        return dict(zip(item_ids.tolist(), totals.round(2).tolist()))
+    
+    async def _load_demand_matrix(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        inventory_ids: list[int],
+        lookback_days: int
+    ) -> tuple[np.ndarray, np.ndarray, date]:
+        """
+        Build the SKU x day demand matrix (outbound quantity per day).
+        
+        Rows follow `inventory_ids`; columns run from the first movement in
+        the window up to yesterday.
+        
+        Returns:
+            Tuple of (demand matrix, has-history row mask, last date)
+        """
+        yesterday = date.today() - timedelta(days=1)
+        since = yesterday - timedelta(days=lookback_days - 1)
+        
+        result = await db.execute(
+            select(
+                StockMovement.inventory_id,
+                StockMovement.day,
+                func.sum(case((StockMovement.qty < 0, -StockMovement.qty), else_=0.0)).label("demand")
+            )
+            .where(
+                StockMovement.user_id == user_id,
+                StockMovement.day >= since,
+                StockMovement.day <= yesterday
+            )
+            .group_by(StockMovement.inventory_id, StockMovement.day)
+        )
+        rows = result.all()
+        
+        row_of = {item_id: row for row, item_id in enumerate(inventory_ids)}
+        rows = [r for r in rows if r.inventory_id in row_of]
+        if not rows:
+            return np.zeros((len(inventory_ids), 0)), np.zeros(len(inventory_ids), dtype=bool), yesterday
+        
+        days = [self._to_date(r.day) for r in rows]
+        first_day = min(days)
+        
+        row_index = np.array([row_of[r.inventory_id] for r in rows], dtype=np.intp)
+        col_index = np.array([(day - first_day).days for day in days], dtype=np.intp)
+        
+        demand = np.zeros((len(inventory_ids), (yesterday - first_day).days + 1))
+        demand[row_index, col_index] = [float(r.demand) for r in rows]
+        
+        has_history = np.zeros(len(inventory_ids), dtype=bool)
+        has_history[row_index] = True
+        
+        return demand, has_history, yesterday
+    
+    async def load_daily_credits(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        until: date,
+        since: Optional[date] = None
+    ) -> list[tuple[date, float]]:
+        """Sum credit amounts per day in the database (O(days) rows)."""
+        day = func.date(Transaction.date)
+        query = (
+            select(day.label("day"), func.sum(Transaction.amount).label("total"))
+            .where(
+                Transaction.user_id == user_id,
+                Transaction.type == TransactionType.CREDIT,
+                Transaction.date < datetime.combine(until + timedelta(days=1), datetime.min.time())
+            )
+            .group_by(day)
+        )
+        if since is not None:
+            query = query.where(Transaction.date >= datetime.combine(since, datetime.min.time()))
+        
+        result = await db.execute(query)
+        return [(self._to_date(row.day), float(row.total)) for row in result.all()]
+    
+    def _to_date(self, value) -> date:
+        """Normalize a date, datetime or ISO string to a date."""
+        if isinstance(value, datetime):
+            return value.date()
+        if isinstance(value, date):
+            return value
+        return date.fromisoformat(str(value)[:10])
+    
+    def _simulated_forecast(
+        self,
+        historical_data: list[dict],
+        business_type: BusinessType,
+        forecast_days: int,
+        rng: Optional[random.Random] = None
+    ) -> DemandForecast:
+        """Original forecast: mean/trend baseline with simulated sentiment and noise."""
+        rng = rng or seeded_random(
+            "prophet", historical_data, business_type.value, forecast_days, date.today()
+        )
+        
         # Simulate market sentiment (external trends like Census/FMCG data)
-        market_sentiment = round(random.uniform(0.8, 1.2), 2)
+        market_sentiment = round(rng.uniform(0.8, 1.2), 2)
         
         # Calculate baseline from historical data
         if historical_data:
@@ -47,21 +332,18 @@ class ProphetAgent:
             trend = 0.02
         
         # Adjust forecast based on business type
+        forecast_label = self.FORECAST_LABELS.get(business_type, "Service Demand")
         if business_type == BusinessType.RETAIL:
             # Retail: forecast sales volume with seasonal adjustment
-            forecast_label = "Sales Volume"
             seasonality = self._get_seasonal_factor()
         elif business_type == BusinessType.MANUFACTURING:
             # Manufacturing: forecast raw material usage
-            forecast_label = "Raw Material Usage"
             seasonality = 1.0  # Less seasonal variation
         elif business_type == BusinessType.TRADING:
             # Trading: higher volatility
-            forecast_label = "Order Volume"
-            seasonality = self._get_seasonal_factor() * random.uniform(0.9, 1.1)
+            seasonality = self._get_seasonal_factor() * rng.uniform(0.9, 1.1)
         else:
             # Service: steady demand
-            forecast_label = "Service Demand"
             seasonality = 1.0
         
         # Generate forecast
@@ -73,7 +355,7 @@ class ProphetAgent:
             
             # Apply trend, seasonality, market sentiment, and some randomness
             day_forecast = avg_value * (1 + trend * day / 30) * seasonality * market_sentiment
-            day_forecast *= random.uniform(0.95, 1.05)  # Add noise
+            day_forecast *= rng.uniform(0.95, 1.05)  # Add noise
             
             predicted_demand.append({
                 "date": forecast_date.strftime("%Y-%m-%d"),
@@ -88,7 +370,8 @@ class ProphetAgent:
             forecast_period_days=forecast_days,
             predicted_demand=predicted_demand,
             market_sentiment=market_sentiment,
-            confidence=round(confidence, 2)
+            confidence=round(confidence, 2),
+            mode="simulated"
         )
     
     def _get_seasonal_factor(self) -> float:
@@ -2,13 +2,18 @@
 The Quartermaster Agent - Supply Chain & Inventory Optimization
 Manages reorder points and generates draft purchase orders.
 """
-from typing import Optional
-from app.models.pydantic_models import InventoryAlert, PurchaseOrderDraft
+import math
+from typing import Optional, Sequence, Union
+import numpy as np
+from app.models.pydantic_models import InventoryAlert, PurchaseOrderDraft, PurchasePlan
 
 
 class QuartermasterAgent:
     """Inventory optimization and supply chain management agent."""
     
+    # Priority multipliers for the cash-constrained purchase planner
+    URGENCY_WEIGHTS = {"high": 3.0, "medium": 2.0, "low": 1.0}
+    
     def __init__(self, safety_stock_days: int = 3):
         """
         Initialize Quartermaster with safety stock configuration.
@@ -18,6 +23,26 @@ class QuartermasterAgent:
         """
         self.safety_stock_days = safety_stock_days
     
+    def estimate_daily_usage(
+        self,
+        daily_usage: Optional[float],
+        reorder_level: float
+    ) -> float:
+        """
+        Daily usage for an item: the stored per-SKU forecast when available,
+        otherwise the reorder-level heuristic (reorder_level / 10).
+        
+        Args:
+            daily_usage: Forecast daily usage (None if never forecast)
+            reorder_level: Item's configured reorder level
+            
+        Returns:
+            Estimated daily usage
+        """
+        if daily_usage is not None:
+            return daily_usage
+        return reorder_level / 10
+    
     def calculate_reorder_point(
         self,
         daily_usage: float,
@@ -128,27 +153,313 @@ class QuartermasterAgent:
         Returns:
             List of draft purchase orders for items needing reorder
         """
-        orders = []
+        skus = [item.get("sku", "") for item in inventory_items]
+        
+        orders, _ = self.batch_optimize_columnar(
+            qty=np.array([item.get("qty", 0) for item in inventory_items], dtype=np.float64),
+            lead_time_days=np.array([item.get("lead_time_days", 7) for item in inventory_items], dtype=np.int64),
+            unit_cost=np.array([item.get("unit_cost", 0) for item in inventory_items], dtype=np.float64),
+            predicted_demand=np.array([
+                demand_forecasts.get(sku, item.get("qty", 0) * 0.5)
+                for sku, item in zip(skus, inventory_items)
+            ], dtype=np.float64),
+            skus=skus,
+            names=[item.get("name", "") for item in inventory_items],
+            units=[item.get("unit", "units") for item in inventory_items]
+        )
+        
+        return orders
+    
+    def batch_optimize_columnar(
+        self,
+        qty: np.ndarray,
+        lead_time_days: np.ndarray,
+        unit_cost: np.ndarray,
+        predicted_demand: np.ndarray,
+        skus: Sequence[str],
+        names: Sequence[str],
+        units: Sequence[str],
+        forecast_days: int = 30,
+        with_alerts: bool = False
+    ) -> tuple[list[PurchaseOrderDraft], list[InventoryAlert]]:
+        """
+        Optimize many items at once from struct-of-arrays inputs.
         
-        for item in inventory_items:
-            sku = item.get("sku", "")
-            predicted_demand = demand_forecasts.get(sku, item.get("qty", 0) * 0.5)
+        Reorder points, order quantities and urgency are computed for every
+        item in one vectorized pass; Pydantic objects are only built for
+        items that need reordering. Results are identical to calling
+        optimize_inventory per item (items within a rounding step of their
+        reorder point are re-checked with Python's round()).
+        
+        Args:
+            qty: Current stock per item
+            lead_time_days: Supplier lead time per item (integer days)
+            unit_cost: Cost per unit per item
+            predicted_demand: Demand over the forecast period per item
+            skus: SKU per item
+            names: Name per item
+            units: Unit of measurement per item
+            forecast_days: Number of days in the forecast
+            with_alerts: Also build InventoryAlert objects
             
-            needs_reorder, alert, order = self.optimize_inventory(
-                current_stock=item.get("qty", 0),
-                lead_time_days=item.get("lead_time_days", 7),
-                predicted_demand=predicted_demand,
-                forecast_days=30,
-                sku=sku,
-                name=item.get("name", ""),
-                unit=item.get("unit", "units"),
-                unit_cost=item.get("unit_cost", 0)
-            )
+        Returns:
+            Tuple of (purchase orders, alerts) in input order
+            (alerts is empty unless with_alerts)
+        """
+        qty = np.asarray(qty, dtype=np.float64)
+        unit_cost = np.asarray(unit_cost, dtype=np.float64)
+        reorder = self._reorder_columns(qty, lead_time_days, predicted_demand, forecast_days)
+        raw_reorder_point = reorder["raw_reorder_point"]
+        order_qty = reorder["order_qty"]
+        urgency = reorder["urgency"]
+        
+        # Materialize objects only for rows that need reordering
+        orders: list[PurchaseOrderDraft] = []
+        alerts: list[InventoryAlert] = []
+        
+        for i in np.flatnonzero(reorder["needs_reorder"]).tolist():
+            quantity = float(order_qty[i])
+            
+            orders.append(PurchaseOrderDraft(
+                sku=skus[i],
+                item_name=names[i],
+                quantity=round(quantity, 2),
+                unit=units[i],
+                estimated_cost=round(quantity * float(unit_cost[i]), 2),
+                urgency=str(urgency[i])
+            ))
             
-            if order:
-                orders.append(order)
+            if with_alerts:
+                alerts.append(InventoryAlert(
+                    sku=skus[i],
+                    name=names[i],
+                    current_qty=float(qty[i]),
+                    reorder_point=round(float(raw_reorder_point[i]), 2),
+                    suggested_order_qty=round(quantity, 2),
+                    urgency=str(urgency[i])
+                ))
         
-        return orders
+        return orders, alerts
+    
+    def plan_purchases(
+        self,
+        qty: np.ndarray,
+        lead_time_days: np.ndarray,
+        unit_cost: np.ndarray,
+        predicted_demand: np.ndarray,
+        skus: Sequence[str],
+        names: Sequence[str],
+        units: Sequence[str],
+        budget: float,
+        forecast_days: int = 30,
+        stockout_penalty: Union[float, np.ndarray] = 1.0,
+        topup_value: float = 0.2,
+        max_deferred: Optional[int] = None
+    ) -> PurchasePlan:
+        """
+        Choose purchase orders and quantities that fit a cash budget.
+        
+        Each reorder line is split into a "cover" segment (units needed to
+        get back to the reorder point, i.e. to avoid a stock-out before the
+        order lands) and a "top-up" segment (the rest of the suggested
+        order). Segments are ranked by urgency x value per rupee - the
+        stock-out penalty for cover, `topup_value` for top-up - and taken
+        greedily in one vectorized pass. A repair pass then spends the
+        leftover budget on later segments that still fit, accepting partial
+        quantities only if the line reaches its minimum (one week of usage).
+        
+        Args:
+            qty: Current stock per item
+            lead_time_days: Supplier lead time per item (integer days)
+            unit_cost: Cost per unit per item
+            predicted_demand: Demand over the forecast period per item
+            skus: SKU per item
+            names: Name per item
+            units: Unit of measurement per item
+            budget: Cash available for purchases
+            forecast_days: Number of days in the forecast
+            stockout_penalty: Stock-out cost per rupee of goods short (scalar or per item)
+            topup_value: Value per rupee of stock above the reorder point
+            max_deferred: Return at most this many deferred orders (totals cover all)
+            
+        Returns:
+            PurchasePlan with funded orders (most urgent first) and the
+            unfunded remainder as deferred orders
+        """
+        qty = np.asarray(qty, dtype=np.float64)
+        unit_cost = np.asarray(unit_cost, dtype=np.float64)
+        reorder = self._reorder_columns(qty, lead_time_days, predicted_demand, forecast_days)
+        budget = max(0.0, float(budget))
+        
+        lines = np.flatnonzero(reorder["needs_reorder"] & (unit_cost > 0))
+        order_qty = reorder["order_qty"][lines]
+        price = unit_cost[lines]
+        cover_qty = np.clip(reorder["raw_reorder_point"][lines] - qty[lines], 0, order_qty)
+        min_qty = np.minimum(order_qty, reorder["daily_usage"][lines] * 7)
+        
+        weight = np.select(
+            [reorder["urgency"][lines] == "high", reorder["urgency"][lines] == "medium"],
+            [self.URGENCY_WEIGHTS["high"], self.URGENCY_WEIGHTS["medium"]],
+            self.URGENCY_WEIGHTS["low"]
+        )
+        penalty = np.broadcast_to(np.asarray(stockout_penalty, dtype=np.float64), qty.shape)[lines]
+        
+        funded, by_priority, remaining = self._allocate_budget(
+            price=price,
+            cover_qty=cover_qty,
+            order_qty=order_qty,
+            min_qty=min_qty,
+            days_of_stock=reorder["days_of_stock"][lines],
+            cover_value=weight * penalty,
+            topup_value=weight * np.minimum(topup_value, penalty),
+            budget=budget
+        )
+        
+        # Funded and deferred quantities as drafts, most urgent line first
+        def drafts(quantity: np.ndarray, limit: Optional[int] = None) -> list[PurchaseOrderDraft]:
+            keep = by_priority[quantity[by_priority] >= 0.005][:limit]
+            items = lines[keep].tolist()
+            return [
+                PurchaseOrderDraft(
+                    sku=skus[i],
+                    item_name=names[i],
+                    quantity=q,
+                    unit=units[i],
+                    estimated_cost=cost,
+                    urgency=u
+                )
+                for i, q, cost, u in zip(
+                    items,
+                    np.round(quantity[keep], 2).tolist(),
+                    np.round(quantity[keep] * price[keep], 2).tolist(),
+                    reorder["urgency"][lines[keep]].tolist()
+                )
+            ]
+        
+        cover_cost = float((cover_qty * price).sum())
+        cover_funded = float((np.minimum(funded, cover_qty) * price).sum())
+        unfunded = order_qty - funded
+        
+        return PurchasePlan(
+            budget=round(budget, 2),
+            committed=round(budget - remaining, 2),
+            cover_ratio=round(cover_funded / cover_cost, 4) if cover_cost > 0 else 1.0,
+            deferred_count=int((unfunded >= 0.005).sum()),
+            deferred_cost=round(float((unfunded * price).sum()), 2),
+            orders=drafts(funded),
+            deferred=drafts(unfunded, max_deferred)
+        )
+    
+    def _allocate_budget(
+        self,
+        price: np.ndarray,
+        cover_qty: np.ndarray,
+        order_qty: np.ndarray,
+        min_qty: np.ndarray,
+        days_of_stock: np.ndarray,
+        cover_value: np.ndarray,
+        topup_value: np.ndarray,
+        budget: float
+    ) -> tuple[np.ndarray, np.ndarray, float]:
+        """
+        Greedy-with-repair knapsack over cover/top-up segments of each line.
+        
+        Returns:
+            Tuple of (funded qty per line, line indices in priority order,
+            unspent budget)
+        """
+        # Segments: [cover for every line, top-up for every line]
+        n = price.size
+        seg_line = np.concatenate([np.arange(n), np.arange(n)])
+        seg_qty = np.concatenate([cover_qty, order_qty - cover_qty])
+        seg_cost = seg_qty * price[seg_line]
+        seg_density = np.concatenate([cover_value, topup_value])
+        seg_kind = np.repeat([0, 1], n)  # 0 = cover, 1 = top-up
+        
+        # Highest value per rupee first; ties: cover before top-up, then fewest days of stock
+        ranked = np.lexsort((days_of_stock[seg_line], seg_kind, -seg_density))
+        ranked = ranked[seg_qty[ranked] > 0]
+        
+        # Greedy: the longest prefix that fits the budget
+        spent = np.cumsum(seg_cost[ranked])
+        taken = int(np.searchsorted(spent, budget, side="right"))
+        
+        funded = np.zeros(n)
+        np.add.at(funded, seg_line[ranked[:taken]], seg_qty[ranked[:taken]])
+        remaining = budget - (float(spent[taken - 1]) if taken else 0.0)
+        
+        # Repair: spend what's left on later segments that still fit
+        tail = ranked[taken:]
+        if tail.size:
+            tail_lines = seg_line[tail]
+            cheapest = float(price[tail_lines].min())
+            line_price = price.tolist()
+            line_cover = cover_qty.tolist()
+            line_min = min_qty.tolist()
+            line_funded = funded.tolist()
+            
+            for line, kind, size in zip(tail_lines.tolist(), seg_kind[tail].tolist(), seg_qty[tail].tolist()):
+                if remaining < cheapest * 0.01:
+                    break  # Not even 0.01 units of anything left is affordable
+                if kind == 1 and line_funded[line] < line_cover[line]:
+                    continue  # Never top up a line whose cover is unfunded
+                
+                affordable = min(size, math.floor(remaining / line_price[line] * 100) / 100)
+                if affordable <= 0 or (affordable < size and line_funded[line] + affordable < line_min[line]):
+                    continue
+                
+                line_funded[line] += affordable
+                remaining -= affordable * line_price[line]
+            
+            funded = np.array(line_funded)
+        
+        # Line priority = rank of its first (cover) segment
+        priority = np.full(n, ranked.size, dtype=np.intp)
+        priority[seg_line[ranked[::-1]]] = np.arange(ranked.size)[::-1]
+        
+        return funded, np.argsort(priority, kind="stable"), remaining
+    
+    def _reorder_columns(
+        self,
+        qty: np.ndarray,
+        lead_time_days: np.ndarray,
+        predicted_demand: np.ndarray,
+        forecast_days: int
+    ) -> dict[str, np.ndarray]:
+        """
+        Vectorized optimize_inventory: reorder decision, order quantity and urgency per item.
+        
+        Uses the same operation order as the scalar path for bit-identical floats.
+        """
+        lead_time_days = np.asarray(lead_time_days)
+        predicted_demand = np.asarray(predicted_demand, dtype=np.float64)
+        
+        if forecast_days > 0:
+            daily_usage = predicted_demand / forecast_days
+        else:
+            daily_usage = np.zeros_like(predicted_demand)
+        raw_reorder_point = (daily_usage * lead_time_days) + daily_usage * self.safety_stock_days
+        needs_reorder = qty < np.round(raw_reorder_point, 2)
+        
+        # np.round can differ from round() in the last bit; settle rows at the threshold with round()
+        for i in np.flatnonzero(np.abs(qty - raw_reorder_point) < 0.01).tolist():
+            needs_reorder[i] = qty[i] < round(float(raw_reorder_point[i]), 2)
+        
+        days_to_cover = lead_time_days + self.safety_stock_days + 7
+        order_qty = np.maximum((daily_usage * days_to_cover) - qty, daily_usage * 7)
+        
+        days_of_stock = np.full_like(qty, np.inf)
+        np.divide(qty, daily_usage, out=days_of_stock, where=daily_usage > 0)
+        urgency = np.where(days_of_stock < 3, "high", np.where(days_of_stock < 7, "medium", "low"))
+        
+        return {
+            "daily_usage": daily_usage,
+            "raw_reorder_point": raw_reorder_point,
+            "needs_reorder": needs_reorder,
+            "order_qty": order_qty,
+            "days_of_stock": days_of_stock,
+            "urgency": urgency
+        }
 
 
 # Singleton instance
@@ -3,11 +3,31 @@ The Treasurer Agent - Liquidity Guardian & Cashflow Analysis
 Monitors cash health and alerts on critical situations.
 """
 from datetime import datetime, timedelta
-from typing import Optional
-from app.models.schemas import TransactionType
+from typing import Optional, Sequence
+import numpy as np
+from sqlalchemy import and_, case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.seeding import seeded_generator
+from app.models.schemas import BalanceSnapshot, Transaction, TransactionType
 from app.models.pydantic_models import CashflowAnalysis
 
 
+# Type codes used by the columnar path
+TYPE_DEBIT = -1
+TYPE_OTHER = 0
+TYPE_CREDIT = 1
+
+_EPOCH = datetime(1970, 1, 1)
+_SECONDS_PER_DAY = 86400.0
+
+
+def to_epoch_days(value: datetime) -> float:
+    """Convert a datetime to fractional days since 1970-01-01 (naive)."""
+    if value.tzinfo is not None:
+        value = value.replace(tzinfo=None)
+    return (value - _EPOCH).total_seconds() / _SECONDS_PER_DAY
+
+
 class TreasurerAgent:
     """Cashflow analysis and liquidity monitoring agent."""
     
@@ -74,16 +94,6 @@ class TreasurerAgent:
             else:
                 monthly_outflow += amount
         
-        # Calculate burn rate (daily average outflow)
-        days_in_period = min(30, len(set(
-            t.get("date", datetime.now()).strftime("%Y-%m-%d") 
-            if isinstance(t.get("date"), datetime) 
-            else str(t.get("date", ""))[:10]
-            for t in recent_transactions
-        )) or 1)
-        
-        burn_rate = monthly_outflow / 30  # Daily burn rate
-        
         # Calculate current balance if not provided
         if current_balance is None:
             # Estimate from transactions (net flow)
@@ -99,6 +109,254 @@ class TreasurerAgent:
             )
             current_balance = total_credits - total_debits
         
+        return self._analysis_from_totals(monthly_inflow, monthly_outflow, current_balance)
+    
+    def analyze_cashflow_columnar(
+        self,
+        epoch_days: np.ndarray,
+        amounts: np.ndarray,
+        types: np.ndarray,
+        current_balance: Optional[float] = None,
+        as_of: Optional[datetime] = None
+    ) -> CashflowAnalysis:
+        """
+        Analyze cashflow from columnar transaction arrays.
+        
+        Produces the same result as `analyze_cashflow` but computes every
+        total with a single weighted `bincount` over the arrays instead of
+        walking per-row dicts.
+        
+        Args:
+            epoch_days: Fractional days since 1970-01-01 for each transaction
+            amounts: Transaction amounts (sign is ignored)
+            types: Type codes (TYPE_CREDIT, TYPE_DEBIT or TYPE_OTHER)
+            current_balance: Optional current account balance
+            as_of: Reference time for the 30-day window (defaults to now)
+            
+        Returns:
+            CashflowAnalysis with burn rate, runway, and alerts
+        """
+        amounts = np.asarray(amounts, dtype=np.float64)
+        
+        if amounts.size == 0:
+            return CashflowAnalysis(
+                burn_rate=0,
+                cash_runway_days=999,
+                current_balance=current_balance or 0,
+                alert_level="normal",
+                monthly_inflow=0,
+                monthly_outflow=0
+            )
+        
+        thirty_days_ago = to_epoch_days((as_of or datetime.now()) - timedelta(days=30))
+        recent = np.asarray(epoch_days, dtype=np.float64) >= thirty_days_ago
+        
+        # Bucket = recent * 3 + (type + 1): debit/other/credit x older/recent
+        buckets = recent.astype(np.intp) * 3 + (np.asarray(types, dtype=np.intp) + 1)
+        totals = np.bincount(buckets, weights=np.abs(amounts), minlength=6)
+        
+        monthly_inflow = float(totals[5])
+        monthly_outflow = float(totals[3] + totals[4])
+        
+        if current_balance is None:
+            current_balance = float((totals[2] + totals[5]) - (totals[0] + totals[3]))
+        
+        return self._analysis_from_totals(monthly_inflow, monthly_outflow, current_balance)
+    
+    async def analyze_cashflow_from_db(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        current_balance: Optional[float] = None,
+        as_of: Optional[datetime] = None
+    ) -> CashflowAnalysis:
+        """
+        Analyze cashflow without loading individual transactions.
+        
+        Reads the daily balance snapshots when the user has any (O(days));
+        otherwise a single aggregate query over transactions returns the
+        lifetime credit/debit totals and the trailing 30-day inflow/outflow,
+        so only one row crosses the wire either way.
+        
+        Args:
+            db: Database session
+            user_id: User whose transactions to analyze
+            current_balance: Optional current account balance
+            as_of: Reference time for the 30-day window (defaults to now)
+            
+        Returns:
+            CashflowAnalysis with burn rate, runway, and alerts
+        """
+        snapshot_analysis = await self._analyze_from_snapshots(
+            db, user_id, current_balance, as_of
+        )
+        if snapshot_analysis is not None:
+            return snapshot_analysis
+        
+        query = self.cashflow_totals_query(
+            user_id,
+            dialect_name=db.get_bind().dialect.name,
+            as_of=as_of
+        )
+        totals = (await db.execute(query)).one()
+        
+        if not totals.tx_count:
+            return CashflowAnalysis(
+                burn_rate=0,
+                cash_runway_days=999,
+                current_balance=current_balance or 0,
+                alert_level="normal",
+                monthly_inflow=0,
+                monthly_outflow=0
+            )
+        
+        if current_balance is None:
+            current_balance = float(totals.total_credits) - float(totals.total_debits)
+        
+        return self._analysis_from_totals(
+            float(totals.monthly_inflow),
+            float(totals.monthly_outflow),
+            current_balance
+        )
+    
+    async def _analyze_from_snapshots(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        current_balance: Optional[float],
+        as_of: Optional[datetime]
+    ) -> Optional[CashflowAnalysis]:
+        """
+        Analyze cashflow from daily balance snapshots.
+        
+        The 30-day window is day-granular: the last 30 calendar days
+        including today. Returns None when the user has no snapshots.
+        """
+        window_start = ((as_of or datetime.now()) - timedelta(days=30)).date()
+        
+        latest_balance = (
+            select(BalanceSnapshot.balance)
+            .where(BalanceSnapshot.user_id == user_id)
+            .order_by(BalanceSnapshot.day.desc())
+            .limit(1)
+            .scalar_subquery()
+        )
+        result = await db.execute(
+            select(
+                func.coalesce(func.sum(BalanceSnapshot.inflow), 0).label("monthly_inflow"),
+                func.coalesce(func.sum(BalanceSnapshot.outflow), 0).label("monthly_outflow"),
+                latest_balance.label("balance")
+            ).where(
+                BalanceSnapshot.user_id == user_id,
+                BalanceSnapshot.day > window_start
+            )
+        )
+        totals = result.one()
+        
+        if totals.balance is None:
+            return None
+        
+        if current_balance is None:
+            current_balance = float(totals.balance)
+        
+        return self._analysis_from_totals(
+            float(totals.monthly_inflow),
+            float(totals.monthly_outflow),
+            current_balance
+        )
+    
+    def cashflow_totals_query(
+        self,
+        user_id: int,
+        dialect_name: str = "postgresql",
+        as_of: Optional[datetime] = None
+    ):
+        """
+        Build the aggregate query behind `analyze_cashflow_from_db`.
+        
+        Uses `SUM(...) FILTER (WHERE ...)` on PostgreSQL and
+        `SUM(CASE WHEN ... END)` elsewhere (SQLite).
+        
+        Args:
+            user_id: User whose transactions to aggregate
+            dialect_name: SQLAlchemy dialect name of the target database
+            as_of: Reference time for the 30-day window (defaults to now)
+            
+        Returns:
+            Select yielding one row of tx_count, total_credits, total_debits,
+            monthly_inflow and monthly_outflow
+        """
+        thirty_days_ago = (as_of or datetime.now()) - timedelta(days=30)
+        
+        amount = func.abs(Transaction.amount)
+        is_credit = Transaction.type == TransactionType.CREDIT
+        is_debit = Transaction.type == TransactionType.DEBIT
+        is_recent = Transaction.date >= thirty_days_ago
+        
+        def sum_where(condition):
+            if dialect_name == "postgresql":
+                total = func.sum(amount).filter(condition)
+            else:
+                total = func.sum(case((condition, amount), else_=0))
+            return func.coalesce(total, 0)
+        
+        return select(
+            func.count().label("tx_count"),
+            sum_where(is_credit).label("total_credits"),
+            sum_where(is_debit).label("total_debits"),
+            sum_where(and_(is_recent, is_credit)).label("monthly_inflow"),
+            sum_where(and_(is_recent, ~is_credit)).label("monthly_outflow")
+        ).where(Transaction.user_id == user_id)
+    
+    def to_columns(
+        self,
+        transactions: Sequence[tuple]
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Convert (date, amount, type) rows into columnar arrays.
+        
+        Args:
+            transactions: Rows of (datetime, amount, type) as returned by a
+                `select(Transaction.date, Transaction.amount, Transaction.type)`
+            
+        Returns:
+            Tuple of (epoch_days, amounts, types) arrays
+        """
+        if not transactions:
+            return (
+                np.empty(0, dtype=np.float64),
+                np.empty(0, dtype=np.float64),
+                np.empty(0, dtype=np.int8)
+            )
+        
+        dates, amounts, types = zip(*transactions)
+        
+        # datetime64[us] conversion happens in C, not per-row Python
+        dates = [d.replace(tzinfo=None) if d.tzinfo is not None else d for d in dates]
+        micros = np.array(dates, dtype="datetime64[us]").astype(np.int64)
+        epoch_days = micros / (_SECONDS_PER_DAY * 1e6)
+        
+        type_codes = {
+            TransactionType.CREDIT.value: TYPE_CREDIT,
+            TransactionType.DEBIT.value: TYPE_DEBIT
+        }
+        types = np.fromiter(
+            (type_codes.get(str(getattr(t, "value", t)).lower(), TYPE_OTHER) for t in types),
+            dtype=np.int8,
+            count=len(types)
+        )
+        
+        return epoch_days, np.asarray(amounts, dtype=np.float64), types
+    
+    def _analysis_from_totals(
+        self,
+        monthly_inflow: float,
+        monthly_outflow: float,
+        current_balance: float
+    ) -> CashflowAnalysis:
+        """Derive burn rate, runway and alert level from period totals."""
+        burn_rate = monthly_outflow / 30  # Daily burn rate
+        
         # Calculate cash runway
         if burn_rate > 0:
             cash_runway_days = int(current_balance / burn_rate)
@@ -159,6 +417,157 @@ class TreasurerAgent:
             })
         
         return projections
+    
+    def purchase_budget(self, analysis: CashflowAnalysis) -> tuple[float, float]:
+        """
+        Cash that can go to purchases without cutting into the critical runway.
+        
+        Args:
+            analysis: Cashflow analysis for the business
+            
+        Returns:
+            Tuple of (budget, reserve) where reserve is critical_runway_days of burn
+        """
+        reserve = analysis.burn_rate * self.critical_runway_days
+        return max(0.0, analysis.current_balance - reserve), reserve
+    
+    def simulate_balance(
+        self,
+        daily_net_flows: np.ndarray,
+        current_balance: float,
+        days: int,
+        paths: int = 10_000,
+        rng: Optional[np.random.Generator] = None
+    ) -> dict:
+        """
+        Monte Carlo balance projection by bootstrapping daily net flows.
+        
+        Every path resamples `days` net flows (with replacement) from the
+        history; all paths are simulated at once as a (days, paths) float32
+        matrix so 10k paths x 365 days stays in the tens of milliseconds.
+        
+        Args:
+            daily_net_flows: Historical net flow (inflow - outflow) per day
+            current_balance: Starting balance
+            days: Number of days to project
+            paths: Number of simulated paths
+            rng: Optional NumPy random generator (default: seeded from the
+                inputs, so identical inputs give identical results)
+            
+        Returns:
+            Dict with per-day p5/p50/p95 bands, cumulative cash-out
+            probability and the median cash-out date (None if < 50%)
+        """
+        if days <= 0:
+            return {"projections": [], "paths": paths, "cash_out_probability": 0.0, "cash_out_date": None}
+        
+        flows = np.asarray(daily_net_flows, dtype=np.float32)
+        if flows.size == 0:
+            flows = np.zeros(1, dtype=np.float32)
+        rng = rng or seeded_generator("runway", flows, current_balance, days, paths)
+        
+        index_dtype = np.int16 if flows.size <= np.iinfo(np.int16).max else np.int32
+        balances = np.take(flows, rng.integers(0, flows.size, size=(days, paths), dtype=index_dtype))
+        balances[0] += current_balance
+        
+        # Row-wise running sum (contiguous rows beat cumsum along axis 0)
+        for day in range(1, days):
+            np.add(balances[day], balances[day - 1], out=balances[day])
+        
+        # First day each path hits zero (days = never)
+        below_zero = balances <= 0
+        first_hit = np.where(below_zero.any(axis=0), below_zero.argmax(axis=0), days)
+        cash_out_probability = np.cumsum(np.bincount(first_hit, minlength=days + 1)[:days]) / paths
+        
+        balances.sort(axis=1)
+        ranks = [round(q * (paths - 1)) for q in (0.05, 0.5, 0.95)]
+        p5, p50, p95 = (balances[:, rank].tolist() for rank in ranks)
+        probabilities = cash_out_probability.tolist()
+        
+        projections = []
+        cash_out_date = None
+        base_date = datetime.now()
+        
+        for day in range(days):
+            date = (base_date + timedelta(days=day + 1)).strftime("%Y-%m-%d")
+            if cash_out_date is None and probabilities[day] >= 0.5:
+                cash_out_date = date
+            
+            projections.append({
+                "day": day + 1,
+                "date": date,
+                "projected_balance": round(max(0, p50[day]), 2),
+                "p5": round(p5[day], 2),
+                "p50": round(p50[day], 2),
+                "p95": round(p95[day], 2),
+                "cash_out_probability": round(probabilities[day], 4)
+            })
+        
+        return {
+            "projections": projections,
+            "paths": paths,
+            "cash_out_probability": round(probabilities[-1], 4) if probabilities else 0.0,
+            "cash_out_date": cash_out_date
+        }
+    
+    async def daily_net_flows(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        lookback_days: int = 90,
+        as_of: Optional[datetime] = None
+    ) -> np.ndarray:
+        """
+        Load the user's daily net flows for the last `lookback_days`.
+        
+        Reads balance snapshots when available, otherwise buckets the
+        transactions in the window. Days without activity count as zero,
+        starting from the first day that has any.
+        
+        Args:
+            db: Database session
+            user_id: User whose history to load
+            lookback_days: Size of the history window in days
+            as_of: End of the window (defaults to now)
+            
+        Returns:
+            Array of daily net flows, oldest first
+        """
+        end = (as_of or datetime.now()).date()
+        start = end - timedelta(days=lookback_days - 1)
+        
+        result = await db.execute(
+            select(BalanceSnapshot.day, BalanceSnapshot.inflow - BalanceSnapshot.outflow)
+            .where(
+                BalanceSnapshot.user_id == user_id,
+                BalanceSnapshot.day >= start,
+                BalanceSnapshot.day <= end
+            )
+        )
+        rows = result.all()
+        
+        if rows:
+            offsets = np.array([(day - start).days for day, _ in rows], dtype=np.intp)
+            net = np.array([float(flow) for _, flow in rows], dtype=np.float64)
+        else:
+            result = await db.execute(
+                select(Transaction.date, Transaction.amount, Transaction.type)
+                .where(
+                    Transaction.user_id == user_id,
+                    Transaction.date >= datetime.combine(start, datetime.min.time()),
+                    Transaction.date < datetime.combine(end + timedelta(days=1), datetime.min.time())
+                )
+            )
+            epoch_days, amounts, types = self.to_columns(result.all())
+            if amounts.size == 0:
+                return np.empty(0, dtype=np.float64)
+            
+            offsets = (np.floor(epoch_days).astype(np.intp)
+                       - (start - _EPOCH.date()).days)
+            net = np.abs(amounts) * types
+        
+        flows = np.bincount(offsets, weights=net, minlength=lookback_days)
+        return flows[offsets.min():]
 
 
 # Singleton instance
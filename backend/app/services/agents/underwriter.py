@@ -2,10 +2,88 @@
 The Underwriter Agent - Credit Scoring & Risk Assessment
 Generates Spivot Score (300-900) based on financial health.
 """
-from typing import Optional
+from collections.abc import Mapping
+from datetime import datetime, timedelta
+from typing import AsyncIterable, Iterable, Optional
 from app.models.pydantic_models import SpivotScore
 
 
+class ScoreAccumulator:
+    """
+    Single-pass, constant-memory accumulator for Spivot Score inputs.
+    
+    Tracks Welford mean/variance of credit amounts for cash consistency
+    and credit sums for two date windows (last `window_days` vs the
+    `window_days` before that) for revenue growth.
+    """
+    
+    def __init__(self, as_of: Optional[datetime] = None, window_days: int = 30):
+        as_of = as_of or datetime.now()
+        self.recent_start = as_of - timedelta(days=window_days)
+        self.older_start = self.recent_start - timedelta(days=window_days)
+        
+        self.credit_count = 0
+        self.credit_mean = 0.0
+        self.credit_m2 = 0.0
+        self.recent_credits = 0.0
+        self.older_credits = 0.0
+    
+    def add(self, date, amount: float, t_type: str) -> None:
+        """Fold one transaction into the running statistics."""
+        if t_type != "credit":
+            return
+        
+        # Welford's online mean/variance
+        self.credit_count += 1
+        delta = amount - self.credit_mean
+        self.credit_mean += delta / self.credit_count
+        self.credit_m2 += delta * (amount - self.credit_mean)
+        
+        if isinstance(date, str):
+            try:
+                date = datetime.fromisoformat(date.replace("Z", "+00:00"))
+            except ValueError:
+                return
+        if date is None:
+            return
+        if date.tzinfo is not None:
+            date = date.replace(tzinfo=None)
+        
+        if date >= self.recent_start:
+            self.recent_credits += amount
+        elif date >= self.older_start:
+            self.older_credits += amount
+    
+    def add_transaction(self, transaction) -> None:
+        """Fold a transaction dict or a (date, amount, type) row."""
+        if isinstance(transaction, Mapping):
+            self.add(
+                transaction.get("date"),
+                transaction.get("amount", 0),
+                transaction.get("type")
+            )
+        else:
+            date, amount, t_type = transaction
+            self.add(date, amount, t_type)
+    
+    @property
+    def cash_consistency(self) -> float:
+        """0-100 score; lower variance of credits = higher consistency."""
+        if self.credit_count == 0:
+            return 50
+        if self.credit_mean <= 0:
+            return 50
+        std_dev = (self.credit_m2 / self.credit_count) ** 0.5
+        return max(0, 100 - (std_dev / self.credit_mean * 100))
+    
+    @property
+    def revenue_growth(self) -> float:
+        """Percentage change of credits in the recent window vs the one before."""
+        if self.older_credits > 0:
+            return ((self.recent_credits - self.older_credits) / self.older_credits) * 100
+        return 0
+
+
 class UnderwriterAgent:
     """Credit scoring and risk assessment agent."""
     
@@ -75,50 +153,59 @@ class UnderwriterAgent:
     
     def calculate_from_transactions(
         self,
-        transactions: list[dict],
-        vendor_payments: Optional[list[dict]] = None
+        transactions: Iterable,
+        vendor_payments: Optional[list[dict]] = None,
+        as_of: Optional[datetime] = None
     ) -> SpivotScore:
         """
-        Calculate Spivot score from raw transaction data.
+        Calculate Spivot score from raw transaction data in a single pass.
         
         Args:
-            transactions: List of transaction dicts
+            transactions: Iterable of transaction dicts or (date, amount, type) rows
             vendor_payments: Optional list of vendor payment records
+            as_of: Reference time for the revenue growth windows (defaults to now)
             
         Returns:
             SpivotScore
         """
-        # Calculate cash consistency from transaction variance
-        if transactions:
-            credits = [t.get("amount", 0) for t in transactions if t.get("type") == "credit"]
-            if credits:
-                avg_credit = sum(credits) / len(credits)
-                variance = sum((c - avg_credit) ** 2 for c in credits) / len(credits)
-                std_dev = variance ** 0.5
-                # Lower variance = higher consistency
-                cash_consistency = max(0, 100 - (std_dev / avg_credit * 100)) if avg_credit > 0 else 50
-            else:
-                cash_consistency = 50
-        else:
-            cash_consistency = 50
-        
-        # Calculate revenue growth (last month vs previous)
-        # Simplified: compare recent vs older transactions
-        if len(transactions) >= 2:
-            mid = len(transactions) // 2
-            older_credits = sum(
-                t.get("amount", 0) for t in transactions[:mid] if t.get("type") == "credit"
-            )
-            recent_credits = sum(
-                t.get("amount", 0) for t in transactions[mid:] if t.get("type") == "credit"
-            )
-            if older_credits > 0:
-                revenue_growth = ((recent_credits - older_credits) / older_credits) * 100
-            else:
-                revenue_growth = 0
-        else:
-            revenue_growth = 0
+        accumulator = ScoreAccumulator(as_of=as_of)
+        for transaction in transactions:
+            accumulator.add_transaction(transaction)
+        
+        return self.score_from_accumulator(accumulator, vendor_payments)
+    
+    async def acalculate_from_transactions(
+        self,
+        transactions: AsyncIterable,
+        vendor_payments: Optional[list[dict]] = None,
+        as_of: Optional[datetime] = None
+    ) -> SpivotScore:
+        """
+        Async variant of `calculate_from_transactions`.
+        
+        Consumes an async iterator (e.g. a streamed server-side cursor)
+        without materializing the transactions.
+        
+        Args:
+            transactions: Async iterable of transaction dicts or (date, amount, type) rows
+            vendor_payments: Optional list of vendor payment records
+            as_of: Reference time for the revenue growth windows (defaults to now)
+            
+        Returns:
+            SpivotScore
+        """
+        accumulator = ScoreAccumulator(as_of=as_of)
+        async for transaction in transactions:
+            accumulator.add_transaction(transaction)
         
+        return self.score_from_accumulator(accumulator, vendor_payments)
+    
+    def score_from_accumulator(
+        self,
+        accumulator: ScoreAccumulator,
+        vendor_payments: Optional[list[dict]] = None
+    ) -> SpivotScore:
+        """Generate the Spivot score from accumulated transaction statistics."""
         # Calculate vendor payment history
         if vendor_payments:
             on_time = sum(1 for p in vendor_payments if p.get("on_time", True))
@@ -127,8 +214,8 @@ class UnderwriterAgent:
             vendor_payment_history = 80  # Default assumption
         
         return self.generate_spivot_score(
-            cash_consistency=cash_consistency,
-            revenue_growth=revenue_growth,
+            cash_consistency=accumulator.cash_consistency,
+            revenue_growth=accumulator.revenue_growth,
             vendor_payment_history=vendor_payment_history
         )
     
@@ -2,128 +2,574 @@
 The Visual Eye Agent - OCR & Document Ingestion
 Using Claude 3 Haiku on AWS Bedrock (Mumbai region)
 """
+import asyncio
+import hashlib
 import json
-import base64
 import os
-import boto3
-from typing import Optional
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Callable, Optional, Union
 from datetime import datetime
 
+from app.core.config import get_settings
 from app.models.pydantic_models import ExtractedDocumentData
+from app.services.json_stream import JsonFieldStream
+from app.services.model_clients import BedrockModelClient, ModelClient
+from app.services.preprocessing import (
+    IMAGE_TYPES, ImageTooLargeError, downscale_image, merge_extractions, split_pdf
+)
+from app.services.text_layer import PARSER_VERSION, parse_document_text, pdf_text
+from app.services.uploads import DocumentSource, base64_body, source_size
 
 # -------------------------------------------------------------------------
-# PROMPT
+# PROMPTS
 # -------------------------------------------------------------------------
-EXTRACTION_PROMPT = """Extract the following fields from this document and return ONLY valid JSON:
-
-{
-    "document_type": "Invoice" | "Purchase Order" | "Bank Statement" | "Receipt" | "Other",
-    "vendor_name": "string or null",
-    "date": "YYYY-MM-DD or null",
-    "total_amount": number or null,
-    "tax": number or null,
-    "line_items": [{"description": "string", "quantity": number, "unit_price": number, "total": number}],
-    "full_text": "string (transcribe all visible text on the document verbatim)"
+FIELD_SCHEMAS = {
+    "document_type": '"Invoice" | "Purchase Order" | "Bank Statement" | "Receipt" | "Other"',
+    "vendor_name": '"string or null"',
+    "date": '"YYYY-MM-DD or null"',
+    "total_amount": "number or null",
+    "tax": "number or null",
+    "line_items": '[{"description": "string", "quantity": number, "unit_price": number, "total": number}]',
+    "full_text": '"string (transcribe all visible text on the document verbatim)"',
 }
 
+
+def extraction_prompt(fields: tuple[str, ...]) -> str:
+    """Prompt asking for exactly these fields as JSON."""
+    schema = ",\n".join(f'    "{field}": {FIELD_SCHEMAS[field]}' for field in fields)
+    return f"""Extract the following fields from this document and return ONLY valid JSON:
+
+{{
+{schema}
+}}
+
 Return ONLY the JSON object. No markdown, no explanation."""
 
 
+# -------------------------------------------------------------------------
+# EXTRACTION PROFILES
+# -------------------------------------------------------------------------
+# Output tokens dominate latency, so each profile asks only for what its
+# callers use and caps the completion accordingly
+HEADER_FIELDS = ("document_type", "vendor_name", "date", "total_amount", "tax")
+
+EXTRACTION_PROFILES = {
+    "header_only": {
+        "description": "Document type, vendor, date, total and tax",
+        "fields": HEADER_FIELDS,
+        "max_tokens": 256,
+    },
+    "line_items": {
+        "description": "Header fields plus line items",
+        "fields": HEADER_FIELDS + ("line_items",),
+        "max_tokens": 1024,
+    },
+    "full_transcript": {
+        "description": "Header fields, line items and a verbatim transcription",
+        "fields": HEADER_FIELDS + ("line_items", "full_text"),
+        "max_tokens": 2048,
+    },
+}
+for _profile in EXTRACTION_PROFILES.values():
+    _profile["prompt"] = extraction_prompt(_profile["fields"])
+
+TEMPERATURE = 0.1
+
+# Recent document latencies kept per profile for percentiles
+PROFILE_LATENCY_WINDOW = 1000
+
+# Stands in for the base64 data in the request template (spliced in on the pool)
+DOCUMENT_PLACEHOLDER = "@@DOCUMENT_BASE64@@"
+
+# Merged from the last page of a split PDF, so only final once every part is in
+LAST_PAGE_FIELDS = ("total_amount", "tax")
+
+
 class VisualEyeAgent:
     """
     Document OCR Agent using Claude 3 Haiku on AWS Bedrock.
     Available in Mumbai (ap-south-1) for low latency.
+    
+    Model clients (boto3) are blocking, so invocations run on a dedicated
+    thread pool of `max_concurrency` workers; the event loop keeps serving
+    other requests while documents are in flight, and excess documents wait
+    their turn.
+    
+    Digital PDFs are first read locally from their text layer; only scans
+    and documents the parsers aren't confident about reach the model.
+    
+    Before OCR, images are downscaled and recompressed, and multi-page PDFs
+    are split into parts that are extracted in parallel and merged.
+    
+    Each call picks an extraction profile (EXTRACTION_PROFILES): its prompt,
+    token budget and the fields kept in the result.
     """
     
-    def __init__(self):
+    def __init__(
+        self,
+        model_id: Optional[str] = None,
+        region: Optional[str] = None,
+        endpoint_url: Optional[str] = None,
+        max_concurrency: Optional[int] = None,
+        preprocess: Optional[bool] = None,
+        text_tier: Optional[bool] = None,
+        default_profile: Optional[str] = None,
+        client: Optional[ModelClient] = None
+    ):
+        """
+        Initialize Visual Eye (defaults come from settings).
+        
+        Args:
+            model_id: Bedrock model ID
+            region: AWS region
+            endpoint_url: Bedrock Runtime endpoint override (e.g. a local fake)
+            max_concurrency: Maximum concurrent Bedrock invocations
+            preprocess: Downscale images and split PDFs before OCR
+            text_tier: Try the PDF text layer before calling the model
+            default_profile: Extraction profile for calls that don't name one
+            client: Model transport (default: Bedrock, created on first use)
+        """
+        settings = get_settings()
+        
         # Claude 3 Haiku - fast and cheap
-        self.model_id = "anthropic.claude-3-haiku-20240307-v1:0"
-        self.region = "ap-south-1"  # Mumbai - same as Lambda
-        self.client = None
+        self.model_id = model_id or settings.bedrock_model_id
+        self.region = region or settings.bedrock_region  # Mumbai - same as Lambda
+        self.endpoint_url = endpoint_url or settings.bedrock_endpoint_url or None
+        self.max_concurrency = max(1, max_concurrency or settings.bedrock_max_concurrency)
+        self.client = client or BedrockModelClient(
+            region=self.region,
+            endpoint_url=self.endpoint_url,
+            max_pool_connections=self.max_concurrency,
+            read_timeout=settings.bedrock_read_timeout_seconds,
+            max_attempts=settings.bedrock_max_attempts
+        )
+        
+        self.preprocess = settings.ocr_preprocess if preprocess is None else preprocess
+        self.image_max_side = settings.ocr_image_max_side
+        self.image_quality = settings.ocr_image_quality
+        self.image_max_pixels = settings.ocr_image_max_pixels
+        self.pdf_pages_per_request = max(1, settings.ocr_pdf_pages_per_request)
+        self.pdf_max_requests = max(1, settings.ocr_pdf_max_requests)
+        
+        self.text_tier = settings.ocr_text_tier if text_tier is None else text_tier
+        self.text_min_confidence = settings.ocr_text_min_confidence
+        self.text_max_pages = settings.ocr_text_max_pages
+        
+        self.default_profile = default_profile or settings.ocr_default_profile
+        if self.default_profile not in EXTRACTION_PROFILES:
+            print(f"⚠️ Visual Eye: unknown extraction profile '{self.default_profile}', using full_transcript")
+            self.default_profile = "full_transcript"
         
-        self._init_bedrock()
+        # Per profile; changes whenever the model, prompt, preprocessing or
+        # text tier would change the extraction (dedup key part)
+        self.extraction_versions = {
+            name: hashlib.sha256(json.dumps({
+                "model_id": self.model_id,
+                "prompt": profile["prompt"],
+                "max_tokens": profile["max_tokens"],
+                "temperature": TEMPERATURE,
+                "preprocess": [
+                    self.image_max_side,
+                    self.image_quality,
+                    self.pdf_pages_per_request,
+                    self.pdf_max_requests
+                ] if self.preprocess else None,
+                "text_tier": [
+                    PARSER_VERSION,
+                    self.text_min_confidence,
+                    self.text_max_pages
+                ] if self.text_tier else None
+            }, sort_keys=True).encode()).hexdigest()[:16]
+            for name, profile in EXTRACTION_PROFILES.items()
+        }
+        self.extraction_version = self.extraction_versions[self.default_profile]
+        
+        # Per-profile usage (model calls are recorded from pool threads)
+        self._metrics_lock = threading.Lock()
+        self._metrics = {
+            name: {
+                "documents": 0,
+                "text_layer": 0,
+                "failed": 0,
+                "model_calls": 0,
+                "input_tokens": 0,
+                "output_tokens": 0,
+                "seconds": deque(maxlen=PROFILE_LATENCY_WINDOW)
+            }
+            for name in EXTRACTION_PROFILES
+        }
+        
+        # Threads start on demand, so an idle agent costs nothing
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrency,
+            thread_name_prefix="visual-eye-bedrock"
+        )
 
-    def _init_bedrock(self):
-        """Initialize AWS Bedrock Runtime."""
-        try:
-            self.client = boto3.client(
-                "bedrock-runtime", 
-                region_name=self.region
-            )
-            print(f"✅ Visual Eye: Claude 3 Haiku ready ({self.region})")
-        except Exception as e:
-            print(f"❌ Visual Eye: Bedrock init failed: {e}")
+    def resolve_profile(self, profile: Optional[str] = None) -> str:
+        """
+        Name of the extraction profile to use (the default for None).
+        
+        Raises:
+            ValueError: Unknown profile
+        """
+        if profile is None:
+            return self.default_profile
+        if profile not in EXTRACTION_PROFILES:
+            raise ValueError(f"Unknown extraction profile '{profile}'. Available: {', '.join(EXTRACTION_PROFILES)}")
+        return profile
+
+    def profile_version(self, profile: Optional[str] = None) -> str:
+        """Extraction version (dedup key part) of a profile."""
+        return self.extraction_versions[self.resolve_profile(profile)]
+
+    def profile_metrics(self) -> dict:
+        """Per-profile settings, document latency percentiles and average tokens per model call."""
+        metrics = {}
+        with self._metrics_lock:
+            for name, profile in EXTRACTION_PROFILES.items():
+                usage = self._metrics[name]
+                seconds = sorted(usage["seconds"])
+                calls = usage["model_calls"]
+                metrics[name] = {
+                    "description": profile["description"],
+                    "fields": list(profile["fields"]),
+                    "max_tokens": profile["max_tokens"],
+                    "default": name == self.default_profile,
+                    "documents": usage["documents"],
+                    "text_layer": usage["text_layer"],
+                    "failed": usage["failed"],
+                    "model_calls": calls,
+                    "p50_seconds": round(seconds[len(seconds) // 2], 3) if seconds else None,
+                    "p95_seconds": round(seconds[int(len(seconds) * 0.95)], 3) if seconds else None,
+                    "avg_input_tokens": round(usage["input_tokens"] / calls) if calls else None,
+                    "avg_output_tokens": round(usage["output_tokens"] / calls) if calls else None
+                }
+        return metrics
 
     async def process_document(
         self, 
-        file_content: bytes, 
+        file_content: DocumentSource, 
         file_name: str,
-        mime_type: str = "application/pdf"
+        mime_type: str = "application/pdf",
+        profile: Optional[str] = None
     ) -> ExtractedDocumentData:
-        """Process document using Claude 3 Haiku."""
+        """
+        Process document using Claude 3 Haiku.
         
-        if not self.client:
-            return ExtractedDocumentData(
+        `file_content` may be bytes or a seekable binary file (e.g. a spooled
+        upload); either way each part is base64-encoded straight into its
+        request body. Parts of a split PDF share the thread pool with other
+        documents, and if any part fails the whole document fails.
+        """
+        start = time.perf_counter()
+        
+        try:
+            profile = self.resolve_profile(profile)
+            extracted = await self._process(file_content, mime_type, profile)
+        except Exception as e:
+            print(f"❌ Claude processing error: {e}")
+            extracted = ExtractedDocumentData(
                 document_type="Other",
-                raw_text="Error: Bedrock client not initialized"
+                raw_text=f"Processing error: {str(e)}"
             )
         
+        self._record_document(profile, extracted, time.perf_counter() - start)
+        return extracted
+
+    async def _process(self, file_content: DocumentSource, mime_type: str, profile: str) -> ExtractedDocumentData:
+        """Text layer, else preprocess and extract each part (raises on invocation errors)."""
+        if self.text_tier and mime_type == "application/pdf":
+            extracted = await asyncio.to_thread(self._read_text_layer, file_content, profile)
+            if extracted is not None:
+                return extracted
+        
+        parts = [(file_content, mime_type)]
+        if self.preprocess:
+            parts = await asyncio.to_thread(self._preprocess, file_content, mime_type)
+        
+        if len(parts) == 1:
+            return await self._extract(*parts[0], profile)
+        
+        extracted = await asyncio.gather(*(self._extract(source, media_type, profile) for source, media_type in parts))
+        return merge_extractions(list(extracted))
+
+    def _read_text_layer(self, file_content: DocumentSource, profile: str) -> Optional[ExtractedDocumentData]:
+        """
+        Local tier: parse a digital PDF's text layer (runs in a worker thread).
+        
+        Returns:
+            The extraction if the parsers are confident enough, else None
+            (scans, long PDFs, unfamiliar layouts) and the model takes over
+        """
         try:
-            # Encode image to base64
-            image_b64 = base64.standard_b64encode(file_content).decode("utf-8")
+            text = pdf_text(file_content, self.text_max_pages)
+            if text is None:
+                return None
             
-            # Map mime type
-            media_type = mime_type
-            if mime_type == "application/pdf":
-                media_type = "application/pdf"
-            
-            # Claude 3 message format
-            messages = [
-                {
-                    "role": "user",
-                    "content": [
-                        {
-                            "type": "image",
-                            "source": {
-                                "type": "base64",
-                                "media_type": media_type,
-                                "data": image_b64
-                            }
-                        },
-                        {
-                            "type": "text",
-                            "text": EXTRACTION_PROMPT
-                        }
-                    ]
-                }
-            ]
-            
-            # Call Claude 3 Haiku
-            response = self.client.invoke_model(
-                modelId=self.model_id,
-                body=json.dumps({
-                    "anthropic_version": "bedrock-2023-05-31",
-                    "max_tokens": 2048,
-                    "temperature": 0.1,
-                    "messages": messages
+            extracted, confidence = parse_document_text(text)
+            if confidence >= self.text_min_confidence:
+                # Same fields as the profile's model response
+                fields = EXTRACTION_PROFILES[profile]["fields"]
+                return extracted.model_copy(update={
+                    "line_items": extracted.line_items if "line_items" in fields else [],
+                    "full_text": extracted.full_text if "full_text" in fields else None,
+                    "extraction_profile": profile
                 })
-            )
-            
-            # Parse response
-            result = json.loads(response["body"].read())
-            text = result["content"][0]["text"]
+        except Exception as e:
+            print(f"⚠️ Visual Eye: text layer skipped ({source_size(file_content)} bytes): {e}")
+        return None
+
+    def _preprocess(self, file_content: DocumentSource, mime_type: str) -> list[tuple[DocumentSource, str]]:
+        """
+        Shrink a document for OCR (runs in a worker thread).
+        
+        Returns:
+            (content, mime type) parts in page order; the original document
+            when it can't be made smaller or fails to parse
+        
+        Raises:
+            ImageTooLargeError: If an image is over the pixel budget (too
+                large for the model as well, so the document fails)
+        """
+        try:
+            if mime_type in IMAGE_TYPES:
+                image = downscale_image(
+                    file_content, self.image_max_side, self.image_quality, self.image_max_pixels
+                )
+                if image is not None:
+                    return [(image, "image/jpeg")]
+            elif mime_type == "application/pdf":
+                pages = split_pdf(file_content, self.pdf_pages_per_request, self.pdf_max_requests)
+                if pages:
+                    return [(page, "application/pdf") for page in pages]
+        except ImageTooLargeError:
+            raise
+        except Exception as e:
+            print(f"⚠️ Visual Eye: preprocessing skipped ({source_size(file_content)} bytes): {e}")
+        return [(file_content, mime_type)]
+
+    async def stream_document(
+        self,
+        file_content: DocumentSource,
+        file_name: str,
+        mime_type: str = "application/pdf",
+        profile: Optional[str] = None
+    ) -> AsyncIterator[dict]:
+        """
+        Process a document, yielding fields while the model is still writing.
+        
+        Uses InvokeModelWithResponseStream and an incremental JSON parser, so
+        header fields (document_type, vendor_name, date, total_amount) arrive
+        long before the verbatim full_text is done. Parts of a split PDF
+        after the first are extracted in parallel, without streaming.
+        
+        Yields:
+            {"event": "field", "name", "value"} per completed top-level field,
+            {"event": "line_item", "index", "value"} per line item, and last
+            {"event": "result", "extracted": ExtractedDocumentData}, the same
+            result process_document would return. Documents read from their
+            text layer yield all their fields at once.
+        """
+        start = time.perf_counter()
+        
+        try:
+            profile = self.resolve_profile(profile)
+            if self.text_tier and mime_type == "application/pdf":
+                extracted = await asyncio.to_thread(self._read_text_layer, file_content, profile)
+                if extracted is not None:
+                    for event in field_events(extracted):
+                        yield event
+                    self._record_document(profile, extracted, time.perf_counter() - start)
+                    yield {"event": "result", "extracted": extracted}
+                    return
             
-            return self._parse_json_response(text)
+            parts = [(file_content, mime_type)]
+            if self.preprocess:
+                parts = await asyncio.to_thread(self._preprocess, file_content, mime_type)
             
+            rest = [
+                asyncio.ensure_future(self._extract(source, media_type, profile))
+                for source, media_type in parts[1:]
+            ]
+            try:
+                parser = JsonFieldStream()
+                items = 0
+                fields = EXTRACTION_PROFILES[profile]["fields"]
+                async for name, value, is_item in self._stream_part(*parts[0], profile, parser):
+                    if name not in fields:
+                        continue  # Not asked for by this profile
+                    if is_item and name == "line_items":
+                        yield {"event": "line_item", "index": items, "value": value}
+                        items += 1
+                    elif not is_item and name != "line_items" and not (rest and name in LAST_PAGE_FIELDS):
+                        yield {"event": "field", "name": name, "value": value}
+                
+                extracted = self._parse_json_response(parser.text, profile)
+                if rest:
+                    others = await asyncio.gather(*rest)
+                    extracted = merge_extractions([extracted, *others])
+                    for part in others:
+                        for item in part.line_items:
+                            yield {"event": "line_item", "index": items, "value": item}
+                            items += 1
+                    for name in LAST_PAGE_FIELDS:
+                        yield {"event": "field", "name": name, "value": getattr(extracted, name)}
+            finally:
+                for task in rest:
+                    task.cancel()
+                
         except Exception as e:
-            print(f"❌ Claude processing error: {e}")
-            return ExtractedDocumentData(
+            print(f"❌ Claude streaming error: {e}")
+            extracted = ExtractedDocumentData(
                 document_type="Other",
                 raw_text=f"Processing error: {str(e)}"
             )
+        
+        self._record_document(profile, extracted, time.perf_counter() - start)
+        yield {"event": "result", "extracted": extracted}
+
+    def _record_document(self, profile: Optional[str], extracted: ExtractedDocumentData, seconds: float) -> None:
+        """Count a finished document against its profile (unknown profiles aren't counted)."""
+        usage = self._metrics.get(profile)
+        if usage is None:
+            return
+        with self._metrics_lock:
+            usage["documents"] += 1
+            usage["text_layer"] += int(extracted.extraction_tier == "text")
+            usage["failed"] += int(extracted.document_type == "Other")
+            usage["seconds"].append(seconds)
+
+    def _record_call(self, profile: str, usage: Optional[dict]) -> None:
+        """Count one model call and its token usage (runs on the thread pool)."""
+        usage = usage or {}
+        with self._metrics_lock:
+            metrics = self._metrics[profile]
+            metrics["model_calls"] += 1
+            metrics["input_tokens"] += usage.get("input_tokens", 0)
+            metrics["output_tokens"] += usage.get("output_tokens", 0)
+
+    def _request_template(self, media_type: str, profile: str) -> tuple[bytes, bytes]:
+        """Request body before and after the base64 document data."""
+        # Claude 3 message format
+        messages = [
+            {
+                "role": "user",
+                "content": [
+                    {
+                        "type": "image",
+                        "source": {
+                            "type": "base64",
+                            "media_type": media_type,
+                            "data": DOCUMENT_PLACEHOLDER
+                        }
+                    },
+                    {
+                        "type": "text",
+                        "text": EXTRACTION_PROFILES[profile]["prompt"]
+                    }
+                ]
+            }
+        ]
+        
+        template = json.dumps({
+            "anthropic_version": "bedrock-2023-05-31",
+            "max_tokens": EXTRACTION_PROFILES[profile]["max_tokens"],
+            "temperature": TEMPERATURE,
+            "messages": messages
+        })
+        prefix, suffix = template.split(DOCUMENT_PLACEHOLDER)
+        return prefix.encode(), suffix.encode()
 
-    def _parse_json_response(self, text: str) -> ExtractedDocumentData:
-        """Parse JSON from Claude response."""
+    async def _extract(self, source: DocumentSource, media_type: str, profile: str) -> ExtractedDocumentData:
+        """One Bedrock call for one document part (raises on invocation errors)."""
+        # Call Claude 3 Haiku off the event loop
+        prefix, suffix = self._request_template(media_type, profile)
+        result = await asyncio.get_running_loop().run_in_executor(
+            self._executor, self._invoke_document, prefix, source, suffix, profile
+        )
+        text = result["content"][0]["text"]
+        
+        return self._parse_json_response(text, profile)
+
+    async def _stream_part(
+        self,
+        source: DocumentSource,
+        media_type: str,
+        profile: str,
+        parser: JsonFieldStream
+    ) -> AsyncIterator[tuple[str, object, bool]]:
+        """
+        Stream one document part through the parser, yielding what it completes.
+        
+        The blocking event stream is read on the thread pool and its text
+        deltas are handed to the loop; the full text stays in parser.text.
+        """
+        prefix, suffix = self._request_template(media_type, profile)
+        loop = asyncio.get_running_loop()
+        deltas: asyncio.Queue = asyncio.Queue()
+        stop = threading.Event()
+        
+        def emit(text: Optional[str]) -> None:
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(deltas.put_nowait, text)
+        
+        def run() -> None:
+            try:
+                self._invoke_document_stream(prefix, source, suffix, profile, emit, stop)
+            finally:
+                emit(None)
+        
+        future = loop.run_in_executor(self._executor, run)
+        try:
+            while (text := await deltas.get()) is not None:
+                for field in parser.feed(text):
+                    yield field
+            await future  # Raises the invocation error, if any
+        finally:
+            stop.set()  # Consumer gone: stop reading the stream
+
+    def _invoke_document(self, prefix: bytes, source: DocumentSource, suffix: bytes, profile: str) -> dict:
+        """Encode the document into the request body, then invoke (runs on the thread pool)."""
+        result = self._invoke_model(base64_body(prefix, source, suffix))
+        self._record_call(profile, result.get("usage"))
+        return result
+
+    def _invoke_document_stream(
+        self,
+        prefix: bytes,
+        source: DocumentSource,
+        suffix: bytes,
+        profile: str,
+        emit: Callable[[str], None],
+        stop: threading.Event
+    ) -> None:
+        """Blocking streaming call: passes each text delta to emit (runs on the thread pool)."""
+        events = self.client.invoke_stream(self.model_id, base64_body(prefix, source, suffix))
+        usage = {}
+        try:
+            for event in events:
+                if stop.is_set():
+                    break
+                if event.get("type") == "content_block_delta":
+                    emit(event["delta"].get("text", ""))
+                elif event.get("type") == "message_start":
+                    usage.update(event["message"].get("usage", {}))
+                elif event.get("type") == "message_delta":
+                    usage.update(event.get("usage", {}))
+        finally:
+            events.close()
+            self._record_call(profile, usage)
+
+    def _invoke_model(self, body: Union[str, bytes, bytearray]) -> dict:
+        """Blocking model call plus response read (runs on the thread pool)."""
+        return self.client.invoke(self.model_id, body)
+
+    def _parse_json_response(self, text: str, profile: Optional[str] = None) -> ExtractedDocumentData:
+        """Parse JSON from Claude response, keeping the profile's fields."""
+        profile = profile or self.default_profile
         text = text.strip()
         
         # Remove markdown if present
@@ -133,9 +579,15 @@ class VisualEyeAgent:
             text = text[3:]
         if text.endswith("```"):
             text = text[:-3]
+        
+        # Drop any prose around the object ("Here is the JSON: {...}")
+        start, end = text.find("{"), text.rfind("}")
+        if start != -1 and end > start:
+            text = text[start:end + 1]
             
         try:
-            data = json.loads(text.strip())
+            fields = EXTRACTION_PROFILES[profile]["fields"]
+            data = {key: value for key, value in json.loads(text.strip()).items() if key in fields}
             return ExtractedDocumentData(
                 document_type=data.get("document_type", "Other"),
                 vendor_name=data.get("vendor_name"),
@@ -144,12 +596,16 @@ class VisualEyeAgent:
                 total_amount=data.get("total_amount"),
                 tax=data.get("tax"),
                 full_text=data.get("full_text"),
-                raw_text=text
+                raw_text=text,
+                extraction_tier="model",
+                extraction_profile=profile
             )
         except json.JSONDecodeError as e:
             return ExtractedDocumentData(
                 document_type="Other",
-                raw_text=f"JSON Error: {e} | Raw: {text[:300]}"
+                raw_text=f"JSON Error: {e} | Raw: {text[:300]}",
+                extraction_tier="model",
+                extraction_profile=profile
             )
 
     def get_mime_type(self, file_name: str) -> str:
@@ -167,5 +623,15 @@ class VisualEyeAgent:
             return "application/octet-stream"
 
 
+def field_events(extracted: ExtractedDocumentData):
+    """Stream events for a finished extraction: header fields, line items, then full text."""
+    for name in HEADER_FIELDS:
+        yield {"event": "field", "name": name, "value": getattr(extracted, name)}
+    for index, item in enumerate(extracted.line_items):
+        yield {"event": "line_item", "index": index, "value": item}
+    if extracted.full_text is not None:
+        yield {"event": "field", "name": "full_text", "value": extracted.full_text}
+
+
 # Singleton
 visual_eye = VisualEyeAgent()
@@ -0,0 +1,228 @@
+"""
+Incremental Inventory Alert Events
+Publishes reorder alert changes (raised / updated / cleared) as
+InventoryAlertEvent to subscribers (e.g. push notifications). Write paths
+refresh the SKUs they touched and only those are re-evaluated against the
+last alert set this process saw. GET /inventory/alerts does not read from
+here: the alert sets are per process, so listing and paging stay in SQL.
+"""
+import asyncio
+import inspect
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Iterable, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import get_settings
+from app.models.schemas import REORDER_MARGIN, Inventory, inventory_reorder_gap
+from app.models.pydantic_models import InventoryAlert, InventoryAlertEvent
+from app.services.agents.quartermaster import quartermaster
+
+
+AlertListener = Callable[[InventoryAlertEvent], Any]
+
+
+class _UserAlerts:
+    """One user's alert set: item id -> alert."""
+
+    def __init__(self):
+        self.alerts: dict[int, InventoryAlert] = {}
+        self.dirty: set[int] = set()
+        self.loaded_at: Optional[float] = None  # Last full load (None forces one)
+        self.loaded = False  # Whether a first full load (the baseline) happened
+        self.touched_all = False  # A write touched every item since the last sync
+        self.lock = asyncio.Lock()
+
+
+class AlertEngine:
+    """In-process, per-user reorder alert sets maintained from write paths to publish changes."""
+
+    def __init__(self, max_users: int = 10_000, ttl_seconds: float = 300):
+        """
+        Initialize the engine.
+
+        Args:
+            max_users: Users kept in memory (least recently used are dropped)
+            ttl_seconds: Age after which a user's set is fully re-evaluated
+                (picks up writes made by other processes)
+        """
+        self.max_users = max_users
+        self.ttl_seconds = ttl_seconds
+
+        self._users: OrderedDict[int, _UserAlerts] = OrderedDict()
+        self._listeners: list[AlertListener] = []
+
+        self.full_loads = 0
+        self.items_evaluated = 0
+        self.events_published = 0
+
+    def invalidate(self, user_id: int) -> None:
+        """Drop a user's alert set without publishing events (e.g. demo seed)."""
+        self._users.pop(user_id, None)
+
+    def invalidate_all(self) -> None:
+        """Drop every alert set without publishing events (e.g. demo reset)."""
+        self._users.clear()
+
+    def subscribe(self, listener: AlertListener) -> Callable[[], None]:
+        """
+        Register a callback for alert changes.
+
+        The listener receives an InventoryAlertEvent and may be sync or async.
+
+        Returns:
+            Function that unsubscribes the listener
+        """
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener) if listener in self._listeners else None
+
+    async def refresh(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        item_ids: Optional[Iterable[int]] = None
+    ) -> None:
+        """
+        Re-evaluate touched items (or every item) and publish what changed.
+
+        Call after the write is committed.
+
+        Args:
+            db: Database session
+            user_id: Owner of the items
+            item_ids: Items touched by the write (None = re-evaluate all,
+                e.g. after daily usage forecasts were rewritten)
+        """
+        state = self._state(user_id)
+        if item_ids is None:
+            state.loaded_at = None
+            state.touched_all = True
+        else:
+            state.dirty.update(item_ids)
+        await self._sync(db, user_id, state)
+
+    def stats(self) -> dict:
+        """Engine counters and size."""
+        return {
+            "users": len(self._users),
+            "alerts": sum(len(state.alerts) for state in self._users.values()),
+            "dirty": sum(len(state.dirty) for state in self._users.values()),
+            "full_loads": self.full_loads,
+            "items_evaluated": self.items_evaluated,
+            "events_published": self.events_published,
+            "listeners": len(self._listeners)
+        }
+
+    def _state(self, user_id: int) -> _UserAlerts:
+        state = self._users.get(user_id)
+        if state is None:
+            state = self._users[user_id] = _UserAlerts()
+            while len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+        else:
+            self._users.move_to_end(user_id)
+        return state
+
+    async def _sync(self, db: AsyncSession, user_id: int, state: _UserAlerts) -> None:
+        """Bring a user's set up to date; syncs for one user run one at a time."""
+        async with state.lock:
+            stale = state.loaded_at is None or time.monotonic() - state.loaded_at > self.ttl_seconds
+            if not stale and not state.dirty:
+                return
+
+            baseline = not state.loaded
+            dirty, state.dirty = state.dirty, set()
+            touched_all, state.touched_all = state.touched_all, False
+
+            query = select(
+                Inventory.id, Inventory.sku, Inventory.name, Inventory.qty,
+                Inventory.lead_time_days, Inventory.reorder_level, Inventory.daily_usage
+            ).where(Inventory.user_id == user_id)
+
+            if stale:
+                # Every reorder candidate (via idx_inventory_reorder_gap); the rest are cleared
+                query = query.where(inventory_reorder_gap(quartermaster.safety_stock_days) < REORDER_MARGIN)
+                touched = set(state.alerts)
+                self.full_loads += 1
+            else:
+                query = query.where(Inventory.id.in_(dirty))
+                touched = dirty
+
+            try:
+                result = await db.execute(query)
+            except Exception:
+                state.dirty |= dirty
+                state.touched_all |= touched_all
+                raise
+            evaluated = {row.id: self._evaluate(row) for row in result.all()}
+            self.items_evaluated += len(evaluated)
+
+            if stale:
+                state.loaded_at = time.monotonic()
+                state.loaded = True
+
+            events = []
+            for item_id in touched | set(evaluated):
+                before = state.alerts.get(item_id)
+                after = evaluated.get(item_id)
+
+                if after is None:
+                    if before is None:
+                        continue
+                    del state.alerts[item_id]
+                    change = "cleared"
+                elif before is None:
+                    state.alerts[item_id] = after
+                    change = "raised"
+                elif before != after:
+                    state.alerts[item_id] = after
+                    change = "updated"
+                else:
+                    continue
+
+                events.append(InventoryAlertEvent(
+                    user_id=user_id,
+                    item_id=item_id,
+                    change=change,
+                    alert=after or before
+                ))
+
+        # The first load (cold process, eviction, invalidate) is a baseline for
+        # untouched items only: the write that triggered it still publishes its
+        # raised alerts (a clear can't be told apart from "never alerted" here)
+        if baseline and not touched_all:
+            events = [event for event in events if event.item_id in dirty]
+        await self._publish(events)
+
+    def _evaluate(self, row) -> Optional[InventoryAlert]:
+        """Quartermaster decision for one item."""
+        daily_usage = quartermaster.estimate_daily_usage(row.daily_usage, row.reorder_level)
+        _, alert, _ = quartermaster.optimize_inventory(
+            current_stock=row.qty,
+            lead_time_days=row.lead_time_days,
+            predicted_demand=daily_usage * 30,
+            sku=row.sku,
+            name=row.name
+        )
+        return alert
+
+    async def _publish(self, events: list[InventoryAlertEvent]) -> None:
+        """Deliver events to every listener; a failing listener does not stop the others."""
+        for event in events:
+            self.events_published += 1
+            for listener in list(self._listeners):
+                try:
+                    result = listener(event)
+                    if inspect.isawaitable(result):
+                        await result
+                except Exception as e:
+                    print(f"❌ Alert listener failed for item {event.item_id}: {e}")
+
+
+settings = get_settings()
+
+# Singleton instance
+alert_engine = AlertEngine(
+    max_users=settings.alert_engine_max_users,
+    ttl_seconds=settings.alert_engine_ttl_seconds
+)
@@ -0,0 +1,380 @@
+"""
+Forecast Backtesting & Accuracy Tracking
+Replays ProphetAgent's Holt-Winters policy (daily update, periodic refit)
+from rolling origins over each tenant's history, and scores forecasts
+issued in production as their actuals arrive.
+"""
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from itertools import groupby
+from operator import itemgetter
+from typing import Callable, Optional
+import numpy as np
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.schemas import ForecastAccuracy, ForecastRecord, Transaction, TransactionType, User
+from app.models.pydantic_models import DemandForecast
+from app.services.agents.prophet import ProphetAgent, prophet
+from app.services.forecasting import daily_series, holt_winters
+from app.services.sharding import run_sharded, split_shards
+
+
+def backtest_series(
+    values: np.ndarray,
+    last_date: date,
+    horizon: int = 7,
+    min_train: int = 28,
+    refit_interval: int = ProphetAgent.REFIT_INTERVAL_DAYS
+) -> dict:
+    """
+    Rolling-origin backtest of one daily series.
+
+    Every day from `min_train` onwards is a forecast origin: the model is
+    advanced by one day (fully refit every `refit_interval` days, as in
+    production) and its next `horizon` days are compared with the actuals.
+
+    Args:
+        values: Contiguous daily values, oldest first
+        last_date: Date of the final value
+        horizon: Days forecast from each origin
+        min_train: Days of history before the first origin
+        refit_interval: Days between full refits
+
+    Returns:
+        Dict with origins, mape, wape (None if no origin fits) and mean
+        fit/update time per origin in ms
+    """
+    values = np.asarray(values, dtype=np.float64)
+    first_date = last_date - timedelta(days=values.size - 1)
+
+    abs_error = abs_actual = ape_sum = 0.0
+    ape_count = origins = 0
+    fit_seconds = 0.0
+    state = None
+
+    for origin in range(min_train, values.size - horizon + 1):
+        start = time.perf_counter()
+        if state is None or state.n_obs - state.fitted_n_obs + 1 >= refit_interval:
+            state = holt_winters.fit(values[:origin], first_date + timedelta(days=origin - 1))
+        else:
+            state = holt_winters.update(state, values[origin - 1:origin])
+        fit_seconds += time.perf_counter() - start
+
+        actual = values[origin:origin + horizon]
+        errors = np.abs(holt_winters.forecast(state, horizon) - actual)
+
+        abs_error += float(errors.sum())
+        abs_actual += float(np.abs(actual).sum())
+        nonzero = actual != 0
+        ape_sum += float((errors[nonzero] / np.abs(actual[nonzero])).sum())
+        ape_count += int(nonzero.sum())
+        origins += 1
+
+    return {
+        "origins": origins,
+        "mape": round(ape_sum / ape_count, 4) if ape_count else None,
+        "wape": round(abs_error / abs_actual, 4) if abs_actual > 0 else None,
+        "fit_ms": round(fit_seconds / origins * 1000, 3) if origins else None
+    }
+
+
+def backtest_shard(
+    shard: list[tuple[int, list[tuple[date, float]]]],
+    end: date,
+    horizon: int,
+    min_train: int
+) -> list[dict]:
+    """
+    Backtest one shard of tenants (runs inside a worker process).
+
+    Args:
+        shard: List of (user_id, [(day, value), ...])
+        end: Last complete day of every series
+        horizon: Days forecast from each origin
+        min_train: Days of history before the first origin
+
+    Returns:
+        List of forecast_accuracy rows (tenants without enough history are skipped)
+    """
+    backtested_at = datetime.utcnow()
+    rows = []
+
+    for user_id, points in shard:
+        values, last_date = daily_series(points, end=end)
+        metrics = backtest_series(values, last_date, horizon, min_train) if values.size else {"origins": 0}
+        if not metrics["origins"]:
+            continue
+
+        rows.append({
+            "user_id": user_id,
+            "series": "credits",
+            "backtest_mape": metrics["mape"],
+            "backtest_wape": metrics["wape"],
+            "backtest_origins": metrics["origins"],
+            "backtest_fit_ms": metrics["fit_ms"],
+            "backtested_at": backtested_at
+        })
+
+    return rows
+
+
+class Backtester:
+    """Runs rolling-origin backtests over many tenants with a process pool."""
+
+    async def run(
+        self,
+        db: AsyncSession,
+        user_ids: Optional[list[int]] = None,
+        workers: Optional[int] = None,
+        shard_size: int = 100,
+        horizon: int = 7,
+        min_train: int = 28,
+        on_progress: Optional[Callable[[int, int], None]] = None
+    ) -> dict:
+        """
+        Backtest tenants and write metrics to `forecast_accuracy`.
+
+        Args:
+            db: Database session
+            user_ids: Tenants to backtest (every user if None)
+            workers: Worker processes (CPU count if None or more, 0 = in-process)
+            shard_size: Tenants per shard sent to a worker
+            horizon: Days forecast from each origin
+            min_train: Days of history before the first origin
+            on_progress: Optional callback(done, total)
+
+        Returns:
+            Dict with tenant/origin counts, pooled WAPE/MAPE, elapsed time and throughput
+        """
+        start = time.perf_counter()
+        end = date.today() - timedelta(days=1)
+
+        query = select(User.id).order_by(User.id)
+        if user_ids is not None:
+            query = query.where(User.id.in_(set(user_ids)))
+        user_ids = list((await db.execute(query)).scalars().all())
+
+        results: list[dict] = []
+
+        async def write(rows: list[dict]) -> None:
+            await self._write_metrics(db, rows)
+            results.extend(rows)
+
+        workers = await run_sharded(
+            split_shards(user_ids, shard_size),
+            load=lambda shard_ids: self._load_shard(db, shard_ids, end),
+            compute=backtest_shard,
+            args=(end, horizon, min_train),
+            write=write,
+            workers=workers,
+            name="Backtesting",
+            on_progress=on_progress
+        )
+
+        elapsed = time.perf_counter() - start
+        wapes = [r["backtest_wape"] for r in results if r["backtest_wape"] is not None]
+        mapes = [r["backtest_mape"] for r in results if r["backtest_mape"] is not None]
+
+        return {
+            "tenants": len(user_ids),
+            "backtested": len(results),
+            "origins": sum(r["backtest_origins"] for r in results),
+            "median_wape": round(float(np.median(wapes)), 4) if wapes else None,
+            "median_mape": round(float(np.median(mapes)), 4) if mapes else None,
+            "mean_fit_ms": round(float(np.mean([r["backtest_fit_ms"] for r in results])), 3) if results else None,
+            "workers": workers,
+            "elapsed_seconds": round(elapsed, 3),
+            "tenants_per_hour": round(len(user_ids) / elapsed * 3600, 1) if elapsed > 0 else 0.0
+        }
+
+    async def _load_shard(
+        self,
+        db: AsyncSession,
+        user_ids: list[int],
+        end: date
+    ) -> list[tuple[int, list[tuple[date, float]]]]:
+        """Fetch daily credit totals for a shard, grouped by user."""
+        day = func.date(Transaction.date)
+        result = await db.execute(
+            select(Transaction.user_id, day, func.sum(Transaction.amount))
+            .where(
+                Transaction.user_id.in_(user_ids),
+                Transaction.type == TransactionType.CREDIT,
+                Transaction.date < datetime.combine(end + timedelta(days=1), datetime.min.time())
+            )
+            .group_by(Transaction.user_id, day)
+            .order_by(Transaction.user_id)
+        )
+
+        grouped = {
+            user_id: [(date.fromisoformat(str(d)[:10]), float(total)) for _, d, total in rows]
+            for user_id, rows in groupby(result.all(), key=itemgetter(0))
+        }
+
+        return [(user_id, grouped.get(user_id, [])) for user_id in user_ids]
+
+    async def _write_metrics(self, db: AsyncSession, rows: list[dict]) -> None:
+        """Upsert backtest metrics, leaving live accuracy counters untouched."""
+        if not rows:
+            return
+
+        insert = pg_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+        statement = insert(ForecastAccuracy)
+        statement = statement.on_conflict_do_update(
+            index_elements=[ForecastAccuracy.user_id, ForecastAccuracy.series],
+            set_={
+                column: statement.excluded[column]
+                for column in rows[0]
+                if column.startswith("backtest")
+            }
+        )
+
+        await db.execute(statement, rows)
+        await db.commit()
+
+
+class ForecastTracker:
+    """Stores production forecasts and scores them incrementally against actuals."""
+
+    # Live accuracy replaces the backtest once this many days have been scored
+    MIN_LIVE_DAYS = 7
+
+    async def record_forecast(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        forecast: DemandForecast,
+        series: str = "credits"
+    ) -> None:
+        """
+        Score forecasts whose day has closed, then store the new forecast.
+
+        Only Holt-Winters forecasts are tracked. Each future day keeps the
+        latest forecast issued for it. The caller commits.
+
+        Args:
+            db: Database session
+            user_id: Owner of the series
+            forecast: Forecast just issued
+            series: Name of the forecast series
+        """
+        await self.score_actuals(db, user_id, series)
+
+        if forecast.mode != "ets" or not forecast.predicted_demand:
+            return
+
+        today = date.today()
+        rows = [
+            {
+                "user_id": user_id,
+                "series": series,
+                "target_day": date.fromisoformat(point["date"]),
+                "predicted": point["value"],
+                "issued_on": today
+            }
+            for point in forecast.predicted_demand
+        ]
+
+        insert = pg_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+        statement = insert(ForecastRecord)
+        statement = statement.on_conflict_do_update(
+            index_elements=[ForecastRecord.user_id, ForecastRecord.series, ForecastRecord.target_day],
+            set_={"predicted": statement.excluded.predicted, "issued_on": statement.excluded.issued_on}
+        )
+        await db.execute(statement, rows)
+
+    async def score_actuals(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        series: str = "credits"
+    ) -> int:
+        """
+        Fold closed forecast days into the running live accuracy.
+
+        Scored records are deleted, so each call costs O(newly closed days).
+
+        Returns:
+            Number of forecast days scored
+        """
+        yesterday = date.today() - timedelta(days=1)
+
+        result = await db.execute(
+            select(ForecastRecord.target_day, ForecastRecord.predicted)
+            .where(
+                ForecastRecord.user_id == user_id,
+                ForecastRecord.series == series,
+                ForecastRecord.target_day <= yesterday
+            )
+        )
+        closed = result.all()
+        if not closed:
+            return 0
+
+        actuals: dict[date, float] = defaultdict(float)
+        since = min(target_day for target_day, _ in closed)
+        for day, total in await prophet.load_daily_credits(db, user_id, until=yesterday, since=since):
+            actuals[day] += total
+
+        accuracy = await self._get_or_create(db, user_id, series)
+        for target_day, predicted in closed:
+            actual = actuals.get(target_day, 0.0)
+            accuracy.live_abs_error += abs(predicted - actual)
+            accuracy.live_abs_actual += abs(actual)
+            accuracy.live_count += 1
+
+        await db.execute(
+            delete(ForecastRecord).where(
+                ForecastRecord.user_id == user_id,
+                ForecastRecord.series == series,
+                ForecastRecord.target_day <= yesterday
+            )
+        )
+        await db.flush()
+
+        return len(closed)
+
+    async def get_accuracy(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        series: str = "credits"
+    ) -> Optional[float]:
+        """
+        Precomputed forecast accuracy (1 - WAPE) for the dashboard.
+
+        Uses live accuracy once MIN_LIVE_DAYS have been scored, otherwise
+        the latest backtest.
+
+        Returns:
+            Accuracy in [0, 1], or None if nothing has been measured yet
+        """
+        accuracy = await db.get(ForecastAccuracy, (user_id, series))
+        if accuracy is None:
+            return None
+
+        if accuracy.live_count >= self.MIN_LIVE_DAYS and accuracy.live_abs_actual > 0:
+            wape = accuracy.live_abs_error / accuracy.live_abs_actual
+        elif accuracy.backtest_wape is not None:
+            wape = accuracy.backtest_wape
+        else:
+            return None
+
+        return round(max(0.0, min(1.0, 1 - wape)), 2)
+
+    async def _get_or_create(self, db: AsyncSession, user_id: int, series: str) -> ForecastAccuracy:
+        accuracy = await db.get(ForecastAccuracy, (user_id, series))
+        if accuracy is None:
+            accuracy = ForecastAccuracy(
+                user_id=user_id, series=series, live_abs_error=0.0, live_abs_actual=0.0, live_count=0
+            )
+            db.add(accuracy)
+        return accuracy
+
+
+# Singleton instances
+backtester = Backtester()
+forecast_tracker = ForecastTracker()
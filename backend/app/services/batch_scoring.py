@@ -0,0 +1,145 @@
+"""
+Portfolio Batch Scoring
+Scores many MSMEs at once: transactions are read per shard of user_ids,
+scored by UnderwriterAgent in a process pool and upserted in bulk.
+"""
+import time
+from datetime import datetime
+from itertools import groupby
+from operator import itemgetter
+from typing import Callable, Optional
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.schemas import SpivotScoreRecord, Transaction, User
+from app.services.agents.underwriter import UnderwriterAgent
+from app.services.sharding import run_sharded, split_shards
+
+
+def score_shard(shard: list[tuple[int, list[tuple]]], as_of: datetime) -> list[dict]:
+    """
+    Score one shard of users (runs inside a worker process).
+
+    Args:
+        shard: List of (user_id, [(date, amount, type), ...])
+        as_of: Reference time for revenue growth windows
+
+    Returns:
+        List of score rows ready for upsert
+    """
+    underwriter = UnderwriterAgent()
+    computed_at = datetime.utcnow()
+
+    return [
+        {
+            "user_id": user_id,
+            **underwriter.calculate_from_transactions(transactions, as_of=as_of).model_dump(),
+            "computed_at": computed_at
+        }
+        for user_id, transactions in shard
+    ]
+
+
+class BatchScorer:
+    """Runs UnderwriterAgent over many users with a process pool."""
+
+    async def run(
+        self,
+        db: AsyncSession,
+        user_ids: Optional[list[int]] = None,
+        workers: Optional[int] = None,
+        shard_size: int = 500,
+        on_progress: Optional[Callable[[int, int], None]] = None
+    ) -> dict:
+        """
+        Score users and write results to `spivot_scores`.
+
+        Args:
+            db: Database session
+            user_ids: Users to score (every user if None)
+            workers: Worker processes (CPU count if None or more, 0 = in-process)
+            shard_size: Users per shard sent to a worker
+            on_progress: Optional callback(scored, total)
+
+        Returns:
+            Dict with scored count, shards, workers, elapsed time and throughput
+        """
+        start = time.perf_counter()
+        as_of = datetime.now()
+
+        query = select(User.id).order_by(User.id)
+        if user_ids is not None:
+            query = query.where(User.id.in_(set(user_ids)))
+        user_ids = list((await db.execute(query)).scalars().all())
+
+        scored = 0
+
+        async def write(rows: list[dict]) -> None:
+            nonlocal scored
+            await self._write_scores(db, rows)
+            scored += len(rows)
+
+        shards = split_shards(user_ids, shard_size)
+        workers = await run_sharded(
+            shards,
+            load=lambda shard_ids: self._load_shard(db, shard_ids),
+            compute=score_shard,
+            args=(as_of,),
+            write=write,
+            workers=workers,
+            name="Batch scoring",
+            on_progress=on_progress
+        )
+
+        elapsed = time.perf_counter() - start
+
+        return {
+            "scored": scored,
+            "shards": len(shards),
+            "workers": workers,
+            "elapsed_seconds": round(elapsed, 3),
+            "tenants_per_hour": round(scored / elapsed * 3600, 1) if elapsed > 0 else 0.0
+        }
+
+    async def _load_shard(
+        self,
+        db: AsyncSession,
+        user_ids: list[int]
+    ) -> list[tuple[int, list[tuple]]]:
+        """Fetch (date, amount, type) rows for a shard, grouped by user."""
+        result = await db.execute(
+            select(Transaction.user_id, Transaction.date, Transaction.amount, Transaction.type)
+            .where(Transaction.user_id.in_(user_ids))
+            .order_by(Transaction.user_id)
+        )
+
+        grouped = {
+            user_id: [(date, amount, t_type.value) for _, date, amount, t_type in rows]
+            for user_id, rows in groupby(result.all(), key=itemgetter(0))
+        }
+
+        return [(user_id, grouped.get(user_id, [])) for user_id in user_ids]
+
+    async def _write_scores(self, db: AsyncSession, rows: list[dict]) -> None:
+        """Upsert a batch of score rows in one statement."""
+        if not rows:
+            return
+
+        insert = pg_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+        statement = insert(SpivotScoreRecord)
+        statement = statement.on_conflict_do_update(
+            index_elements=[SpivotScoreRecord.user_id],
+            set_={
+                column: statement.excluded[column]
+                for column in rows[0]
+                if column != "user_id"
+            }
+        )
+
+        await db.execute(statement, rows)
+        await db.commit()
+
+
+# Singleton instance
+batch_scorer = BatchScorer()
@@ -0,0 +1,146 @@
+"""
+In-Process Result Cache
+LRU/TTL cache for agent results keyed on (user, ledger version, agent, params).
+Write paths bump the user's ledger version, so stale entries are never hit
+and simply age out of the LRU.
+"""
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable, Optional
+from pydantic import BaseModel
+from app.core.config import get_settings
+
+
+class LedgerVersions:
+    """Per-user ledger version counters, bumped by every write path."""
+
+    def __init__(self):
+        self._epoch = 0
+        self._versions: dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int) -> tuple[int, int]:
+        """Current (global epoch, user version) for a user."""
+        return self._epoch, self._versions.get(user_id, 0)
+
+    def bump(self, user_id: int) -> None:
+        """Invalidate cached results for one user."""
+        with self._lock:
+            self._versions[user_id] = self._versions.get(user_id, 0) + 1
+
+    def bump_all(self) -> None:
+        """Invalidate cached results for every user (e.g. demo reset)."""
+        with self._lock:
+            self._epoch += 1
+
+
+class ResultCache:
+    """LRU cache bounded by entry count, approximate bytes and TTL."""
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 8 * 1024 * 1024, ttl_seconds: float = 300):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+
+        self._entries: OrderedDict[Hashable, tuple[Any, int, float]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value or None on miss/expiry."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, size, expires_at = entry
+            if expires_at < time.monotonic():
+                self._remove(key)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting least-recently-used entries as needed."""
+        size = self._estimate_size(value)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = (value, size, time.monotonic() + self.ttl_seconds)
+            self._bytes += size
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    async def get_or_compute(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached value, computing and storing it on a miss."""
+        value = self.get(key)
+        if value is None:
+            value = await compute()
+            self.set(key, value)
+        return value
+
+    def clear(self) -> None:
+        """Drop every entry (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        """Hit/miss counters and current size."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl_seconds
+        }
+
+    def _remove(self, key: Hashable) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def _estimate_size(self, value: Any) -> int:
+        """Approximate in-memory size of a cached value."""
+        if isinstance(value, BaseModel):
+            return sys.getsizeof(value) + len(value.model_dump_json())
+        if isinstance(value, (bytes, bytearray, str)):
+            return sys.getsizeof(value)
+        return sys.getsizeof(value) + len(repr(value))
+
+
+def cache_key(user_id: int, agent: str, **params) -> tuple:
+    """Build a cache key for an agent result at the user's current ledger version."""
+    return (user_id, ledger_versions.get(user_id), agent, tuple(sorted(params.items())))
+
+
+settings = get_settings()
+
+# Singleton instances
+ledger_versions = LedgerVersions()
+result_cache = ResultCache(
+    max_entries=settings.cache_max_entries,
+    max_bytes=settings.cache_max_bytes,
+    ttl_seconds=settings.cache_ttl_seconds
+)
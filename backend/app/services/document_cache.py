@@ -0,0 +1,285 @@
+"""
+Document Extraction Dedup
+Repeat uploads skip the model: extractions are stored on the documents row
+keyed by (user, SHA-256 of the file bytes, extraction version), with an
+optional in-memory LRU in front. Concurrent uploads of the same file share
+one model call. Queued uploads (app.services.document_queue) check the cache
+when submitted and have their pending row filled in by the worker.
+"""
+import asyncio
+import time
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import get_settings
+from app.models.schemas import Document, DocumentStatus
+from app.models.pydantic_models import ExtractedDocumentData
+from app.services.agents.visual_eye import visual_eye
+from app.services.cache import ResultCache
+from app.services.uploads import DocumentSource, sha256_hex
+
+# (document id, extraction, model milliseconds, status)
+CacheEntry = tuple[int, ExtractedDocumentData, float, DocumentStatus]
+
+
+class DocumentExtractionCache:
+    """Content-addressed extraction results for Visual Eye."""
+
+    def __init__(self, memory: Optional[ResultCache] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            memory: Optional LRU consulted before the documents table
+        """
+        self.memory = memory
+        self._in_flight: dict[tuple, asyncio.Future] = {}
+
+        self.lookups = 0
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.shared_hits = 0  # Waited for an identical upload already in flight
+        self.model_calls = 0
+        self.text_layer_extractions = 0  # Read locally, no model call
+        self.model_ms = 0.0
+        self.model_ms_saved = 0.0
+
+    async def extract(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        content: DocumentSource,
+        file_name: str,
+        mime_type: str,
+        document_id: Optional[int] = None,
+        profile: Optional[str] = None
+    ) -> tuple[int, ExtractedDocumentData, bool]:
+        """
+        Extract a document, reusing a stored result for identical bytes.
+
+        New extractions are saved as a documents row and committed.
+
+        Args:
+            db: Database session
+            user_id: Uploading user (results are never shared across users)
+            content: File bytes or a seekable binary file
+            file_name: Original file name
+            mime_type: MIME type of the file
+            document_id: Pending row to fill in (a queued upload, already
+                counted by lookup()) instead of adding a new one
+            profile: Extraction profile (default: Visual Eye's); results are
+                only shared within a profile
+
+        Returns:
+            Tuple of (document id, extracted data, served from cache)
+        """
+        if document_id is None:
+            self.lookups += 1
+        version = visual_eye.profile_version(profile)
+        content_hash = await asyncio.to_thread(sha256_hex, content)
+        key = ("document", user_id, content_hash, version)
+
+        entry = self.memory.get(key) if self.memory is not None else None
+        if entry is not None:
+            self.memory_hits += 1
+            return await self._hit(db, entry, document_id, version)
+
+        # After a failed owner, the first waiter to wake takes over the key
+        pending = self._in_flight.get(key)
+        while pending is not None:
+            entry = await asyncio.shield(pending)
+            if entry is not None:
+                self.shared_hits += 1
+                return await self._hit(db, entry, document_id, version)
+            pending = self._in_flight.get(key)
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        entry = None
+        try:
+            entry = await self._lookup(db, user_id, content_hash, version)
+            if entry is not None:
+                self.db_hits += 1
+                return await self._hit(db, entry, document_id, version)
+
+            entry = await self._extract_and_store(
+                db, user_id, content, content_hash, file_name, mime_type, document_id, profile
+            )
+            return entry[0], entry[1], False
+        finally:
+            # Only completed results are shared; waiters get None otherwise and extract on their own
+            completed = entry is not None and entry[3] == DocumentStatus.COMPLETED
+            future.set_result(entry if completed else None)
+            del self._in_flight[key]
+            if completed and self.memory is not None:
+                self.memory.set(key, entry)
+
+    async def lookup(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        content_hash: str,
+        profile: Optional[str] = None
+    ) -> Optional[tuple[int, ExtractedDocumentData]]:
+        """
+        Stored extraction of these bytes, without calling the model.
+
+        Returns:
+            Tuple of (document id, extracted data), or None on a miss
+        """
+        self.lookups += 1
+        version = visual_eye.profile_version(profile)
+        key = ("document", user_id, content_hash, version)
+
+        entry = self.memory.get(key) if self.memory is not None else None
+        if entry is not None:
+            self.memory_hits += 1
+        else:
+            entry = await self._lookup(db, user_id, content_hash, version)
+            if entry is None:
+                return None
+            self.db_hits += 1
+            if self.memory is not None:
+                self.memory.set(key, entry)
+
+        self.model_ms_saved += entry[2]
+        return entry[0], entry[1]
+
+    def stats(self) -> dict:
+        """Hit rate and model time saved."""
+        hits = self.memory_hits + self.db_hits + self.shared_hits
+        return {
+            "lookups": self.lookups,
+            "hits": hits,
+            "hit_rate": round(hits / self.lookups, 4) if self.lookups else 0.0,
+            "memory_hits": self.memory_hits,
+            "db_hits": self.db_hits,
+            "shared_hits": self.shared_hits,
+            "model_calls": self.model_calls,
+            "text_layer_extractions": self.text_layer_extractions,
+            "model_seconds": round(self.model_ms / 1000, 2),
+            "model_seconds_saved": round(self.model_ms_saved / 1000, 2),
+            "extraction_version": visual_eye.extraction_version,
+            "memory": self.memory.stats() if self.memory is not None else None
+        }
+
+    async def _hit(
+        self,
+        db: AsyncSession,
+        entry: CacheEntry,
+        document_id: Optional[int],
+        version: str
+    ) -> tuple[int, ExtractedDocumentData, bool]:
+        """Serve a stored extraction, copying it into the pending row if there is one."""
+        self.model_ms_saved += entry[2]
+        if document_id is None:
+            return entry[0], entry[1], True
+
+        document = await db.get(Document, document_id)
+        document.document_type = entry[1].document_type
+        document.extracted_json = entry[1].model_dump()
+        document.status = entry[3]
+        document.extraction_version = version
+        document.processed_at = datetime.utcnow()
+        await db.commit()
+        return document_id, entry[1], True
+
+    async def _lookup(self, db: AsyncSession, user_id: int, content_hash: str, version: str) -> Optional[CacheEntry]:
+        """Latest completed extraction of these bytes at the current version."""
+        result = await db.execute(
+            select(Document.id, Document.extracted_json, Document.extraction_ms)
+            .where(
+                Document.user_id == user_id,
+                Document.content_hash == content_hash,
+                Document.extraction_version == version,
+                Document.status == DocumentStatus.COMPLETED
+            )
+            .order_by(Document.id.desc())
+            .limit(1)
+        )
+        row = result.first()
+        if row is None or row.extracted_json is None:
+            return None
+
+        return (
+            row.id,
+            ExtractedDocumentData(**row.extracted_json),
+            row.extraction_ms or 0.0,
+            DocumentStatus.COMPLETED
+        )
+
+    async def _extract_and_store(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        content: DocumentSource,
+        content_hash: str,
+        file_name: str,
+        mime_type: str,
+        document_id: Optional[int] = None,
+        profile: Optional[str] = None
+    ) -> CacheEntry:
+        """Call Visual Eye and save the result as a documents row (new, or the pending one)."""
+        start = time.perf_counter()
+        extracted = await visual_eye.process_document(
+            file_content=content,
+            file_name=file_name,
+            mime_type=mime_type,
+            profile=profile
+        )
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        return await self.store(db, user_id, content_hash, file_name, extracted, elapsed_ms, document_id, profile)
+
+    async def store(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        content_hash: str,
+        file_name: str,
+        extracted: ExtractedDocumentData,
+        elapsed_ms: float,
+        document_id: Optional[int] = None,
+        profile: Optional[str] = None
+    ) -> CacheEntry:
+        """
+        Save an extraction as a documents row (new, or the pending one).
+
+        For callers that run Visual Eye themselves (e.g. streaming uploads);
+        later uploads of the same bytes are served from it.
+        """
+        if extracted.extraction_tier == "text":
+            self.text_layer_extractions += 1
+        else:
+            self.model_calls += 1
+            self.model_ms += elapsed_ms
+
+        status = DocumentStatus.COMPLETED if extracted.document_type != "Other" else DocumentStatus.FAILED
+        if document_id is None:
+            document = Document(user_id=user_id, file_url=f"sha256:{content_hash}", file_name=file_name)
+            db.add(document)
+        else:
+            document = await db.get(Document, document_id)
+
+        document.document_type = extracted.document_type
+        document.extracted_json = extracted.model_dump()
+        document.status = status
+        document.content_hash = content_hash
+        document.extraction_version = visual_eye.profile_version(profile)
+        document.extraction_ms = round(elapsed_ms, 1)
+        document.processed_at = datetime.utcnow()
+        await db.commit()
+
+        return document.id, extracted, elapsed_ms, status
+
+
+settings = get_settings()
+
+# Singleton instance
+document_cache = DocumentExtractionCache(
+    memory=ResultCache(
+        max_entries=settings.document_cache_max_entries,
+        max_bytes=settings.document_cache_max_bytes,
+        ttl_seconds=settings.document_cache_ttl_seconds
+    ) if settings.document_cache_memory else None
+)
@@ -0,0 +1,562 @@
+"""
+Asynchronous Document Processing Queue
+Uploads are saved as PENDING documents rows and answered right away. The documents table is the queue: workers claim PENDING rows
+(FOR UPDATE SKIP LOCKED on Postgres, so concurrent workers never take the
+same row), extract them (PROCESSING -> COMPLETED / FAILED) and push each
+status change to subscribers in the same process (the SSE endpoint, which
+also re-reads the row). The queue is bounded, so a deep backlog refuses new
+uploads instead of growing without limit.
+
+Upload bytes are streamed from the spooled request file to S3
+(document_upload_bucket) and the row keeps an s3:// reference; workers
+download it into a spooled file again and delete it once the row is final.
+Without a bucket (local development) the bytes are stored on the row itself,
+so uploads above document_queue_max_row_bytes are refused.
+
+Workers run in one of two places:
+- Inline (local / uvicorn): this process drains the queue after each upload.
+  This does not work on Lambda, which freezes the process once the response
+  is sent, so it is turned off there (DOCUMENT_QUEUE_INLINE=false).
+- Worker invocations (Lambda): lambda_handler.document_worker runs on a
+  schedule and, when document_worker_function is set, is invoked
+  asynchronously after each upload.
+
+Every worker run also sweeps stale rows: uploads PENDING or PROCESSING for
+too long (no worker, or a worker that died mid-extraction) are marked FAILED
+so clients can re-upload them.
+"""
+import asyncio
+import io
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import get_settings
+from app.core.database import AsyncSessionLocal
+from app.models.schemas import Document, DocumentStatus
+from app.models.pydantic_models import ExtractedDocumentData
+from app.services.agents.visual_eye import visual_eye
+from app.services.document_cache import document_cache
+from app.services.uploads import SPOOL_MEMORY_BYTES, DocumentSource, sha256_hex, source_size
+
+TERMINAL_STATUSES = {DocumentStatus.COMPLETED, DocumentStatus.FAILED}
+
+# On shutdown, running extractions get this long to finish before they are cancelled
+STOP_GRACE_SECONDS = 5
+
+
+class QueueFullError(Exception):
+    """The queue is at max depth; retry after `retry_after` seconds."""
+
+    def __init__(self, depth: int, retry_after: int):
+        super().__init__(f"Document queue is full ({depth} waiting)")
+        self.depth = depth
+        self.retry_after = retry_after
+
+
+class ContentTooLargeError(Exception):
+    """The upload is too large to keep on the documents row (no upload bucket)."""
+
+    def __init__(self, size: int, max_bytes: int):
+        super().__init__(f"Document is too large to queue ({size} bytes, max {max_bytes})")
+        self.size = size
+        self.max_bytes = max_bytes
+
+
+class DocumentQueue:
+    """Bounded queue of PENDING documents rows with claim-based workers."""
+
+    def __init__(
+        self,
+        workers: int = 4,
+        max_depth: int = 500,
+        inline: bool = True,
+        worker_function: Optional[str] = None,
+        pending_timeout_seconds: float = 3600,
+        processing_timeout_seconds: float = 1200,
+        upload_bucket: Optional[str] = None,
+        max_row_bytes: int = 5 * 1024 * 1024
+    ):
+        """
+        Initialize the queue (no database access yet).
+
+        Args:
+            workers: Documents extracted at once per process
+            max_depth: Pending uploads allowed (across all processes); more are refused
+            inline: Drain the queue in this process after each upload
+                (not on Lambda: the process is frozen after the response)
+            worker_function: Lambda function invoked asynchronously after
+                each upload to drain the queue (None = schedule only)
+            pending_timeout_seconds: PENDING rows older than this are failed
+            processing_timeout_seconds: PROCESSING rows claimed longer ago
+                than this are failed (their worker died)
+            upload_bucket: S3 bucket for queued upload bytes (None = store
+                them on the documents row)
+            max_row_bytes: Largest upload stored on the row when there is
+                no bucket
+        """
+        self.workers = max(1, workers)
+        self.max_depth = max(1, max_depth)
+        self.inline = inline
+        self.worker_function = worker_function or None
+        self.pending_timeout_seconds = pending_timeout_seconds
+        self.processing_timeout_seconds = processing_timeout_seconds
+        self.upload_bucket = upload_bucket or None
+        self.max_row_bytes = max_row_bytes
+
+        self._drain_task: Optional[asyncio.Task] = None
+        self._drain_again = False
+        self._stopping = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._active: set[int] = set()
+        self._listeners: dict[int, set[asyncio.Queue]] = {}
+        self._lambda = None
+        self._s3 = None
+
+        self.depth = 0  # Pending rows when last counted
+        self.submitted = 0
+        self.cached = 0
+        self.rejected = 0
+        self.completed = 0
+        self.failed = 0
+        self.swept = 0
+        self.wait_ms = 0.0
+        self.process_ms = 0.0
+
+    async def submit(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        source: DocumentSource,
+        file_name: str,
+        mime_type: str,
+        profile: Optional[str] = None
+    ) -> tuple[int, DocumentStatus, Optional[ExtractedDocumentData], int]:
+        """
+        Queue a document for extraction, or answer from the dedup cache.
+
+        The content is streamed to the upload bucket, or stored on the
+        documents row (at most max_row_bytes) when there is none, so any
+        worker can extract it. It is removed once the row is final.
+
+        Args:
+            db: Database session
+            user_id: Uploading user
+            source: Validated document bytes or binary file (size already checked)
+            file_name: Original file name
+            mime_type: MIME type of the file
+            profile: Extraction profile (default: Visual Eye's)
+
+        Returns:
+            Tuple of (document id, status, extracted data if served from
+            cache, position in the queue)
+
+        Raises:
+            QueueFullError: The queue is at max depth
+            ContentTooLargeError: No upload bucket and the document is
+                larger than max_row_bytes
+        """
+        self.depth = await self._count_pending(db)
+        if self.depth >= self.max_depth:
+            self.rejected += 1
+            raise QueueFullError(self.depth, self._retry_after())
+
+        content_hash = await asyncio.to_thread(sha256_hex, source)
+        cached = await document_cache.lookup(db, user_id, content_hash, profile)
+        if cached is not None:
+            self.cached += 1
+            return cached[0], DocumentStatus.COMPLETED, cached[1], 0
+
+        content, content_url = None, None
+        if self.upload_bucket:
+            content_url = await self._store_upload(user_id, content_hash, source)
+        else:
+            size = source_size(source)
+            if size > self.max_row_bytes:
+                self.rejected += 1
+                raise ContentTooLargeError(size, self.max_row_bytes)
+            content = source
+            if not isinstance(content, bytes):
+                source.seek(0)  # Hashing left it at the end
+                content = await asyncio.to_thread(source.read)
+
+        document = Document(
+            user_id=user_id,
+            file_url=f"sha256:{content_hash}",
+            file_name=file_name,
+            status=DocumentStatus.PENDING,
+            content_hash=content_hash,
+            extraction_version=visual_eye.profile_version(profile),
+            extraction_profile=profile,
+            mime_type=mime_type,
+            content=content,
+            content_url=content_url
+        )
+        db.add(document)
+        await db.commit()
+
+        self.submitted += 1
+        self.depth += 1
+        if self.inline:
+            self._start_drain()
+        if self.worker_function:
+            await self._invoke_worker()
+        return document.id, DocumentStatus.PENDING, None, self.depth
+
+    async def run_worker(self, max_seconds: Optional[float] = None) -> dict:
+        """
+        One worker run: fail stale rows, then extract PENDING documents.
+
+        Args:
+            max_seconds: Stop claiming new documents after this long (claimed
+                ones still finish); None drains until the queue is empty
+
+        Returns:
+            Counts of documents processed and stale rows failed
+        """
+        swept = await self.sweep()
+        deadline = time.monotonic() + max_seconds if max_seconds is not None else None
+        processed = await self.drain(deadline)
+        return {"processed": processed, "swept": swept}
+
+    async def drain(self, deadline: Optional[float] = None) -> int:
+        """
+        Claim and extract PENDING documents, `workers` at a time, until none
+        are left (or the time.monotonic() deadline passes).
+
+        Returns:
+            Documents processed
+        """
+        async def worker() -> int:
+            processed = 0
+            while not self._stopping and (deadline is None or time.monotonic() < deadline):
+                document_id = await self._claim()
+                if document_id is None:
+                    break
+                await self._process(document_id)
+                processed += 1
+            return processed
+
+        return sum(await asyncio.gather(*(worker() for _ in range(self.workers))))
+
+    async def sweep(self) -> int:
+        """
+        Fail uploads stuck PENDING (no worker took them) or PROCESSING (their
+        worker died) for longer than the timeouts.
+
+        Returns:
+            Rows marked FAILED
+        """
+        now = datetime.utcnow()
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                update(Document)
+                .where(or_(
+                    and_(
+                        Document.status == DocumentStatus.PENDING,
+                        Document.created_at < now - timedelta(seconds=self.pending_timeout_seconds)
+                    ),
+                    and_(
+                        Document.status == DocumentStatus.PROCESSING,
+                        Document.claimed_at < now - timedelta(seconds=self.processing_timeout_seconds)
+                    )
+                ))
+                .values(
+                    status=DocumentStatus.FAILED,
+                    extracted_json={"error": "Extraction timed out; please upload the document again"},
+                    processed_at=now,
+                    content=None,
+                    content_url=None  # The bucket's lifecycle rule removes the object
+                )
+            )
+            await db.commit()
+
+        swept = result.rowcount or 0
+        if swept:
+            self.swept += swept
+            print(f"⚠️ Document queue: failed {swept} stale uploads")
+        return swept
+
+    def subscribe(self, document_id: int) -> asyncio.Queue:
+        """Queue that receives status events for one document (unsubscribe when done)."""
+        events: asyncio.Queue = asyncio.Queue()
+        self._listeners.setdefault(document_id, set()).add(events)
+        return events
+
+    def unsubscribe(self, document_id: int, events: asyncio.Queue) -> None:
+        listeners = self._listeners.get(document_id)
+        if listeners is not None:
+            listeners.discard(events)
+            if not listeners:
+                del self._listeners[document_id]
+
+    def start(self) -> None:
+        """Inline mode: drain uploads left PENDING (e.g. by a restart) in the background."""
+        if self.inline:
+            self._start_drain()
+
+    async def stop(self) -> None:
+        """
+        Stop inline workers: no new claims, a short grace period, then running
+        extractions are cancelled and their uploads go back to PENDING.
+        """
+        self._stopping = True
+        if self._drain_task is not None and self._loop is asyncio.get_running_loop():
+            done, _ = await asyncio.wait({self._drain_task}, timeout=STOP_GRACE_SECONDS)
+            if not done:
+                self._drain_task.cancel()
+                await asyncio.gather(self._drain_task, return_exceptions=True)
+
+        if self._active:
+            try:
+                async with AsyncSessionLocal() as db:
+                    await db.execute(
+                        update(Document)
+                        .where(Document.id.in_(self._active), Document.status == DocumentStatus.PROCESSING)
+                        .values(status=DocumentStatus.PENDING, claimed_at=None)
+                    )
+                    await db.commit()
+            except Exception as e:
+                print(f"❌ Could not requeue {len(self._active)} documents: {e}")
+
+        self._drain_task, self._loop = None, None
+        self._active.clear()
+        self._stopping = False
+
+    def stats(self) -> dict:
+        """Queue depth, throughput and average times (this process)."""
+        finished = self.completed + self.failed
+        return {
+            "workers": self.workers,
+            "inline": self.inline,
+            "worker_function": self.worker_function,
+            "upload_bucket": self.upload_bucket,
+            "max_depth": self.max_depth,
+            "depth": self.depth,
+            "processing": len(self._active),
+            "submitted": self.submitted,
+            "cached": self.cached,
+            "rejected": self.rejected,
+            "completed": self.completed,
+            "failed": self.failed,
+            "swept": self.swept,
+            "avg_wait_seconds": round(self.wait_ms / finished / 1000, 3) if finished else 0.0,
+            "avg_process_seconds": round(self.process_ms / finished / 1000, 3) if finished else 0.0,
+            "subscribers": sum(len(listeners) for listeners in self._listeners.values())
+        }
+
+    def _start_drain(self) -> None:
+        """Drain in the background on the running loop (again after the current pass if one is running)."""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._drain_task is not None and not self._drain_task.done():
+            self._drain_again = True
+            return
+
+        self._loop = loop
+        self._drain_task = asyncio.create_task(self._drain_inline(), name="document-drain")
+
+    async def _drain_inline(self) -> None:
+        while True:
+            self._drain_again = False
+            try:
+                await self.drain()
+            except Exception as e:
+                print(f"❌ Document queue drain failed: {e}")
+            if not self._drain_again:
+                return
+
+    async def _invoke_worker(self) -> None:
+        """Start a worker invocation without waiting for it (the schedule covers failures)."""
+        try:
+            if self._lambda is None:
+                import boto3
+                self._lambda = boto3.client("lambda")
+            await asyncio.to_thread(
+                self._lambda.invoke,
+                FunctionName=self.worker_function,
+                InvocationType="Event",
+                Payload=b"{}"
+            )
+        except Exception as e:
+            print(f"⚠️ Document queue: could not invoke {self.worker_function}: {e}")
+
+    def _s3_client(self):
+        if self._s3 is None:
+            import boto3
+            self._s3 = boto3.client("s3")
+        return self._s3
+
+    async def _store_upload(self, user_id: int, content_hash: str, source: DocumentSource) -> str:
+        """Stream an upload to the bucket in chunks; returns its s3:// URL."""
+        key = f"uploads/{user_id}/{content_hash}-{uuid.uuid4().hex}"
+        if isinstance(source, bytes):
+            source = io.BytesIO(source)
+        source.seek(0)
+        await asyncio.to_thread(self._s3_client().upload_fileobj, source, self.upload_bucket, key)
+        return f"s3://{self.upload_bucket}/{key}"
+
+    async def _load_upload(self, content_url: str) -> tempfile.SpooledTemporaryFile:
+        """Download a queued upload into a spooled temp file (caller closes it)."""
+        bucket, key = content_url.removeprefix("s3://").split("/", 1)
+        spooled = tempfile.SpooledTemporaryFile(max_size=SPOOL_MEMORY_BYTES)
+        try:
+            await asyncio.to_thread(self._s3_client().download_fileobj, bucket, key, spooled)
+        except BaseException:
+            spooled.close()
+            raise
+        spooled.seek(0)
+        return spooled
+
+    async def _delete_upload(self, content_url: str) -> None:
+        """Remove a processed upload (the bucket's lifecycle rule covers failures here)."""
+        bucket, key = content_url.removeprefix("s3://").split("/", 1)
+        try:
+            await asyncio.to_thread(self._s3_client().delete_object, Bucket=bucket, Key=key)
+        except Exception as e:
+            print(f"⚠️ Document queue: could not delete {content_url}: {e}")
+
+    async def _count_pending(self, db: AsyncSession) -> int:
+        result = await db.execute(
+            select(func.count()).select_from(Document).where(Document.status == DocumentStatus.PENDING)
+        )
+        return result.scalar() or 0
+
+    def _retry_after(self) -> int:
+        """Seconds until a slot is likely free, from the average processing time."""
+        finished = self.completed + self.failed
+        average = self.process_ms / finished / 1000 if finished else 10.0
+        return max(1, round(average * (self.depth + 1) / self.workers))
+
+    async def _claim(self) -> Optional[int]:
+        """Move the oldest PENDING row to PROCESSING; None when the queue is empty."""
+        async with AsyncSessionLocal() as db:
+            while True:
+                result = await db.execute(
+                    select(Document.id)
+                    .where(Document.status == DocumentStatus.PENDING)
+                    .order_by(Document.id)
+                    .limit(1)
+                    .with_for_update(skip_locked=True)
+                )
+                document_id = result.scalar()
+                if document_id is None:
+                    return None
+
+                # The status check covers databases without row locks (SQLite)
+                claimed = await db.execute(
+                    update(Document)
+                    .where(Document.id == document_id, Document.status == DocumentStatus.PENDING)
+                    .values(status=DocumentStatus.PROCESSING, claimed_at=datetime.utcnow())
+                )
+                await db.commit()
+                if claimed.rowcount:
+                    self._active.add(document_id)
+                    return document_id
+
+    async def _process(self, document_id: int) -> None:
+        """Extract one claimed document, moving its row to a final status."""
+        start = time.perf_counter()
+        self._publish(document_id, DocumentStatus.PROCESSING)
+
+        content_url = None
+        try:
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(
+                    select(
+                        Document.user_id, Document.file_name, Document.mime_type,
+                        Document.extraction_profile, Document.content, Document.content_url,
+                        Document.created_at
+                    ).where(Document.id == document_id)
+                )
+                job = result.one()
+                self.wait_ms += max(0.0, (datetime.utcnow() - job.created_at).total_seconds() * 1000)
+                content_url = job.content_url
+                if content_url is not None:
+                    content = await self._load_upload(content_url)
+                elif job.content is not None:
+                    content = job.content
+                else:
+                    raise ValueError("Upload content is missing")
+
+                try:
+                    _, extracted, cached = await document_cache.extract(
+                        db,
+                        job.user_id,
+                        content=content,
+                        file_name=job.file_name,
+                        mime_type=job.mime_type,
+                        document_id=document_id,
+                        profile=job.extraction_profile
+                    )
+                finally:
+                    if not isinstance(content, bytes):
+                        content.close()
+
+                await db.execute(
+                    update(Document).where(Document.id == document_id).values(content=None, content_url=None)
+                )
+                await db.commit()
+
+            status = DocumentStatus.COMPLETED if extracted.document_type != "Other" else DocumentStatus.FAILED
+            self._count(status, start)
+            self._publish(document_id, status, document_type=extracted.document_type, cached=cached)
+        except asyncio.CancelledError:
+            raise  # stop() returns the row to PENDING
+        except Exception as e:
+            print(f"❌ Document job {document_id} failed: {e}")
+            self._count(DocumentStatus.FAILED, start)
+            await self._fail(document_id, str(e))
+        if content_url is not None:
+            await self._delete_upload(content_url)  # Not on cancel: the row goes back to PENDING
+        self._active.discard(document_id)
+
+    def _count(self, status: DocumentStatus, start: float) -> None:
+        self.process_ms += (time.perf_counter() - start) * 1000
+        if status == DocumentStatus.COMPLETED:
+            self.completed += 1
+        else:
+            self.failed += 1
+
+    async def _fail(self, document_id: int, error: str) -> None:
+        """Record a failure outside the extraction path."""
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(
+                    update(Document)
+                    .where(Document.id == document_id)
+                    .values(
+                        status=DocumentStatus.FAILED,
+                        extracted_json={"error": error},
+                        processed_at=datetime.utcnow(),
+                        content=None,
+                        content_url=None
+                    )
+                )
+                await db.commit()
+        except Exception as e:
+            print(f"❌ Could not record status of document {document_id}: {e}")
+        finally:
+            self._publish(document_id, DocumentStatus.FAILED, error=error)
+
+    def _publish(self, document_id: int, status: DocumentStatus, **fields) -> None:
+        event = {"id": document_id, "status": status.value, **fields}
+        for events in self._listeners.get(document_id, ()):
+            events.put_nowait(event)
+
+
+settings = get_settings()
+
+# Singleton instance
+document_queue = DocumentQueue(
+    workers=settings.document_queue_workers,
+    max_depth=settings.document_queue_max_depth,
+    inline=settings.document_queue_inline,
+    worker_function=settings.document_worker_function,
+    pending_timeout_seconds=settings.document_pending_timeout_seconds,
+    processing_timeout_seconds=settings.document_processing_timeout_seconds,
+    upload_bucket=settings.document_upload_bucket,
+    max_row_bytes=settings.document_queue_max_row_bytes
+)
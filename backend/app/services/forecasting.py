@@ -0,0 +1,281 @@
+"""
+Holt-Winters Forecasting Engine
+Additive level + trend + weekly seasonality (ETS(A,A,A), m=7) in NumPy.
+Fitting evaluates the whole smoothing-parameter grid at once, so a full fit
+is one pass over the series; extrapolation is O(horizon).
+"""
+from datetime import date, timedelta
+from typing import Optional
+import numpy as np
+from pydantic import BaseModel
+
+
+SEASON_LENGTH = 7  # Weekly seasonality, indexed by weekday (Mon=0)
+
+
+class HoltWintersState(BaseModel):
+    """Fitted smoothing parameters plus the filter state after `last_date`."""
+    alpha: float
+    beta: float
+    gamma: float
+    level: float
+    trend: float
+    season: list[float]  # Indexed by weekday
+    last_date: date
+    n_obs: int
+    fitted_n_obs: int  # n_obs at the last full fit
+    sse: float
+    abs_error: float  # Sum of |one-step error|
+    abs_actual: float  # Sum of |actual|
+
+    @property
+    def wape(self) -> float:
+        """In-sample weighted absolute percentage error of one-step forecasts."""
+        return self.abs_error / self.abs_actual if self.abs_actual > 0 else 1.0
+
+
+class HoltWinters:
+    """Additive Holt-Winters with grid-searched smoothing parameters."""
+
+    ALPHAS = (0.05, 0.1, 0.2, 0.35, 0.5, 0.7)
+    BETAS = (0.0, 0.01, 0.05, 0.15)
+    GAMMAS = (0.0, 0.05, 0.15, 0.3)
+
+    # Smaller grid for per-SKU matrices (no trend)
+    MATRIX_ALPHAS = (0.1, 0.3, 0.6)
+    MATRIX_GAMMAS = (0.0, 0.2)
+
+    def fit(self, values: np.ndarray, last_date: date) -> HoltWintersState:
+        """
+        Fit level, trend and weekly seasonality to a daily series.
+
+        Args:
+            values: Contiguous daily values, oldest first
+            last_date: Date of the final value
+
+        Returns:
+            Fitted HoltWintersState
+        """
+        values = np.asarray(values, dtype=np.float64)
+        n = values.size
+        start_weekday = (last_date - timedelta(days=n - 1)).weekday()
+
+        # Classical initialization from the first two seasons (flat if shorter)
+        season0 = np.zeros(SEASON_LENGTH)
+        if n >= 2 * SEASON_LENGTH:
+            level0 = values[:SEASON_LENGTH].mean()
+            trend0 = (values[SEASON_LENGTH:2 * SEASON_LENGTH].mean() - level0) / SEASON_LENGTH
+            for i, value in enumerate(values[:SEASON_LENGTH]):
+                season0[(start_weekday + i) % SEASON_LENGTH] = value - level0
+        else:
+            level0 = values.mean()
+            trend0 = 0.0
+
+        alpha, beta, gamma = (
+            grid.ravel() for grid in np.meshgrid(self.ALPHAS, self.BETAS, self.GAMMAS, indexing="ij")
+        )
+        size = alpha.size
+
+        level, trend, season, sse, abs_error = self._filter(
+            alpha, beta, gamma,
+            np.full(size, level0),
+            np.full(size, trend0),
+            np.repeat(season0[:, None], size, axis=1),
+            values,
+            start_weekday
+        )
+
+        best = int(np.argmin(sse))
+
+        return HoltWintersState(
+            alpha=float(alpha[best]),
+            beta=float(beta[best]),
+            gamma=float(gamma[best]),
+            level=float(level[best]),
+            trend=float(trend[best]),
+            season=season[:, best].tolist(),
+            last_date=last_date,
+            n_obs=n,
+            fitted_n_obs=n,
+            sse=float(sse[best]),
+            abs_error=float(abs_error[best]),
+            abs_actual=float(np.abs(values).sum())
+        )
+
+    def update(self, state: HoltWintersState, values: np.ndarray) -> HoltWintersState:
+        """
+        Advance a fitted state over new days with its smoothing parameters fixed.
+
+        Args:
+            state: Previously fitted state
+            values: Daily values for the days right after `state.last_date`
+
+        Returns:
+            Updated HoltWintersState (O(len(values)))
+        """
+        values = np.asarray(values, dtype=np.float64)
+        if values.size == 0:
+            return state
+
+        level, trend, season, sse, abs_error = self._filter(
+            np.array([state.alpha]),
+            np.array([state.beta]),
+            np.array([state.gamma]),
+            np.array([state.level]),
+            np.array([state.trend]),
+            np.array(state.season)[:, None],
+            values,
+            (state.last_date + timedelta(days=1)).weekday()
+        )
+
+        return state.model_copy(update={
+            "level": float(level[0]),
+            "trend": float(trend[0]),
+            "season": season[:, 0].tolist(),
+            "last_date": state.last_date + timedelta(days=values.size),
+            "n_obs": state.n_obs + values.size,
+            "sse": state.sse + float(sse[0]),
+            "abs_error": state.abs_error + float(abs_error[0]),
+            "abs_actual": state.abs_actual + float(np.abs(values).sum())
+        })
+
+    def forecast(self, state: HoltWintersState, horizon: int) -> np.ndarray:
+        """Extrapolate `horizon` days after `state.last_date` (clipped at zero)."""
+        steps = np.arange(1, horizon + 1)
+        weekdays = (state.last_date.weekday() + steps) % SEASON_LENGTH
+        values = state.level + steps * state.trend + np.asarray(state.season)[weekdays]
+        return np.maximum(values, 0.0)
+
+    def forecast_matrix(
+        self,
+        demand: np.ndarray,
+        last_date: date,
+        horizon: int
+    ) -> np.ndarray:
+        """
+        Forecast many daily series (e.g. one row per SKU) in one vectorized call.
+
+        Uses level + weekly seasonality without trend (noisy per-SKU demand
+        makes trend extrapolation unreliable) and picks alpha/gamma per row
+        from MATRIX_ALPHAS x MATRIX_GAMMAS by in-sample SSE.
+
+        Args:
+            demand: (n_series, n_days) matrix of daily values, oldest day first
+            last_date: Date of the last column
+            horizon: Days to forecast after `last_date`
+
+        Returns:
+            (n_series, horizon) matrix of forecasts (clipped at zero)
+        """
+        demand = np.asarray(demand, dtype=np.float32)
+        n_series, n_days = demand.shape
+        if n_series == 0 or n_days == 0:
+            return np.zeros((n_series, horizon))
+
+        start_weekday = (last_date - timedelta(days=n_days - 1)).weekday()
+
+        alpha, gamma = (
+            grid.ravel().astype(np.float32)[:, None]
+            for grid in np.meshgrid(self.MATRIX_ALPHAS, self.MATRIX_GAMMAS, indexing="ij")
+        )
+        size = alpha.shape[0]
+
+        # Grid-first float32 layout keeps every step on contiguous (grid, series) rows
+        values = np.ascontiguousarray(demand.T)
+        level = np.repeat(values[:SEASON_LENGTH].mean(axis=0)[None, :], size, axis=0)
+        season = np.zeros((SEASON_LENGTH, size, n_series), dtype=np.float32)
+        sse = np.zeros((size, n_series), dtype=np.float32)
+        error = np.empty_like(sse)
+        new_level = np.empty_like(sse)
+
+        # Error-correction form of the level/season recursions, in place
+        for i, value in enumerate(values):
+            seasonal = season[(start_weekday + i) % SEASON_LENGTH]
+
+            np.subtract(value, level, out=error)
+            error -= seasonal
+            sse += error * error
+
+            np.multiply(alpha, error, out=new_level)
+            new_level += level
+
+            np.subtract(value, new_level, out=error)
+            error -= seasonal
+            error *= gamma
+            seasonal += error
+
+            level, new_level = new_level, level
+
+        columns = np.arange(n_series)
+        best = np.argmin(sse, axis=0)
+        level = level[best, columns]
+        season = season[:, best, columns]  # (weekday, series)
+
+        weekdays = (last_date.weekday() + np.arange(1, horizon + 1)) % SEASON_LENGTH
+        return np.maximum(level[:, None] + season[weekdays].T, 0.0).astype(np.float64)
+
+    def _filter(
+        self,
+        alpha: np.ndarray,
+        beta: np.ndarray,
+        gamma: np.ndarray,
+        level: np.ndarray,
+        trend: np.ndarray,
+        season: np.ndarray,
+        values: np.ndarray,
+        start_weekday: int
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Run the smoothing recursions for every parameter set in parallel."""
+        trend = trend.copy()
+        season = season.copy()
+        sse = np.zeros_like(level)
+        abs_error = np.zeros_like(level)
+
+        for i, value in enumerate(values):
+            weekday = (start_weekday + i) % SEASON_LENGTH
+            seasonal = season[weekday]
+
+            error = value - (level + trend + seasonal)
+            sse += error * error
+            abs_error += np.abs(error)
+
+            new_level = alpha * (value - seasonal) + (1 - alpha) * (level + trend)
+            trend = beta * (new_level - level) + (1 - beta) * trend
+            season[weekday] = gamma * (value - new_level) + (1 - gamma) * seasonal
+            level = new_level
+
+        return level, trend, season, sse, abs_error
+
+
+def daily_series(
+    points: list[tuple[date, float]],
+    end: Optional[date] = None
+) -> tuple[np.ndarray, Optional[date]]:
+    """
+    Sum (date, value) points into a contiguous, zero-filled daily series.
+
+    Args:
+        points: (date, value) pairs in any order, duplicates allowed
+        end: Last day of the series (defaults to the latest point)
+
+    Returns:
+        Tuple of (values oldest first, last date) - (empty, None) if no points
+    """
+    if not points:
+        return np.empty(0, dtype=np.float64), end
+
+    start = min(day for day, _ in points)
+    end = end or max(day for day, _ in points)
+    length = (end - start).days + 1
+    if length <= 0:
+        return np.empty(0, dtype=np.float64), end
+
+    offsets = np.array([(day - start).days for day, _ in points], dtype=np.intp)
+    weights = np.array([value for _, value in points], dtype=np.float64)
+    keep = offsets < length
+
+    return np.bincount(offsets[keep], weights=weights[keep], minlength=length), end
+
+
+# Singleton instance
+holt_winters = HoltWinters()
@@ -0,0 +1,142 @@
+"""
+Incremental JSON Field Parser
+Reads a streamed JSON object (e.g. a model completion arriving token by
+token) and reports each top-level field as soon as its value is complete,
+plus each element of top-level arrays as it closes. Text before the opening
+brace (such as a markdown fence) is ignored.
+"""
+import json
+from typing import Any, Optional
+
+
+class JsonFieldStream:
+    """Feed text chunks; get back completed (field, value, is_item) tuples."""
+
+    def __init__(self):
+        self.text = ""
+        self._pos = 0
+        self._depth = 0
+        self._started = False
+        self._in_string = False
+        self._escape = False
+
+        self._expect_key = True
+        self._key: Optional[str] = None
+        self._key_start: Optional[int] = None
+        self._value_start: Optional[int] = None  # Top-level value being read
+        self._in_array = False  # That value is an array
+        self._item_start: Optional[int] = None  # Array element being read
+
+    @property
+    def finished(self) -> bool:
+        """Whether the top-level object has closed."""
+        return self._started and self._depth == 0
+
+    def feed(self, chunk: str) -> list[tuple[str, Any, bool]]:
+        """
+        Add text and return what it completed.
+
+        Returns:
+            List of (field name, value, is_item): is_item is True for an
+            element of the array field (the whole array follows when it closes)
+        """
+        self.text += chunk
+        completed: list[tuple[str, Any, bool]] = []
+        text = self.text
+
+        for i in range(self._pos, len(text)):
+            if self.finished:
+                break
+            c = text[i]
+
+            if not self._started:
+                if c == "{":
+                    self._started, self._depth = True, 1
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    self._close_string(i, completed)
+                continue
+
+            if c in " \t\r\n":
+                continue
+            if c == '"':
+                self._in_string = True
+                self._begin(i)
+            elif c == ":" and self._depth == 1:
+                self._expect_key = False
+            elif c == ",":
+                self._end_scalar(i, completed)
+                if self._depth == 1:
+                    self._expect_key = True
+            elif c in "{[":
+                if self._depth == 1 and c == "[" and self._value_start is None:
+                    self._in_array = True
+                self._begin(i)
+                self._depth += 1
+            elif c in "}]":
+                self._end_scalar(i, completed)
+                self._depth -= 1
+                if self._depth == 2 and self._in_array and self._item_start is not None:
+                    self._emit(self._item_start, i + 1, True, completed)
+                    self._item_start = None
+                elif self._depth == 1 and self._value_start is not None:
+                    self._emit(self._value_start, i + 1, False, completed)
+                    self._value_start, self._in_array = None, False
+            else:
+                self._begin(i)
+
+        self._pos = len(text)
+        return completed
+
+    def _begin(self, i: int) -> None:
+        """Note where a key, value or array element starts (if one is starting)."""
+        if self._depth == 1:
+            if self._expect_key:
+                self._key_start = i
+            elif self._value_start is None:
+                self._value_start = i
+        elif self._depth == 2 and self._in_array and self._item_start is None:
+            self._item_start = i
+
+    def _close_string(self, i: int, completed: list) -> None:
+        """A string ended: it was a key, a string value or a string array element."""
+        if self._depth == 1 and self._expect_key:
+            key = self._decode(self._key_start, i + 1)
+            self._key = key if isinstance(key, str) else None
+        elif self._depth == 1 and self._value_start is not None:
+            self._emit(self._value_start, i + 1, False, completed)
+            self._value_start = None
+        elif self._depth == 2 and self._in_array and self._item_start is not None:
+            self._emit(self._item_start, i + 1, True, completed)
+            self._item_start = None
+
+    def _end_scalar(self, i: int, completed: list) -> None:
+        """A delimiter ends a number or literal (they have no closing character)."""
+        if self._depth == 1 and self._value_start is not None and not self._in_array:
+            self._emit(self._value_start, i, False, completed)
+            self._value_start = None
+        elif self._depth == 2 and self._in_array and self._item_start is not None:
+            self._emit(self._item_start, i, True, completed)
+            self._item_start = None
+
+    def _emit(self, start: int, end: int, is_item: bool, completed: list) -> None:
+        value = self._decode(start, end)
+        if self._key is not None and value is not _INVALID:
+            completed.append((self._key, value, is_item))
+
+    def _decode(self, start: int, end: int) -> Any:
+        try:
+            return json.loads(self.text[start:end])
+        except ValueError:
+            return _INVALID
+
+
+# Marks a value that failed to parse (the final full parse decides)
+_INVALID = object()
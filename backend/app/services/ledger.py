@@ -0,0 +1,154 @@
+"""
+Ledger Balance Snapshots
+Keeps one row per user per day with inflow, outflow and running balance,
+so the Treasurer can read balances in O(days) instead of O(transactions).
+"""
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Iterable, Optional
+from sqlalchemy import select, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.schemas import BalanceSnapshot, Transaction, TransactionType
+
+
+class LedgerService:
+    """Maintains per-user daily balance snapshots."""
+    
+    async def record_transactions(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        transactions: Iterable[tuple[datetime, float, TransactionType]]
+    ) -> None:
+        """
+        Fold new transactions into the user's snapshots.
+        
+        Runs inside the caller's DB transaction; the caller commits.
+        
+        Args:
+            db: Database session
+            user_id: Owner of the transactions
+            transactions: (date, amount, type) tuples
+        """
+        deltas = self._bucket_by_day(transactions)
+        if deltas:
+            await self.apply_daily_deltas(db, user_id, deltas)
+    
+    async def apply_daily_deltas(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        deltas: dict[date, list[float]]
+    ) -> None:
+        """
+        Add per-day [inflow, outflow] deltas and re-roll running balances.
+        
+        Back-dated deltas are handled by recomputing the running balance of
+        every snapshot from the earliest affected day onwards.
+        
+        Args:
+            db: Database session
+            user_id: Owner of the snapshots
+            deltas: Mapping of day -> [inflow, outflow]
+        """
+        first_day = min(deltas)
+        
+        # Balance carried into the earliest affected day
+        result = await db.execute(
+            select(BalanceSnapshot.balance)
+            .where(BalanceSnapshot.user_id == user_id, BalanceSnapshot.day < first_day)
+            .order_by(BalanceSnapshot.day.desc())
+            .limit(1)
+        )
+        running = result.scalar() or 0.0
+        
+        result = await db.execute(
+            select(BalanceSnapshot)
+            .where(BalanceSnapshot.user_id == user_id, BalanceSnapshot.day >= first_day)
+            .order_by(BalanceSnapshot.day)
+            .with_for_update()
+        )
+        snapshots = {s.day: s for s in result.scalars().all()}
+        
+        for day in sorted(snapshots.keys() | deltas.keys()):
+            snapshot = snapshots.get(day)
+            if snapshot is None:
+                snapshot = BalanceSnapshot(user_id=user_id, day=day, inflow=0.0, outflow=0.0)
+                db.add(snapshot)
+            
+            if day in deltas:
+                inflow, outflow = deltas[day]
+                snapshot.inflow += inflow
+                snapshot.outflow += outflow
+            
+            running += snapshot.inflow - snapshot.outflow
+            snapshot.balance = running
+        
+        await db.flush()
+    
+    async def rebuild(
+        self,
+        db: AsyncSession,
+        user_id: Optional[int] = None
+    ) -> dict:
+        """
+        Rebuild snapshots from the transactions table.
+        
+        Args:
+            db: Database session
+            user_id: Only rebuild this user (all users if None)
+            
+        Returns:
+            Dict with user and snapshot counts
+        """
+        query = select(
+            Transaction.user_id, Transaction.date, Transaction.amount, Transaction.type
+        ).order_by(Transaction.user_id)
+        clear = delete(BalanceSnapshot)
+        
+        if user_id is not None:
+            query = query.where(Transaction.user_id == user_id)
+            clear = clear.where(BalanceSnapshot.user_id == user_id)
+        
+        await db.execute(clear)
+        
+        per_user: dict[int, list] = defaultdict(list)
+        result = await db.stream(query)
+        async for uid, t_date, amount, t_type in result:
+            per_user[uid].append((t_date, amount, t_type))
+        
+        snapshot_count = 0
+        for uid, transactions in per_user.items():
+            deltas = self._bucket_by_day(transactions)
+            running = 0.0
+            for day in sorted(deltas):
+                inflow, outflow = deltas[day]
+                running += inflow - outflow
+                db.add(BalanceSnapshot(
+                    user_id=uid, day=day, inflow=inflow, outflow=outflow, balance=running
+                ))
+            snapshot_count += len(deltas)
+        
+        await db.commit()
+        
+        return {"users": len(per_user), "snapshots": snapshot_count}
+    
+    def _bucket_by_day(
+        self,
+        transactions: Iterable[tuple[datetime, float, TransactionType]]
+    ) -> dict[date, list[float]]:
+        """Sum (date, amount, type) tuples into day -> [inflow, outflow]."""
+        deltas: dict[date, list[float]] = defaultdict(lambda: [0.0, 0.0])
+        
+        for t_date, amount, t_type in transactions:
+            bucket = deltas[t_date.date()]
+            if t_type == TransactionType.CREDIT:
+                bucket[0] += abs(amount)
+            elif t_type == TransactionType.DEBIT:
+                bucket[1] += abs(amount)
+        
+        return dict(deltas)
+
+
+# Singleton instance
+ledger = LedgerService()
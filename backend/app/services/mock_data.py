@@ -3,13 +3,18 @@ Mock Data Generator for Spivot Demo
 Generates realistic data for a fictitious Auto Parts Manufacturer.
 """
 import random
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from typing import Optional
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.schemas import (
-    User, Inventory, Transaction, Document, AgentLog,
+    User, Inventory, StockMovement, Transaction, BalanceSnapshot, SpivotScoreRecord, ForecastModel,
+    ForecastRecord, ForecastAccuracy,
+    Document, AgentLog,
     BusinessType, TransactionType, DocumentStatus, AgentSeverity
 )
+from app.core.seeding import seeded_random
+from app.services.ledger import ledger
 
 
 class MockDataGenerator:
@@ -42,7 +47,8 @@ class MockDataGenerator:
     async def generate_demo_data(
         self,
         db: AsyncSession,
-        crisis_mode: bool = False
+        crisis_mode: bool = False,
+        rng: Optional[random.Random] = None
     ) -> dict:
         """
         Generate complete demo dataset.
@@ -50,27 +56,36 @@ class MockDataGenerator:
         Args:
             db: Database session
             crisis_mode: If True, generate crisis scenario (low cash, high demand)
+            rng: Random source (default: seeded from the mode and today's date,
+                so the same request on the same day yields the same data)
             
         Returns:
             Dict with generated record counts
         """
+        rng = rng or seeded_random("demo", crisis_mode, date.today())
+        today = datetime.combine(date.today(), datetime.min.time())
+
         # Create demo user
         user = await self._create_demo_user(db)
         
         # Generate inventory
-        inventory_count = await self._generate_inventory(db, user.id, crisis_mode)
+        inventory_count = await self._generate_inventory(db, user.id, crisis_mode, rng)
+        
+        # Generate stock movement history (per-SKU demand)
+        movement_count = await self._generate_stock_movements(db, user.id, crisis_mode, rng, today)
         
         # Generate transactions
-        transaction_count = await self._generate_transactions(db, user.id, crisis_mode)
+        transaction_count = await self._generate_transactions(db, user.id, crisis_mode, rng, today)
         
         # Generate agent logs
-        logs_count = await self._generate_agent_logs(db, crisis_mode)
+        logs_count = await self._generate_agent_logs(db, crisis_mode, rng, today)
         
         await db.commit()
         
         return {
             "user_id": user.id,
             "inventory_items": inventory_count,
+            "stock_movements": movement_count,
             "transactions": transaction_count,
             "agent_logs": logs_count,
             "mode": "crisis" if crisis_mode else "normal"
@@ -92,7 +107,8 @@ class MockDataGenerator:
         self,
         db: AsyncSession,
         user_id: int,
-        crisis_mode: bool
+        crisis_mode: bool,
+        rng: random.Random
     ) -> int:
         """Generate inventory items."""
         count = 0
@@ -100,11 +116,11 @@ class MockDataGenerator:
         for item in self.INVENTORY_ITEMS:
             # In crisis mode: low stock
             if crisis_mode:
-                qty = random.uniform(10, 50)
-                reorder_level = random.uniform(80, 120)
+                qty = rng.uniform(10, 50)
+                reorder_level = rng.uniform(80, 120)
             else:
-                qty = random.uniform(100, 500)
-                reorder_level = random.uniform(50, 100)
+                qty = rng.uniform(100, 500)
+                reorder_level = rng.uniform(50, 100)
             
             inventory = Inventory(
                 user_id=user_id,
@@ -113,7 +129,7 @@ class MockDataGenerator:
                 qty=round(qty, 2),
                 unit=item["unit"],
                 reorder_level=round(reorder_level, 2),
-                lead_time_days=random.randint(5, 15),
+                lead_time_days=rng.randint(5, 15),
                 unit_cost=item["unit_cost"]
             )
             db.add(inventory)
@@ -121,81 +137,124 @@ class MockDataGenerator:
         
         return count
     
+    async def _generate_stock_movements(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        crisis_mode: bool,
+        rng: random.Random,
+        today: datetime
+    ) -> int:
+        """Generate 60 days of daily consumption per inventory item."""
+        await db.flush()
+        result = await db.execute(select(Inventory).where(Inventory.user_id == user_id))
+        items = result.scalars().all()
+        
+        count = 0
+        for item in items:
+            # Typical usage around reorder_level / 10, higher during a crisis
+            base_usage = item.reorder_level / 10 * (1.5 if crisis_mode else 1.0)
+            
+            for day_offset in range(60, 0, -1):
+                day = (today - timedelta(days=day_offset)).date()
+                weekday_factor = 0.4 if day.weekday() == 6 else 1.0  # Quiet Sundays
+                qty = base_usage * weekday_factor * rng.uniform(0.6, 1.4)
+                
+                db.add(StockMovement(
+                    user_id=user_id,
+                    inventory_id=item.id,
+                    day=day,
+                    qty=-round(qty, 2),
+                    reason="consumption"
+                ))
+                count += 1
+        
+        return count
+    
     async def _generate_transactions(
         self,
         db: AsyncSession,
         user_id: int,
-        crisis_mode: bool
+        crisis_mode: bool,
+        rng: random.Random,
+        today: datetime
     ) -> int:
         """Generate 90 days of transaction history."""
         count = 0
-        base_date = datetime.now() - timedelta(days=90)
+        ledger_entries = []
+        base_date = today - timedelta(days=90)
         
         for day_offset in range(90):
             current_date = base_date + timedelta(days=day_offset)
             
             # Generate 2-5 transactions per day
-            num_transactions = random.randint(2, 5)
+            num_transactions = rng.randint(2, 5)
             
             for _ in range(num_transactions):
                 # Bias towards expenses in crisis mode
                 if crisis_mode:
-                    is_credit = random.random() < 0.3  # 30% income
+                    is_credit = rng.random() < 0.3  # 30% income
                 else:
-                    is_credit = random.random() < 0.45  # 45% income
+                    is_credit = rng.random() < 0.45  # 45% income
                 
                 if is_credit:
-                    category = random.choice(self.INCOME_CATEGORIES)
-                    amount = random.uniform(10000, 150000)
+                    category = rng.choice(self.INCOME_CATEGORIES)
+                    amount = rng.uniform(10000, 150000)
                     t_type = TransactionType.CREDIT
                 else:
-                    category = random.choice(self.EXPENSE_CATEGORIES)
+                    category = rng.choice(self.EXPENSE_CATEGORIES)
                     # Higher expenses in crisis mode
                     if crisis_mode:
-                        amount = random.uniform(15000, 80000)
+                        amount = rng.uniform(15000, 80000)
                     else:
-                        amount = random.uniform(5000, 50000)
+                        amount = rng.uniform(5000, 50000)
                     t_type = TransactionType.DEBIT
                 
                 transaction = Transaction(
                     user_id=user_id,
-                    date=current_date + timedelta(hours=random.randint(8, 18)),
+                    date=current_date + timedelta(hours=rng.randint(8, 18)),
                     amount=round(amount, 2),
                     type=t_type,
                     category=category,
                     description=f"{category} - Auto generated"
                 )
                 db.add(transaction)
+                ledger_entries.append((transaction.date, transaction.amount, t_type))
                 count += 1
         
+        # Keep balance snapshots in step within the same DB transaction
+        await ledger.record_transactions(db, user_id, ledger_entries)
+        
         return count
     
     async def _generate_agent_logs(
         self,
         db: AsyncSession,
-        crisis_mode: bool
+        crisis_mode: bool,
+        rng: random.Random,
+        today: datetime
     ) -> int:
         """Generate recent agent activity logs."""
         count = 0
         agents = ["Visual Eye", "Prophet", "Quartermaster", "Treasurer", "Underwriter"]
         
         # Generate logs for last 7 days
-        base_date = datetime.now() - timedelta(days=7)
+        base_date = today - timedelta(days=7)
         
         for day_offset in range(7):
             current_date = base_date + timedelta(days=day_offset)
             
             for agent in agents:
                 # Generate 1-3 logs per agent per day
-                num_logs = random.randint(1, 3)
+                num_logs = rng.randint(1, 3)
                 
                 for _ in range(num_logs):
-                    action, result, severity = self._generate_agent_action(agent, crisis_mode)
+                    action, result, severity = self._generate_agent_action(agent, crisis_mode, rng)
                     
                     log = AgentLog(
                         timestamp=current_date + timedelta(
-                            hours=random.randint(8, 18),
-                            minutes=random.randint(0, 59)
+                            hours=rng.randint(8, 18),
+                            minutes=rng.randint(0, 59)
                         ),
                         agent_name=agent,
                         action=action,
@@ -210,7 +269,8 @@ class MockDataGenerator:
     def _generate_agent_action(
         self,
         agent: str,
-        crisis_mode: bool
+        crisis_mode: bool,
+        rng: random.Random
     ) -> tuple[str, str, AgentSeverity]:
         """Generate agent-specific action log."""
         if agent == "Visual Eye":
@@ -265,7 +325,7 @@ class MockDataGenerator:
                     ("Credit health good", "Eligible for enhanced credit", AgentSeverity.INFO),
                 ]
         
-        return random.choice(actions)
+        return rng.choice(actions)
     
     async def clear_all_data(self, db: AsyncSession) -> dict:
         """Clear all demo data from database."""
@@ -274,6 +334,12 @@ class MockDataGenerator:
         # Delete in order to respect foreign keys
         await db.execute(delete(AgentLog))
         await db.execute(delete(Document))
+        await db.execute(delete(StockMovement))
+        await db.execute(delete(BalanceSnapshot))
+        await db.execute(delete(SpivotScoreRecord))
+        await db.execute(delete(ForecastModel))
+        await db.execute(delete(ForecastRecord))
+        await db.execute(delete(ForecastAccuracy))
         await db.execute(delete(Transaction))
         await db.execute(delete(Inventory))
         await db.execute(delete(User))
@@ -0,0 +1,103 @@
+"""
+Model Clients for Visual Eye
+The transport between VisualEyeAgent and the model, behind a small
+interface so the agent can be pointed at Bedrock, a local fake endpoint, or
+a test double. Calls are blocking; the agent runs them on its thread pool.
+"""
+import json
+import threading
+from abc import ABC, abstractmethod
+from typing import Iterator, Optional, Union
+import boto3
+from botocore.config import Config
+
+RequestBody = Union[str, bytes, bytearray]
+
+
+class ModelClient(ABC):
+    """Interface: invoke a Claude messages model, whole or streamed."""
+
+    @abstractmethod
+    def invoke(self, model_id: str, body: RequestBody) -> dict:
+        """
+        Send a request body and return the decoded response message.
+
+        Returns:
+            Claude message dict ({"content": [{"type": "text", "text": ...}], ...})
+        """
+
+    @abstractmethod
+    def invoke_stream(self, model_id: str, body: RequestBody) -> Iterator[dict]:
+        """
+        Send a request body and yield the Claude streaming events as they arrive.
+
+        Closing the iterator early should stop reading the response.
+
+        Yields:
+            Event dicts (message_start, content_block_delta, ..., message_stop)
+        """
+
+
+class BedrockModelClient(ModelClient):
+    """Bedrock Runtime via boto3; the boto3 client is created on first use."""
+
+    def __init__(
+        self,
+        region: str,
+        endpoint_url: Optional[str] = None,
+        max_pool_connections: int = 10,
+        read_timeout: float = 120,
+        max_attempts: int = 3
+    ):
+        """
+        Initialize the client (no AWS calls or credential lookups yet).
+
+        Args:
+            region: AWS region
+            endpoint_url: Bedrock Runtime endpoint override (e.g. a local fake)
+            max_pool_connections: HTTP connections kept (match the caller's threads)
+            read_timeout: Seconds to wait for response data
+            max_attempts: Attempts per call, retries included (throttling and
+                5xx are retried with backoff)
+        """
+        self.region = region
+        self.endpoint_url = endpoint_url
+        self.max_pool_connections = max_pool_connections
+        self.read_timeout = read_timeout
+        self.max_attempts = max_attempts
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        """The boto3 bedrock-runtime client, created once across threads."""
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = boto3.client(
+                        "bedrock-runtime",
+                        region_name=self.region,
+                        endpoint_url=self.endpoint_url,
+                        config=Config(
+                            max_pool_connections=self.max_pool_connections,
+                            read_timeout=self.read_timeout,
+                            retries={"mode": "standard", "max_attempts": self.max_attempts}
+                        )
+                    )
+                    print(f"✅ Visual Eye: Bedrock client ready ({self.region})")
+        return self._client
+
+    def invoke(self, model_id: str, body: RequestBody) -> dict:
+        response = self.client.invoke_model(modelId=model_id, body=body)
+        return json.loads(response["body"].read())
+
+    def invoke_stream(self, model_id: str, body: RequestBody) -> Iterator[dict]:
+        response = self.client.invoke_model_with_response_stream(modelId=model_id, body=body)
+        stream = response["body"]
+        try:
+            for event in stream:
+                chunk = event.get("chunk")
+                if chunk is not None:
+                    yield json.loads(chunk["bytes"])
+        finally:
+            stream.close()
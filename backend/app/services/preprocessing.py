@@ -0,0 +1,147 @@
+"""
+Document Preprocessing for OCR
+Shrinks what Visual Eye sends to the model: photos are downscaled and
+recompressed, and multi-page PDFs are split into parts that are extracted
+in parallel and merged back into one result.
+"""
+import io
+from typing import Optional
+from PIL import Image, ImageOps
+from PyPDF2 import PdfReader, PdfWriter
+from app.models.pydantic_models import ExtractedDocumentData
+from app.services.uploads import DocumentSource, source_size
+
+IMAGE_TYPES = {"image/png", "image/jpeg", "image/webp"}
+
+
+class ImageTooLargeError(ValueError):
+    """The image has more pixels than the decode budget allows."""
+
+
+def _open(source: DocumentSource):
+    """File-like view of a document (bytes are wrapped without copying)."""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(source)
+    source.seek(0)
+    return source
+
+
+def downscale_image(
+    source: DocumentSource,
+    max_side: int = 1568,
+    quality: int = 85,
+    max_pixels: int = 50_000_000
+) -> Optional[bytes]:
+    """
+    Fit an image within max_side x max_side and recompress it as JPEG.
+
+    JPEGs are decoded at reduced scale when possible (Image.draft), and
+    EXIF orientation is applied so phone photos arrive upright. Other
+    formats are decoded at full size, so the size (from the header) is
+    checked against max_pixels first.
+
+    Args:
+        source: Image bytes or binary file
+        max_side: Longest edge after scaling, in pixels
+        quality: JPEG quality (1-95)
+        max_pixels: Most pixels decoded (after draft scaling)
+
+    Returns:
+        JPEG bytes, or None if the original is already small enough
+
+    Raises:
+        ImageTooLargeError: If decoding would exceed max_pixels
+    """
+    with Image.open(_open(source)) as image:
+        if max(image.size) <= max_side and image.format == "JPEG":
+            return None
+
+        image.draft("RGB", (max_side, max_side))
+        width, height = image.size
+        if width * height > max_pixels:
+            raise ImageTooLargeError(f"Image of {width}x{height} pixels exceeds the {max_pixels:,} pixel budget")
+
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
+        if image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+
+        output = io.BytesIO()
+        image.save(output, format="JPEG", quality=quality, optimize=True)
+
+    encoded = output.getvalue()
+    return encoded if len(encoded) < source_size(source) else None
+
+
+def split_pdf(source: DocumentSource, pages_per_part: int = 1, max_parts: int = 8) -> list[bytes]:
+    """
+    Split a PDF into smaller PDFs of consecutive pages.
+
+    Args:
+        source: PDF bytes or binary file
+        pages_per_part: Minimum pages per part
+        max_parts: Upper bound on parts (pages per part grows to fit)
+
+    Returns:
+        One PDF per part, in page order (empty if the PDF has one page)
+    """
+    reader = PdfReader(_open(source))
+    page_count = len(reader.pages)
+    if page_count <= 1:
+        return []
+
+    per_part = max(pages_per_part, -(-page_count // max_parts))
+    parts = []
+    for start in range(0, page_count, per_part):
+        writer = PdfWriter()
+        for page in reader.pages[start:start + per_part]:
+            writer.add_page(page)
+
+        output = io.BytesIO()
+        writer.write(output)
+        parts.append(output.getvalue())
+
+    return parts if len(parts) > 1 else []
+
+
+def merge_extractions(parts: list[ExtractedDocumentData]) -> ExtractedDocumentData:
+    """
+    Combine per-part extractions of one document, in page order.
+
+    Header fields come from the first part that has them; totals and tax
+    from the last (they sit at the end of a document); line items and text
+    are concatenated. If any part failed ("Other"), the whole document
+    fails: a result missing pages would look complete.
+    """
+    failed = [n for n, part in enumerate(parts, 1) if part.document_type == "Other"]
+    if failed:
+        reasons = "; ".join(f"part {n}: {parts[n - 1].raw_text or 'no result'}" for n in failed)
+        return ExtractedDocumentData(
+            document_type="Other",
+            raw_text=f"{len(failed)} of {len(parts)} parts failed ({reasons})",
+            extraction_tier=parts[0].extraction_tier,
+            extraction_profile=parts[0].extraction_profile
+        )
+    extracted = parts
+
+    def first(field: str):
+        return next((getattr(p, field) for p in extracted if getattr(p, field) is not None), None)
+
+    def last(field: str):
+        return next((getattr(p, field) for p in reversed(extracted) if getattr(p, field) is not None), None)
+
+    texts = [p.full_text for p in extracted if p.full_text]
+    raw_texts = [p.raw_text for p in extracted if p.raw_text]
+
+    return ExtractedDocumentData(
+        document_type=extracted[0].document_type,
+        vendor_name=first("vendor_name"),
+        date=first("date"),
+        line_items=[item for p in extracted for item in p.line_items],
+        total_amount=last("total_amount"),
+        tax=last("tax"),
+        full_text="\n\n".join(texts) if texts else None,
+        raw_text="\n\n".join(raw_texts) if raw_texts else None,
+        extraction_tier=extracted[0].extraction_tier,
+        extraction_profile=extracted[0].extraction_profile
+    )
@@ -0,0 +1,106 @@
+"""
+Sharded Process-Pool Execution
+Shared by the portfolio jobs (batch scoring, backtesting): ids are split
+into shards, each shard is loaded on the event loop, computed in a worker
+process and written back as soon as it finishes, with at most two shards
+per worker in flight.
+"""
+import asyncio
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, Awaitable, Callable, Optional
+
+
+def split_shards(ids: list[int], shard_size: int) -> list[list[int]]:
+    """Consecutive shards of at most shard_size ids."""
+    return [ids[i:i + shard_size] for i in range(0, len(ids), shard_size)]
+
+
+def create_executor(workers: Optional[int], name: str) -> tuple[Optional[Executor], int]:
+    """
+    Create the process pool.
+
+    Args:
+        workers: Worker processes (CPU count if None or more, 0 = in-process)
+        name: Job name for log messages
+
+    Returns:
+        Tuple of (executor, workers); (None, 0) to run in-process
+    """
+    cpus = os.cpu_count() or 1
+    workers = cpus if workers is None else min(workers, cpus)
+    if workers <= 0:
+        return None, 0
+    try:
+        return ProcessPoolExecutor(max_workers=workers), workers
+    except (OSError, NotImplementedError) as e:
+        # e.g. AWS Lambda has no /dev/shm for multiprocessing primitives
+        print(f"⚠️ {name}: process pool unavailable ({e}), running in-process")
+        return None, 0
+
+
+async def run_sharded(
+    shards: list[list[int]],
+    load: Callable[[list[int]], Awaitable[Any]],
+    compute: Callable[..., list[dict]],
+    args: tuple,
+    write: Callable[[list[dict]], Awaitable[None]],
+    workers: Optional[int],
+    name: str,
+    on_progress: Optional[Callable[[int, int], None]] = None
+) -> int:
+    """
+    Load, compute and write every shard.
+
+    Args:
+        shards: Id shards (see split_shards)
+        load: Coroutine fetching one shard's input
+        compute: Picklable top-level function, compute(shard_input, *args) -> rows
+        args: Extra arguments for compute
+        write: Coroutine storing one shard's rows
+        workers: Worker processes (CPU count if None or more, 0 = in-process)
+        name: Job name for log messages
+        on_progress: Optional callback(ids done, total ids)
+
+    Returns:
+        Worker processes used (0 = in-process)
+    """
+    executor, workers = create_executor(workers, name)
+    total = sum(len(shard) for shard in shards)
+    loop = asyncio.get_running_loop()
+    in_flight: dict[asyncio.Future, int] = {}  # Future -> shard size
+    done = 0
+
+    async def finish(rows: list[dict], size: int) -> None:
+        nonlocal done
+        await write(rows)
+        done += size
+        if on_progress:
+            on_progress(done, total)
+
+    async def drain(return_when) -> None:
+        finished, _ = await asyncio.wait(in_flight, return_when=return_when)
+        for future in finished:
+            await finish(future.result(), in_flight.pop(future))
+
+    try:
+        for shard_ids in shards:
+            shard = await load(shard_ids)
+
+            if executor is None:
+                await finish(compute(shard, *args), len(shard_ids))
+                continue
+
+            in_flight[loop.run_in_executor(executor, compute, shard, *args)] = len(shard_ids)
+
+            # Bound memory: keep at most two shards per worker in flight
+            if len(in_flight) >= workers * 2:
+                await drain(asyncio.FIRST_COMPLETED)
+
+        if in_flight:
+            await drain(asyncio.ALL_COMPLETED)
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    return workers
@@ -0,0 +1,267 @@
+"""
+Local Text-Layer Extraction
+The fast tier in front of the model: machine-generated PDFs carry their
+text, so invoices, receipts and purchase orders can often be read with
+PyPDF2 and deterministic parsers (total, tax, date, vendor, line-item rows)
+in milliseconds. Each result gets a confidence score; low-confidence
+documents and scans (no text layer) are left to the model.
+"""
+import io
+import re
+from datetime import date
+from typing import Optional
+from PyPDF2 import PdfReader
+from app.models.pydantic_models import ExtractedDocumentData
+from app.services.uploads import DocumentSource
+
+# Bump when the parsers change: part of the extraction version (dedup key)
+PARSER_VERSION = 2
+
+# Pages with less text than this are treated as scanned images
+MIN_CHARS_PER_PAGE = 40
+
+# Document types the parsers understand (statements go to the model)
+LOCAL_TYPES = ("Invoice", "Receipt", "Purchase Order")
+
+DOCUMENT_TYPES = [
+    ("Purchase Order", re.compile(r"\bpurchase\s+order\b", re.I)),
+    ("Bank Statement", re.compile(r"\b(?:bank|account)\s+statement\b|\bstatement\s+of\s+account\b", re.I)),
+    ("Invoice", re.compile(r"\binvoice\b|\bbill\s+of\s+supply\b", re.I)),
+    ("Receipt", re.compile(r"\breceipt\b", re.I)),
+]
+
+# Strongest first; the last matching line of the strongest label wins
+TOTAL_LABELS = [
+    re.compile(r"\bgrand\s+total\b", re.I),
+    re.compile(r"\b(?:total\s+)?amount\s+payable\b|\bnet\s+payable\b", re.I),
+    re.compile(r"\b(?:invoice|bill)\s+total\b|\btotal\s+amount\b|\bbalance\s+due\b", re.I),
+    re.compile(r"^(?!.*\b(?:sub\s*-?\s*total|total\s+(?:tax|gst|qty|quantity|items?)|taxable)\b).*\btotal\b", re.I),
+]
+TAX_TOTAL = re.compile(r"\btotal\s+(?:tax|gst)\b|\b(?:gst|tax)\s+amount\b", re.I)
+TAX_LINE = re.compile(r"^\s*(?:cgst|sgst|igst|utgst)\b", re.I)
+DATE_LABEL = re.compile(r"\b(?:invoice|bill|order|receipt)?\s*date[d]?\b", re.I)
+DUE_DATE = re.compile(r"\bdue\s+date\b", re.I)
+VENDOR_LABEL = re.compile(r"^\s*(?:seller|supplier|vendor|from|sold\s+by|billed\s+by)\s*[:\-]\s*(.+?)\s*$", re.I)
+GSTIN = re.compile(r"\b\d{2}[A-Z]{5}\d{4}[A-Z][1-9A-Z]Z[0-9A-Z]\b")
+BUYER_LABEL = re.compile(
+    r"^\s*(?:bill(?:ed)?\s+to|ship(?:ped)?\s+to|sold\s+to|buyer|customer|consignee|recipient)\b", re.I
+)
+# "ORIGINAL FOR RECIPIENT", "Duplicate for Transporter", "Customer Copy"
+COPY_MARKER = re.compile(
+    r"\b(?:original|duplicate|triplicate)\s+(?:for|copy)\b|\b(?:office|customer|buyer|seller)\s+copy\b", re.I
+)
+ADDRESS_LINE = re.compile(r"\b\d{3}\s?\d{3}\b|^\s*(?:plot|shop|flat|door|no\.|#)|\b(?:road|street|nagar|floor)\b", re.I)
+
+# 1,23,456.00 / 123456.5 / ₹ 1,200 (not followed by % or part of a date or code)
+AMOUNT = re.compile(
+    r"(?<![\w./-])(?:₹|Rs\.?|INR)?\s?(\d{1,3}(?:,\d{2,3})+(?:\.\d{1,2})?|\d+(?:\.\d{1,2})?)(?![\w/%-]|\.\d|\s*%)"
+)
+
+MONTHS = {m: i + 1 for i, m in enumerate(
+    ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"]
+)}
+MONTH = r"(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?"
+DATE_PATTERNS = [
+    (re.compile(r"\b(\d{4})-(\d{2})-(\d{2})\b"), ("y", "m", "d")),
+    (re.compile(r"\b(\d{1,2})[/.\-](\d{1,2})[/.\-](\d{4}|\d{2})\b"), ("d", "m", "y")),  # Indian day-first
+    (re.compile(rf"\b(\d{{1,2}})(?:st|nd|rd|th)?[\s\-]+{MONTH}[\s\-,]+(\d{{4}})\b", re.I), ("d", "b", "y")),
+    (re.compile(rf"\b{MONTH}\s+(\d{{1,2}}),?\s+(\d{{4}})\b", re.I), ("b", "d", "y")),
+]
+
+SERIAL = re.compile(r"^\s*\d{1,3}[.)]?\s+")
+TRAILING_CODE = re.compile(r"(?:\s+\d{4,8})+\s*$")  # HSN/SAC codes
+
+
+def pdf_text(source: DocumentSource, max_pages: int) -> Optional[str]:
+    """
+    Text layer of a PDF, page by page.
+
+    Returns:
+        The text, or None if the PDF has more than max_pages pages or looks
+        scanned (too little text per page)
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = io.BytesIO(source)
+    source.seek(0)
+
+    reader = PdfReader(source)
+    if len(reader.pages) > max_pages:
+        return None
+
+    pages = [page.extract_text() or "" for page in reader.pages]
+    if any(len(text.strip()) < MIN_CHARS_PER_PAGE for text in pages):
+        return None
+    return "\n".join(pages)
+
+
+def parse_document_text(text: str) -> tuple[ExtractedDocumentData, float]:
+    """
+    Read document fields from plain text with deterministic parsers.
+
+    Returns:
+        Tuple of (extracted data, confidence 0-1). Confidence adds up what
+        was found and whether line items reconcile with the total.
+    """
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    vendor, vendor_anchored = _vendor(lines)
+
+    document_type = next((name for name, pattern in DOCUMENT_TYPES if pattern.search(text)), None)
+    total = _labelled_amount(lines, TOTAL_LABELS)
+    tax = _tax(lines)
+    line_items = _line_items(lines)
+    extracted = ExtractedDocumentData(
+        document_type=document_type or "Other",
+        vendor_name=vendor,
+        date=_date(lines),
+        line_items=line_items,
+        total_amount=total,
+        tax=tax,
+        full_text=text,
+        extraction_tier="text"
+    )
+
+    if document_type not in LOCAL_TYPES or total is None:
+        return extracted, 0.0
+
+    confidence = 0.4  # Known type with a total
+    confidence += 0.15 if extracted.date else 0.0
+    confidence += 0.15 if vendor_anchored else 0.0  # A guessed top line earns nothing
+    confidence += 0.05 if GSTIN.search(text) else 0.0
+    if line_items:
+        confidence += 0.1
+        items_total = sum(item["total"] for item in line_items)
+        if any(abs(items_total - target) <= max(1.0, 0.005 * total) for target in (total, total - (tax or 0))):
+            confidence += 0.15
+    return extracted, round(confidence, 2)
+
+
+def _amount(value: str) -> float:
+    return float(value.replace(",", ""))
+
+
+def _amounts(line: str) -> list[tuple[float, int]]:
+    """(amount, start position) for each number on a line."""
+    return [(_amount(m.group(1)), m.start(1)) for m in AMOUNT.finditer(line)]
+
+
+def _labelled_amount(lines: list[str], labels: list[re.Pattern]) -> Optional[float]:
+    """Last amount on the last line carrying the strongest label present."""
+    for label in labels:
+        for line in reversed(lines):
+            if label.search(line):
+                amounts = _amounts(line)
+                if amounts:
+                    return amounts[-1][0]
+    return None
+
+
+def _tax(lines: list[str]) -> Optional[float]:
+    """Total tax line, else the sum of CGST/SGST/IGST lines."""
+    total = _labelled_amount(lines, [TAX_TOTAL])
+    if total is not None:
+        return total
+
+    components = [_amounts(line) for line in lines if TAX_LINE.search(line)]
+    components = [amounts[-1][0] for amounts in components if amounts]
+    return round(sum(components), 2) if components else None
+
+
+def _date(lines: list[str]) -> Optional[str]:
+    """Date on the first (non due-date) date line, else the first date anywhere (YYYY-MM-DD)."""
+    labelled = [line for line in lines if DATE_LABEL.search(line) and not DUE_DATE.search(line)]
+    for line in labelled + lines:
+        found = _parse_date(line)
+        if found:
+            return found
+    return None
+
+
+def _parse_date(line: str) -> Optional[str]:
+    for pattern, order in DATE_PATTERNS:
+        for match in pattern.finditer(line):
+            parts = dict(zip(order, match.groups()))
+            try:
+                year = int(parts["y"])
+                year += 2000 if year < 100 else 0
+                month = MONTHS[parts["b"][:3].lower()] if "b" in parts else int(parts["m"])
+                return date(year, month, int(parts["d"])).isoformat()
+            except (ValueError, KeyError):
+                continue
+    return None
+
+
+def _vendor(lines: list[str]) -> tuple[Optional[str], bool]:
+    """
+    Seller name: labelled, else the name above the first seller GSTIN, else
+    the first name-like line at the top (copy markers and buyer blocks skipped).
+
+    Returns:
+        Tuple of (vendor name, whether it was labelled or GSTIN-anchored)
+    """
+    for line in lines:
+        match = VENDOR_LABEL.match(line)
+        if match:
+            return match.group(1), True
+
+    buyer = _buyer_lines(lines)
+    candidates = [i for i in range(len(lines)) if i not in buyer and _is_name(lines[i])]
+
+    gstin_line = next((i for i, line in enumerate(lines) if i not in buyer and GSTIN.search(line)), None)
+    if gstin_line is not None:
+        # Name on the GSTIN line itself ("Sharma Steel Traders GSTIN: ..."), else the nearest one above
+        before = lines[gstin_line][:GSTIN.search(lines[gstin_line]).start()]
+        before = re.sub(r"\bGSTIN\b.*$", "", before, flags=re.I).strip(" :-|,")
+        if _is_name(before):
+            return before, True
+        above = [i for i in candidates if gstin_line - 4 <= i < gstin_line and not ADDRESS_LINE.search(lines[i])]
+        if above:
+            return lines[above[-1]], True
+
+    top = [i for i in candidates if i < 8]
+    return (lines[top[0]], False) if top else (None, False)
+
+
+def _is_name(line: str) -> bool:
+    """Mostly letters, not a title, label or copy marker."""
+    if any(pattern.search(line) for _, pattern in DOCUMENT_TYPES) or ":" in line or COPY_MARKER.search(line):
+        return False
+    letters = sum(c.isalpha() for c in line)
+    return letters >= 3 and letters >= 0.6 * len(line.replace(" ", ""))
+
+
+def _buyer_lines(lines: list[str]) -> set[int]:
+    """Indexes of "Bill To" / buyer blocks: the label and up to 3 lines after it, through its GSTIN."""
+    buyer = set()
+    for i, line in enumerate(lines):
+        if not BUYER_LABEL.match(line):
+            continue
+        for j in range(i, min(i + 4, len(lines))):
+            if j > i and (VENDOR_LABEL.match(lines[j]) or BUYER_LABEL.match(lines[j])):
+                break
+            buyer.add(j)
+            if GSTIN.search(lines[j]):
+                break
+    return buyer
+
+
+def _line_items(lines: list[str]) -> list[dict]:
+    """Rows whose numbers contain quantity x unit price = amount, with a description before them."""
+    items = []
+    for line in lines:
+        if any(label.search(line) for label in TOTAL_LABELS) or TAX_LINE.search(line):
+            continue
+        amounts = _amounts(line)
+        for i in range(len(amounts) - 2):
+            quantity, rate = amounts[i][0], amounts[i + 1][0]
+            # The amount column is next to the rate, or last (after tax columns)
+            for total, _ in (amounts[i + 2], amounts[-1]):
+                if quantity > 0 and total > 0 and abs(quantity * rate - total) <= max(0.01, 0.005 * total):
+                    break
+            else:
+                continue
+
+            description = TRAILING_CODE.sub("", SERIAL.sub("", line[:amounts[i][1]])).strip(" -|")
+            if sum(c.isalpha() for c in description) >= 2:
+                items.append({"description": description, "quantity": quantity, "unit_price": rate, "total": total})
+            break
+    return items
@@ -0,0 +1,128 @@
+"""
+Low-Copy Document Upload Helpers
+Uploads stay in spooled temp files (disk beyond a small threshold). They
+are type-checked from their magic bytes, hashed in chunks, and base64-encoded
+straight into the single buffer that becomes the Bedrock request body.
+"""
+import binascii
+import hashlib
+import tempfile
+from typing import BinaryIO, Optional, Union
+
+# Multiple of 3, so chunks base64-encode without padding in between
+CHUNK_SIZE = 3 * 64 * 1024
+
+# Uploads larger than this go to disk instead of memory
+SPOOL_MEMORY_BYTES = 1024 * 1024
+
+DocumentSource = Union[bytes, BinaryIO]
+
+
+def sniff_mime_type(head: bytes) -> Optional[str]:
+    """
+    Identify a document from its first bytes (at least 12).
+
+    Returns:
+        MIME type for PDF, PNG, JPEG, WEBP or ZIP, else None
+    """
+    if head.startswith(b"%PDF-"):
+        return "application/pdf"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if head.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    if head.startswith(b"PK\x03\x04"):
+        return "application/zip"
+    return None
+
+
+def spool(source: BinaryIO, max_bytes: int) -> Optional[tempfile.SpooledTemporaryFile]:
+    """
+    Copy a stream into a spooled temp file, giving up past max_bytes.
+
+    Returns:
+        Spooled file positioned at 0 (caller closes it), or None if too large
+    """
+    spooled = tempfile.SpooledTemporaryFile(max_size=SPOOL_MEMORY_BYTES)
+    copied = 0
+    while chunk := source.read(CHUNK_SIZE):
+        copied += len(chunk)
+        if copied > max_bytes:
+            spooled.close()
+            return None
+        spooled.write(chunk)
+
+    spooled.seek(0)
+    return spooled
+
+
+def read_head(source: DocumentSource, size: int = 16) -> bytes:
+    """First bytes of a document (file position is restored)."""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return bytes(source[:size])
+    position = source.tell()
+    head = source.read(size)
+    source.seek(position)
+    return head
+
+
+def source_size(source: DocumentSource) -> int:
+    """Size in bytes without reading the content."""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return len(source)
+    position = source.tell()
+    size = source.seek(0, 2)
+    source.seek(position)
+    return size
+
+
+def iter_chunks(source: DocumentSource, chunk_size: int = CHUNK_SIZE):
+    """Yield the document in chunks: memoryview slices for bytes, reads for files."""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        view = memoryview(source)
+        for start in range(0, len(view), chunk_size):
+            yield view[start:start + chunk_size]
+        return
+
+    source.seek(0)
+    while chunk := source.read(chunk_size):
+        yield chunk
+
+
+def sha256_hex(source: DocumentSource) -> str:
+    """SHA-256 of the document, hashed chunk by chunk."""
+    digest = hashlib.sha256()
+    for chunk in iter_chunks(source):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def base64_body(prefix: bytes, source: DocumentSource, suffix: bytes) -> bytearray:
+    """
+    Build prefix + base64(document) + suffix in one preallocated buffer.
+
+    The only full-size allocation is the returned body (~1.33x the document).
+    """
+    size = source_size(source)
+    encoded_size = 4 * ((size + 2) // 3)
+    body = bytearray(len(prefix) + encoded_size + len(suffix))
+    body[:len(prefix)] = prefix
+
+    position = len(prefix)
+    carry = b""  # Bytes left over from a short read (padding may only come last)
+    for chunk in iter_chunks(source):
+        if carry or len(chunk) % 3:
+            chunk = carry + bytes(chunk)
+            cut = len(chunk) - len(chunk) % 3
+            chunk, carry = chunk[:cut], chunk[cut:]
+        encoded = binascii.b2a_base64(chunk, newline=False)
+        body[position:position + len(encoded)] = encoded
+        position += len(encoded)
+
+    encoded = binascii.b2a_base64(carry, newline=False)
+    body[position:position + len(encoded)] = encoded
+    body[position + len(encoded):] = suffix
+    return body
+
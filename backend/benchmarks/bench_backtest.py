@@ -0,0 +1,66 @@
+"""
+Benchmark - Prophet rolling-origin backtest (forecast speed and quality)
+
+Run from the backend directory:
+    python -m benchmarks.bench_backtest
+    python -m benchmarks.bench_backtest --tenants 2000 --days 365 --workers 0 4
+"""
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+
+import numpy as np
+
+from app.services.backtesting import backtest_shard
+
+
+def synthetic_tenants(count: int, days: int, rng: np.random.Generator) -> list:
+    """Daily revenue with level, trend, weekly season and noise per tenant."""
+    end = date.today() - timedelta(days=1)
+    weekly = np.array([1.0, 1.05, 1.1, 1.0, 1.25, 0.8, 0.5])
+    tenants = []
+    for user_id in range(count):
+        level = rng.uniform(20_000, 200_000)
+        trend = rng.normal(0, level / 2000)
+        noise = rng.uniform(0.05, 0.4)
+        season = np.resize(np.roll(weekly, (end - timedelta(days=days - 1)).weekday()), days)
+        values = (level + trend * np.arange(days)) * season * rng.normal(1, noise, days)
+        tenants.append((user_id, [
+            (end - timedelta(days=days - 1 - i), float(max(v, 0))) for i, v in enumerate(values)
+        ]))
+    return tenants
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tenants", type=int, default=500)
+    parser.add_argument("--days", type=int, default=180, help="Days of history per tenant")
+    parser.add_argument("--horizon", type=int, default=7)
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, 2, 4])
+    parser.add_argument("--shard-size", type=int, default=50)
+    args = parser.parse_args()
+
+    tenants = synthetic_tenants(args.tenants, args.days, np.random.default_rng(42))
+    end = date.today() - timedelta(days=1)
+    shards = [tenants[i:i + args.shard_size] for i in range(0, len(tenants), args.shard_size)]
+
+    print(f"{'workers':>8} {'seconds':>8} {'tenants/s':>10} {'ms/fit':>8} {'med WAPE':>9} {'med MAPE':>9}")
+    for workers in args.workers:
+        start = time.perf_counter()
+        if workers == 0:
+            rows = [row for shard in shards for row in backtest_shard(shard, end, args.horizon, 28)]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(backtest_shard, shard, end, args.horizon, 28) for shard in shards]
+                rows = [row for future in futures for row in future.result()]
+        elapsed = time.perf_counter() - start
+
+        print(f"{workers:>8} {elapsed:>8.2f} {len(tenants) / elapsed:>10.1f} "
+              f"{np.mean([r['backtest_fit_ms'] for r in rows]):>8.3f} "
+              f"{np.median([r['backtest_wape'] for r in rows]):>9.4f} "
+              f"{np.median([r['backtest_mape'] for r in rows]):>9.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark - POST /documents/upload/batch wall time vs concurrency
+
+Streams a batch of distinct documents through the endpoint (served by
+uvicorn on a local port) against a local fake Bedrock and compares wall
+time with ceil(n / concurrency) x latency. Uses a throwaway SQLite database.
+
+Run from the backend directory:
+    python -m benchmarks.bench_document_batch
+    python -m benchmarks.bench_document_batch --documents 100 --latency 0.2 --concurrency 1 5 10
+"""
+import argparse
+import json
+import math
+import os
+import socket
+import tempfile
+import threading
+import time
+
+import httpx
+import uvicorn
+
+from benchmarks.fake_bedrock import FakeBedrock
+
+
+def serve(app) -> tuple[uvicorn.Server, str]:
+    """Run the app with uvicorn in a background thread."""
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, f"http://127.0.0.1:{port}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=40)
+    parser.add_argument("--latency", type=float, default=0.25, help="Fake Bedrock response time (seconds)")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8, 16])
+    args = parser.parse_args()
+
+    with FakeBedrock(latency=args.latency) as fake, tempfile.TemporaryDirectory() as tmp:
+        # Settings are read at import, so configure before importing the app
+        os.environ.update(
+            DATABASE_URL=f"sqlite+aiosqlite:///{tmp}/bench.db",
+            BEDROCK_ENDPOINT_URL=fake.url,
+            BEDROCK_MAX_CONCURRENCY=str(max(args.concurrency)),
+            OCR_PREPROCESS="false",  # Placeholder documents, not real images
+            AWS_ACCESS_KEY_ID=os.environ.get("AWS_ACCESS_KEY_ID", "fake"),
+            AWS_SECRET_ACCESS_KEY=os.environ.get("AWS_SECRET_ACCESS_KEY", "fake")
+        )
+        from app.main import app
+
+        server, url = serve(app)
+        print(f"{'conc':>5} {'docs':>5} {'ok':>4} {'first (s)':>10} {'wall (s)':>9} {'ideal (s)':>10} {'peak at server':>15}")
+        with httpx.Client(base_url=url, timeout=600) as client:
+            client.post("/demo/reset")
+            for concurrency in args.concurrency:
+                fake.max_in_flight = 0
+                files = [
+                    ("files", (f"invoice-{concurrency}-{i}.png", b"\x89PNG\r\n\x1a\n" + f"{concurrency}-{i}".encode(), "image/png"))
+                    for i in range(args.documents)
+                ]
+
+                start = time.perf_counter()
+                first = None
+                lines = []
+                with client.stream("POST", f"/documents/upload/batch?concurrency={concurrency}", files=files) as response:
+                    for line in response.iter_lines():
+                        if line:
+                            first = first or time.perf_counter() - start
+                            lines.append(json.loads(line))
+                elapsed = time.perf_counter() - start
+
+                summary = lines[-1]
+                ideal = math.ceil(args.documents / concurrency) * args.latency
+                print(f"{concurrency:>5} {args.documents:>5} {summary['completed']:>4} {first:>10.2f} "
+                      f"{elapsed:>9.2f} {ideal:>10.2f} {fake.max_in_flight:>15}")
+
+        server.should_exit = True
+
+
+if __name__ == "__main__":
+    main()
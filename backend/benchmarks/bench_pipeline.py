@@ -0,0 +1,185 @@
+"""
+Benchmark - document upload pipeline under load against a local fake Bedrock
+
+Drives the app in-process (httpx over ASGI, one event loop) with a closed
+loop of N concurrent clients, each uploading distinct documents back to
+back, and reports throughput, end-to-end latency p50/p99 and event-loop lag
+(how late a 10 ms timer wakes up, sampled throughout). Nothing leaves the
+machine: the model is FakeBedrock, with optional jitter, errors, throttling
+and malformed output. Uses a throwaway SQLite database.
+
+Pipelines:
+    queue   POST /documents/upload (202), then wait for the final status event
+    stream  POST /documents/upload/stream, read to the last NDJSON line
+
+Run from the backend directory:
+    python -m benchmarks.bench_pipeline
+    python -m benchmarks.bench_pipeline --pipeline stream --concurrency 4 16 64 --documents 200
+    python -m benchmarks.bench_pipeline --jitter 0.5 --error-rate 0.05 --throttle-above 6 --truncated 0.1
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.fake_bedrock import FakeBedrock
+
+TICK = 0.01
+FINAL = {"completed", "failed"}
+
+
+async def sample_lag(stop: asyncio.Event, lags: list[float]) -> None:
+    """Record how late each 10 ms sleep wakes up."""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(TICK)
+        lags.append(loop.time() - start - TICK)
+
+
+def document(n: int) -> bytes:
+    return b"\x89PNG\r\n\x1a\n" + f"benchmark document {n}".encode() * 200
+
+
+async def queued_upload(client, n: int) -> tuple[str, float]:
+    """Upload through the queue and wait for the final status; returns (status, seconds to 202)."""
+    from app.services.document_queue import document_queue
+
+    start = time.perf_counter()
+    response = await client.post("/documents/upload", files={"file": (f"doc-{n}.png", document(n), "image/png")})
+    accepted = time.perf_counter() - start
+    if response.status_code == 200:
+        return response.json()["status"], accepted
+    if response.status_code != 202:
+        return "failed", accepted
+
+    # Same order as the SSE endpoint: subscribe, then read the current status
+    document_id = response.json()["id"]
+    events = document_queue.subscribe(document_id)
+    try:
+        status = (await client.get(f"/documents/{document_id}")).json()["status"]
+        while status not in FINAL:
+            status = (await events.get())["status"]
+    finally:
+        document_queue.unsubscribe(document_id, events)
+    return status, accepted
+
+
+async def streamed_upload(client, n: int) -> tuple[str, float]:
+    """Upload through the streaming endpoint; returns (status, seconds to response)."""
+    start = time.perf_counter()
+    response = await client.post("/documents/upload/stream", files={"file": (f"doc-{n}.png", document(n), "image/png")})
+    accepted = time.perf_counter() - start
+    lines = [line for line in response.text.splitlines() if line]
+    return (json.loads(lines[-1]).get("status", "failed") if lines else "failed"), accepted
+
+
+async def run_level(client, pipeline: str, concurrency: int, documents: int, first: int) -> dict:
+    upload = queued_upload if pipeline == "queue" else streamed_upload
+    latencies, accepts, statuses = [], [], []
+    next_document = iter(range(first, first + documents))
+
+    async def user():
+        for n in next_document:
+            start = time.perf_counter()
+            status, accepted = await upload(client, n)
+            latencies.append(time.perf_counter() - start)
+            accepts.append(accepted)
+            statuses.append(status)
+
+    stop = asyncio.Event()
+    lags: list[float] = []
+    sampler = asyncio.create_task(sample_lag(stop, lags))
+    start = time.perf_counter()
+    await asyncio.gather(*(user() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await sampler
+
+    return {
+        "elapsed": elapsed,
+        "latencies": np.array(latencies),
+        "accepts": np.array(accepts),
+        "ok": statuses.count("completed"),
+        "lags_ms": np.array(lags or [0.0]) * 1000,
+    }
+
+
+async def run(args, fake: FakeBedrock) -> None:
+    import httpx
+    from app.core.database import init_db
+    from app.main import app
+
+    await init_db()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=600) as client:
+        await client.post("/demo/reset")
+
+        print(f"{'pipeline':>8} {'conc':>5} {'docs':>5} {'ok':>5} {'docs/s':>7} {'p50 (s)':>8} {'p99 (s)':>8} "
+              f"{'accept p99':>11} {'lag p50 (ms)':>13} {'lag p99 (ms)':>13} {'lag max (ms)':>13} "
+              f"{'model reqs':>11} {'throttled':>10} {'5xx':>5}")
+        first = 0
+        for concurrency in args.concurrency:
+            before = fake.stats()
+            result = await run_level(client, args.pipeline, concurrency, args.documents, first)
+            after = fake.stats()
+            first += args.documents
+
+            latencies, lags = result["latencies"], result["lags_ms"]
+            print(f"{args.pipeline:>8} {concurrency:>5} {args.documents:>5} {result['ok']:>5} "
+                  f"{args.documents / result['elapsed']:>7.1f} {np.percentile(latencies, 50):>8.2f} "
+                  f"{np.percentile(latencies, 99):>8.2f} {np.percentile(result['accepts'], 99):>11.3f} "
+                  f"{np.percentile(lags, 50):>13.1f} {np.percentile(lags, 99):>13.1f} {lags.max():>13.1f} "
+                  f"{after['requests'] - before['requests']:>11} {after['throttled'] - before['throttled']:>10} "
+                  f"{after['errors'] - before['errors']:>5}")
+
+        from app.services.document_queue import document_queue
+        await document_queue.stop()
+    print(f"model outputs served: {fake.stats()['served']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pipeline", choices=["queue", "stream"], default="queue")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32], help="Concurrent clients")
+    parser.add_argument("--documents", type=int, default=64, help="Documents per concurrency level")
+    parser.add_argument("--model-concurrency", type=int, default=8, help="Visual Eye pool size and queue workers")
+    parser.add_argument("--latency", type=float, default=0.3, help="Fake Bedrock median response time (seconds)")
+    parser.add_argument("--jitter", type=float, default=0.3, help="Lognormal sigma on the response time")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of 500 responses")
+    parser.add_argument("--throttle-above", type=int, default=None, help="Concurrent requests before 429s")
+    parser.add_argument("--fenced", type=float, default=0.0, help="Fraction of markdown-fenced outputs")
+    parser.add_argument("--prose", type=float, default=0.0, help="Fraction of outputs wrapped in prose")
+    parser.add_argument("--truncated", type=float, default=0.0, help="Fraction of malformed (cut off) outputs")
+    args = parser.parse_args()
+
+    outputs = {"fenced": args.fenced, "prose": args.prose, "truncated": args.truncated}
+    outputs["json"] = max(0.0, 1.0 - sum(outputs.values()))
+
+    with FakeBedrock(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        throttle_above=args.throttle_above,
+        outputs=outputs
+    ) as fake, tempfile.TemporaryDirectory() as tmp:
+        # Settings are read at import, so configure before importing the app
+        os.environ.update(
+            DATABASE_URL=f"sqlite+aiosqlite:///{tmp}/bench.db",
+            BEDROCK_ENDPOINT_URL=fake.url,
+            BEDROCK_MAX_CONCURRENCY=str(args.model_concurrency),
+            DOCUMENT_QUEUE_WORKERS=str(args.model_concurrency),
+            DOCUMENT_QUEUE_MAX_DEPTH=str(max(args.concurrency) + 1),
+            OCR_PREPROCESS="false",  # Placeholder documents, not real images
+            AWS_ACCESS_KEY_ID=os.environ.get("AWS_ACCESS_KEY_ID", "fake"),
+            AWS_SECRET_ACCESS_KEY=os.environ.get("AWS_SECRET_ACCESS_KEY", "fake")
+        )
+        asyncio.run(run(args, fake))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Benchmark - cash-constrained purchase planning (QuartermasterAgent.plan_purchases)
+
+Every SKU is a reorder candidate; the budget is a share of the total
+suggested spend, so the solver has to choose between lines. Deferred lines are
+listed up to 100, as the /inventory/plan endpoint does by default.
+
+Run from the backend directory:
+    python -m benchmarks.bench_po_planner
+    python -m benchmarks.bench_po_planner --lines 50000 --budget-shares 0.05 0.5
+"""
+import argparse
+import time
+
+import numpy as np
+
+from app.services.agents.quartermaster import QuartermasterAgent
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, nargs="+", default=[10_000, 50_000])
+    parser.add_argument("--budget-shares", type=float, nargs="+", default=[0.05, 0.25, 0.6, 1.0])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    quartermaster = QuartermasterAgent()
+    rng = np.random.default_rng(42)
+
+    print(f"{'lines':>8} {'budget':>7} {'solve (ms)':>11} {'funded':>7} {'deferred':>9} "
+          f"{'spent':>7} {'cover':>7} {'in budget':>10}")
+    for lines in args.lines:
+        lead_time = rng.integers(3, 21, lines)
+        demand = np.round(rng.gamma(2.0, 300.0, lines), 2)
+        daily = demand / 30
+        qty = np.round(daily * (lead_time + quartermaster.safety_stock_days) * rng.uniform(0, 0.95, lines), 2)
+        unit_cost = np.round(rng.uniform(5, 2500, lines), 2)
+        penalty = rng.uniform(0.5, 3.0, lines)  # e.g. margin lost per rupee short
+        names = [f"Item {i}" for i in range(lines)]
+        sku_ids = [f"SKU-{i:06d}" for i in range(lines)]
+        units = ["units"] * lines
+
+        orders, _ = quartermaster.batch_optimize_columnar(qty, lead_time, unit_cost, demand, sku_ids, names, units)
+        total = sum(order.estimated_cost for order in orders)
+
+        for share in args.budget_shares:
+            budget = total * share
+            timings = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                plan = quartermaster.plan_purchases(
+                    qty, lead_time, unit_cost, demand, sku_ids, names, units,
+                    budget=budget, stockout_penalty=penalty, max_deferred=100
+                )
+                timings.append(time.perf_counter() - start)
+
+            print(f"{lines:>8,} {share:>7.0%} {min(timings) * 1000:>11.1f} {len(plan.orders):>7,} "
+                  f"{plan.deferred_count:>9,} {plan.committed / total:>7.1%} {plan.cover_ratio:>7.1%} "
+                  f"{str(plan.committed <= plan.budget + 0.01):>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Benchmark - Visual Eye preprocessing: end-to-end latency and bytes sent
+
+Extracts synthetic documents against a local fake Bedrock endpoint whose
+response time grows with the request size (--latency-per-mb, standing in
+for image tokens), with preprocessing off ("raw", the old behaviour) and on
+("prep": images downscaled and recompressed, PDFs split into pages that are
+extracted in parallel).
+
+Documents:
+    photo.jpg   phone photo of a receipt (4032x3024, noisy)
+    scan.png    A4 scan at 300 dpi (2480x3508)
+    scan.pdf    multi-page scanned PDF (one JPEG per page)
+
+Run from the backend directory:
+    python -m benchmarks.bench_preprocessing
+    python -m benchmarks.bench_preprocessing --pages 12 --latency 0.5 --latency-per-mb 0.5
+"""
+import argparse
+import asyncio
+import io
+import os
+import time
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from benchmarks.fake_bedrock import FakeBedrock
+
+# The fake endpoint ignores signatures, but botocore still signs requests
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "fake")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "fake")
+
+from app.services.agents.visual_eye import VisualEyeAgent  # noqa: E402
+
+
+def page_image(width: int, height: int, seed: int, noise: float) -> Image.Image:
+    """Paper-coloured page with text-like bars and sensor noise."""
+    rng = np.random.default_rng(seed)
+    pixels = np.full((height, width, 3), 235, dtype=np.int16)
+    pixels += rng.normal(0, noise, size=(height, width, 1)).astype(np.int16)
+    image = Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8))
+
+    draw = ImageDraw.Draw(image)
+    line_height = height // 60
+    for row in range(4, 56):
+        x = width // 12
+        while x < width * 11 // 12:
+            word = int(rng.integers(width // 40, width // 10))
+            draw.rectangle([x, row * line_height, x + word, row * line_height + line_height // 2], fill=(30, 30, 40))
+            x += word + width // 60
+    return image
+
+
+def encode(image: Image.Image, fmt: str, **options) -> bytes:
+    output = io.BytesIO()
+    image.save(output, format=fmt, **options)
+    return output.getvalue()
+
+
+def make_documents(pages: int) -> list[tuple[str, bytes, str]]:
+    photo = encode(page_image(4032, 3024, seed=1, noise=12), "JPEG", quality=92)
+    scan = encode(page_image(2480, 3508, seed=2, noise=3), "PNG")
+    page_images = [page_image(2480, 3508, seed=10 + i, noise=3) for i in range(pages)]
+    pdf = encode(page_images[0], "PDF", save_all=True, append_images=page_images[1:], resolution=300, quality=85)
+    return [
+        ("photo.jpg", photo, "image/jpeg"),
+        ("scan.png", scan, "image/png"),
+        (f"scan.pdf ({pages}p)", pdf, "application/pdf"),
+    ]
+
+
+async def extract(agent: VisualEyeAgent, content: bytes, name: str, mime_type: str) -> tuple[float, str]:
+    start = time.perf_counter()
+    extracted = await agent.process_document(content, name, mime_type)
+    return time.perf_counter() - start, extracted.document_type
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=6, help="Pages in the scanned PDF")
+    parser.add_argument("--latency", type=float, default=0.4, help="Fake Bedrock fixed response time (seconds)")
+    parser.add_argument("--latency-per-mb", type=float, default=0.6, help="Fake Bedrock time per MB of request body")
+    parser.add_argument("--concurrency", type=int, default=4, help="Visual Eye thread pool size")
+    args = parser.parse_args()
+
+    documents = make_documents(args.pages)
+
+    print(f"{'document':>16} {'size (KB)':>10} {'mode':>5} {'ok':>3} {'requests':>9} "
+          f"{'sent (KB)':>10} {'latency (s)':>12} {'speedup':>8}")
+    for name, content, mime_type in documents:
+        baseline = None
+        for mode in ("raw", "prep"):
+            with FakeBedrock(latency=args.latency, latency_per_mb=args.latency_per_mb) as fake:
+                agent = VisualEyeAgent(
+                    endpoint_url=fake.url,
+                    max_concurrency=args.concurrency,
+                    preprocess=mode == "prep"
+                )
+                elapsed, document_type = asyncio.run(extract(agent, content, name, mime_type))
+                baseline = baseline or elapsed
+                ok = "yes" if document_type == "Invoice" else "no"
+                print(f"{name:>16} {len(content) / 1024:>10.0f} {mode:>5} {ok:>3} {fake.requests:>9} "
+                      f"{fake.bytes_received / 1024:>10.0f} {elapsed:>12.2f} {baseline / elapsed:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
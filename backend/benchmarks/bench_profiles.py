@@ -0,0 +1,69 @@
+"""
+Benchmark - latency and output tokens per extraction profile
+
+A local fake Bedrock endpoint "generates" the extraction JSON at a fixed
+token rate after a fixed time to first token, answering only the fields each
+profile's prompt asks for. Every profile extracts the same (image) document
+through VisualEyeAgent.process_document; latency percentiles and tokens per
+call come from the agent's own profile metrics (GET /documents/profiles).
+
+Run from the backend directory:
+    python -m benchmarks.bench_profiles
+    python -m benchmarks.bench_profiles --token-rate 120 --full-text-chars 6000 --line-items 30 --runs 10
+"""
+import argparse
+import asyncio
+import os
+
+from benchmarks.fake_bedrock import FAKE_EXTRACTION, FakeBedrock
+
+# The fake endpoint ignores signatures, but botocore still signs requests
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "fake")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "fake")
+
+from app.services.agents.visual_eye import EXTRACTION_PROFILES, VisualEyeAgent  # noqa: E402
+
+DOCUMENT = b"\x89PNG\r\n\x1a\n" + bytes(50_000)
+
+
+async def run(agent: VisualEyeAgent, profile: str, runs: int) -> None:
+    for _ in range(runs):
+        extracted = await agent.process_document(DOCUMENT, "invoice.png", "image/png", profile=profile)
+        if extracted.document_type == "Other":
+            print(f"⚠️ {profile}: {extracted.raw_text[:120]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.6, help="Fake time to first token (seconds)")
+    parser.add_argument("--token-rate", type=float, default=150, help="Fake output tokens per second")
+    parser.add_argument("--full-text-chars", type=int, default=4000, help="Length of the transcribed full_text")
+    parser.add_argument("--line-items", type=int, default=12)
+    parser.add_argument("--runs", type=int, default=5, help="Documents per profile")
+    args = parser.parse_args()
+
+    item = FAKE_EXTRACTION["line_items"][0]
+    extraction = dict(
+        FAKE_EXTRACTION,
+        line_items=[dict(item, description=f"{item['description']} #{i}") for i in range(args.line_items)],
+        full_text=("TAX INVOICE Sharma Steel Traders GSTIN 27ABCDE1234F1Z5 " * 200)[:args.full_text_chars]
+    )
+
+    with FakeBedrock(latency=args.latency, token_rate=args.token_rate, extraction=extraction) as fake:
+        agent = VisualEyeAgent(endpoint_url=fake.url, preprocess=False)
+        for profile in EXTRACTION_PROFILES:
+            asyncio.run(run(agent, profile, args.runs))
+
+    metrics = agent.profile_metrics()
+    baseline = metrics["full_transcript"]["p50_seconds"]
+    print(f"{args.runs} documents per profile, {args.token_rate:.0f} tok/s after {args.latency:.2f} s "
+          f"({args.line_items} line items, {args.full_text_chars} chars of text)")
+    print(f"{'profile':>16} {'max_tokens':>11} {'output tok':>11} {'p50 (s)':>8} {'p95 (s)':>8} "
+          f"{'failed':>7} {'vs full':>8}")
+    for profile, m in metrics.items():
+        print(f"{profile:>16} {m['max_tokens']:>11} {m['avg_output_tokens']:>11} {m['p50_seconds']:>8.2f} "
+              f"{m['p95_seconds']:>8.2f} {m['failed']:>7} {baseline / m['p50_seconds']:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Benchmark - QuartermasterAgent scalar vs columnar batch optimization
+
+Run from the backend directory:
+    python -m benchmarks.bench_quartermaster
+    python -m benchmarks.bench_quartermaster --skus 30000 80000 --reorder-rate 0.05
+"""
+import argparse
+import time
+
+import numpy as np
+
+from app.services.agents.quartermaster import QuartermasterAgent
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--skus", type=int, nargs="+", default=[10_000, 30_000, 80_000])
+    parser.add_argument("--reorder-rate", type=float, default=0.05, help="Approximate share of SKUs below reorder point")
+    args = parser.parse_args()
+
+    quartermaster = QuartermasterAgent()
+    rng = np.random.default_rng(42)
+
+    print(f"{'skus':>8} {'orders':>7} {'scalar (ms)':>12} {'columnar (ms)':>14} {'speedup':>8} {'identical':>10}")
+    for skus in args.skus:
+        lead_time = rng.integers(3, 21, skus)
+        demand = np.round(rng.gamma(2.0, 300.0, skus), 2)
+        daily = demand / 30
+        cover = np.where(rng.random(skus) < args.reorder_rate, rng.uniform(0, 1, skus), rng.uniform(1.05, 4, skus))
+        qty = np.round(daily * (lead_time + quartermaster.safety_stock_days) * cover, 2)
+        unit_cost = np.round(rng.uniform(5, 2500, skus), 2)
+        names = [f"Item {i}" for i in range(skus)]
+        sku_ids = [f"SKU-{i:06d}" for i in range(skus)]
+        units = ["units"] * skus
+
+        start = time.perf_counter()
+        scalar = []
+        for i in range(skus):
+            _, _, order = quartermaster.optimize_inventory(
+                current_stock=float(qty[i]),
+                lead_time_days=int(lead_time[i]),
+                predicted_demand=float(demand[i]),
+                sku=sku_ids[i],
+                name=names[i],
+                unit=units[i],
+                unit_cost=float(unit_cost[i])
+            )
+            if order:
+                scalar.append(order)
+        scalar_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        columnar, _ = quartermaster.batch_optimize_columnar(
+            qty, lead_time, unit_cost, demand, sku_ids, names, units
+        )
+        columnar_seconds = time.perf_counter() - start
+
+        identical = [o.model_dump() for o in scalar] == [o.model_dump() for o in columnar]
+        print(f"{skus:>8,} {len(columnar):>7,} {scalar_seconds * 1000:>12.1f} {columnar_seconds * 1000:>14.1f} "
+              f"{scalar_seconds / columnar_seconds:>7.1f}x {str(identical):>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""
+Benchmark - TreasurerAgent Monte Carlo runway simulation
+
+Run from the backend directory:
+    python -m benchmarks.bench_runway
+    python -m benchmarks.bench_runway --paths 1000 10000 50000 --days 365
+"""
+import argparse
+import time
+
+import numpy as np
+
+from app.services.agents.treasurer import TreasurerAgent
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--paths", type=int, nargs="+", default=[1_000, 10_000, 50_000])
+    parser.add_argument("--days", type=int, nargs="+", default=[30, 90, 365])
+    parser.add_argument("--history", type=int, default=90, help="Days of historical net flows")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    treasurer = TreasurerAgent()
+    rng = np.random.default_rng(42)
+    history = rng.normal(-20_000, 60_000, args.history)
+
+    print(f"{'paths':>8} {'days':>6} {'best (ms)':>10} {'mean (ms)':>10} {'P(cash-out)':>12}")
+    for paths in args.paths:
+        for days in args.days:
+            timings = []
+            for _ in range(args.repeat + 1):
+                start = time.perf_counter()
+                result = treasurer.simulate_balance(history, 1_500_000, days, paths=paths, rng=rng)
+                timings.append(time.perf_counter() - start)
+            timings = timings[1:]  # Drop warm-up run
+            print(f"{paths:>8,} {days:>6} {min(timings) * 1000:>10.2f} "
+                  f"{sum(timings) / len(timings) * 1000:>10.2f} {result['cash_out_probability']:>12.4f}")
+
+
+if __name__ == "__main__":
+    main()
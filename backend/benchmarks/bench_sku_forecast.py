@@ -0,0 +1,47 @@
+"""
+Benchmark - ProphetAgent per-SKU matrix forecasting
+
+Run from the backend directory:
+    python -m benchmarks.bench_sku_forecast
+    python -m benchmarks.bench_sku_forecast --skus 1000 50000 --days 90
+"""
+import argparse
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+from app.services.agents.prophet import ProphetAgent
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--skus", type=int, nargs="+", default=[1_000, 10_000, 50_000])
+    parser.add_argument("--days", type=int, default=90, help="Days of demand history")
+    parser.add_argument("--horizon", type=int, default=30)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    prophet = ProphetAgent()
+    rng = np.random.default_rng(42)
+    last_date = date.today() - timedelta(days=1)
+    weekly = np.array([1.0, 1.0, 1.1, 1.0, 1.2, 0.8, 0.4])
+
+    print(f"{'skus':>8} {'days':>6} {'best (ms)':>10} {'mean (ms)':>10} {'MB':>8}")
+    for skus in args.skus:
+        rates = rng.gamma(2.0, 5.0, (skus, 1))
+        pattern = np.resize(weekly, args.days)[None, :]
+        demand = rng.poisson(rates * pattern).astype(np.float64)
+
+        timings = []
+        for _ in range(args.repeat + 1):
+            start = time.perf_counter()
+            forecasts = prophet.forecast_matrix(demand, last_date, args.horizon)
+            timings.append(time.perf_counter() - start)
+        timings = timings[1:]  # Drop warm-up run
+        print(f"{skus:>8,} {args.days:>6} {min(timings) * 1000:>10.2f} "
+              f"{sum(timings) / len(timings) * 1000:>10.2f} {demand.nbytes / 1e6:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
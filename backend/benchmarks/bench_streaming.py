@@ -0,0 +1,97 @@
+"""
+Benchmark - time to first field: InvokeModel vs InvokeModelWithResponseStream
+
+A local fake Bedrock endpoint "generates" the extraction JSON at a fixed
+token rate after a fixed time to first token. "invoke" is
+VisualEyeAgent.process_document, which has nothing until the whole
+completion (including the verbatim full_text) is in; "stream" is
+stream_document, which yields each field as the incremental parser
+completes it.
+
+Run from the backend directory:
+    python -m benchmarks.bench_streaming
+    python -m benchmarks.bench_streaming --token-rate 120 --full-text-chars 6000 --runs 3
+"""
+import argparse
+import asyncio
+import os
+import time
+
+import numpy as np
+
+from benchmarks.fake_bedrock import FAKE_EXTRACTION, FakeBedrock
+
+# The fake endpoint ignores signatures, but botocore still signs requests
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "fake")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "fake")
+
+from app.services.agents.visual_eye import VisualEyeAgent  # noqa: E402
+
+DOCUMENT = b"\x89PNG\r\n\x1a\n" + bytes(50_000)
+HEADER_FIELDS = ("document_type", "vendor_name", "date", "total_amount")
+
+
+async def run_invoke(agent: VisualEyeAgent) -> dict:
+    start = time.perf_counter()
+    await agent.process_document(DOCUMENT, "invoice.png", "image/png")
+    elapsed = time.perf_counter() - start
+    return {"first field": elapsed, "header fields": elapsed, "first line item": elapsed, "complete": elapsed}
+
+
+async def run_stream(agent: VisualEyeAgent) -> dict:
+    start = time.perf_counter()
+    times = {}
+    seen = set()
+    async for event in agent.stream_document(DOCUMENT, "invoice.png", "image/png"):
+        now = time.perf_counter() - start
+        if event["event"] == "field":
+            times.setdefault("first field", now)
+            seen.add(event["name"])
+            if seen.issuperset(HEADER_FIELDS):
+                times.setdefault("header fields", now)
+        elif event["event"] == "line_item":
+            times.setdefault("first line item", now)
+        elif event["event"] == "result":
+            times["complete"] = now
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.6, help="Fake time to first token (seconds)")
+    parser.add_argument("--token-rate", type=float, default=300, help="Fake output tokens per second")
+    parser.add_argument("--full-text-chars", type=int, default=4000, help="Length of the transcribed full_text")
+    parser.add_argument("--line-items", type=int, default=12)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    item = FAKE_EXTRACTION["line_items"][0]
+    extraction = dict(
+        FAKE_EXTRACTION,
+        line_items=[dict(item, description=f"{item['description']} #{i}") for i in range(args.line_items)],
+        full_text=("TAX INVOICE Sharma Steel Traders GSTIN 27ABCDE1234F1Z5 " * 200)[:args.full_text_chars]
+    )
+
+    with FakeBedrock(latency=args.latency, token_rate=args.token_rate, extraction=extraction) as fake:
+        agent = VisualEyeAgent(endpoint_url=fake.url, preprocess=False)
+        results = {"invoke": [], "stream": []}
+        for _ in range(args.runs):
+            results["invoke"].append(asyncio.run(run_invoke(agent)))
+            results["stream"].append(asyncio.run(run_stream(agent)))
+        completion_tokens = len(fake.text) // 4
+
+    print(f"completion ~{completion_tokens} tokens at {args.token_rate:.0f} tok/s, "
+          f"first token after {args.latency:.2f} s (median of {args.runs} runs, seconds)")
+    milestones = ["first field", "header fields", "first line item", "complete"]
+    print(f"{'mode':>8} " + " ".join(f"{m:>16}" for m in milestones))
+    medians = {}
+    for mode, runs in results.items():
+        medians[mode] = {m: float(np.median([r[m] for r in runs])) for m in milestones}
+        print(f"{mode:>8} " + " ".join(f"{medians[mode][m]:>16.2f}" for m in milestones))
+    print(f"{'speedup':>8} " + " ".join(
+        f"{medians['invoke'][m] / medians['stream'][m]:>15.1f}x" for m in milestones
+    ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+"""
+Benchmark - tiered extraction: PDF text layer first, model only when needed
+
+Builds a mixed corpus of PDFs: digital invoices and receipts (with a text
+layer, like most accounting-software exports), digital bank statements
+(text layer, but a layout the local parsers leave to the model) and scans
+(image-only pages). Invoices come in a few layouts: seller block first,
+a copy marker ("ORIGINAL FOR RECIPIENT") on top, or the buyer's "Bill To"
+block (with its own GSTIN) before the seller's. Each document goes through
+VisualEyeAgent.process_document twice against a local fake Bedrock: with
+the text tier and model-only. Reports which tier handled each kind of
+document, the fraction handled locally, how often the locally extracted
+total, date, vendor and line items match the generated ground truth, and
+the latency saved.
+
+Run from the backend directory:
+    python -m benchmarks.bench_tiered_extraction
+    python -m benchmarks.bench_tiered_extraction --documents 50 --scan-fraction 0.4 --latency 2.5
+"""
+import argparse
+import asyncio
+import io
+import os
+import random
+import time
+from collections import defaultdict
+from datetime import date
+from typing import Optional
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from benchmarks.fake_bedrock import FakeBedrock
+
+# The fake endpoint ignores signatures, but botocore still signs requests
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "fake")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "fake")
+
+from app.models.pydantic_models import ExtractedDocumentData  # noqa: E402
+from app.services.agents.visual_eye import VisualEyeAgent  # noqa: E402
+
+VENDORS = ["Sharma Steel Traders", "Patel Electricals", "Gupta Textiles", "Reddy Agro Foods", "Iyer Hardware Mart"]
+BUYERS = ["Kumar Auto Parts", "Singh Motors", "Mehta Packaging"]
+COPY_MARKERS = ["ORIGINAL FOR RECIPIENT", "DUPLICATE FOR TRANSPORTER", "(Original Copy)"]
+ITEMS = [("Steel Sheets (1mm)", "7208", 85.0), ("Copper Wire 2.5 sq mm", "8544", 1240.0),
+         ("Cotton Fabric Roll", "5208", 310.5), ("Basmati Rice 25kg", "1006", 1875.0), ("PVC Pipe 4in", "3917", 412.0)]
+
+
+def text_pdf(lines: list[str]) -> bytes:
+    """Single-page PDF with the lines as real (Helvetica) text."""
+    escape = str.maketrans({"(": r"\(", ")": r"\)", "\\": r"\\"})
+    content = "BT /F1 10 Tf 14 TL 50 800 Td " + " ".join(f"({line.translate(escape)}) Tj T*" for line in lines) + " ET"
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Contents 4 0 R "
+        b"/Resources << /Font << /F1 5 0 R >> >> >>",
+        b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content.encode("latin-1")),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    pdf = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(pdf))
+        pdf += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(pdf)
+    pdf += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    pdf += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    pdf += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return pdf
+
+
+def scanned_pdf(lines: list[str]) -> bytes:
+    """Single-page PDF holding only an image of the lines (no text layer)."""
+    image = Image.new("RGB", (1240, 1754), "white")
+    draw = ImageDraw.Draw(image)
+    for i, line in enumerate(lines):
+        draw.text((100, 100 + 40 * i), line, fill="black")
+    buffer = io.BytesIO()
+    image.save(buffer, "PDF", resolution=150)
+    return buffer.getvalue()
+
+
+def invoice_lines(rng: random.Random, n: int, kind: str) -> tuple[list[str], dict]:
+    """Lines of an invoice or receipt in a random layout, and its ground truth."""
+    vendor = rng.choice(VENDORS)
+    items = rng.sample(ITEMS, rng.randint(1, 4))
+    rows, truth_items, subtotal = [], [], 0.0
+    for i, (description, hsn, rate) in enumerate(items, 1):
+        quantity = rng.randint(1, 300)
+        amount = quantity * rate
+        subtotal += amount
+        rows.append(f"{i} {description} {hsn} {quantity} {rate:,.2f} {amount:,.2f}")
+        truth_items.append((description, float(quantity), round(amount, 2)))
+    tax = round(subtotal * 0.09, 2)
+    total = round(subtotal + 2 * tax, 2)
+    day = date(2024, rng.randint(1, 12), rng.randint(1, 28))
+    title = "TAX INVOICE" if kind == "invoice" else "PAYMENT RECEIPT"
+
+    seller = [
+        vendor,
+        f"Plot {rng.randint(1, 99)}, MIDC Industrial Area, Pune 4110{rng.randint(10, 99)}",
+        f"GSTIN: 27ABCDE{rng.randint(1000, 9999)}F1Z5",
+    ]
+    header = [title, f"{title.split()[-1].title()} No: {n:04d}    Date: {day:%d/%m/%Y}"]
+    layout = rng.choice(["seller first", "copy marker", "bill to first"])
+    if layout == "bill to first":
+        buyer = ["Bill To:", rng.choice(BUYERS), f"GSTIN: 29AAACB{rng.randint(1000, 9999)}K1Z2"]
+        top = header + buyer + seller
+    else:
+        top = seller + header + [f"Bill To: {rng.choice(BUYERS)}"]
+        if layout == "copy marker":
+            top = [rng.choice(COPY_MARKERS)] + top
+
+    lines = [
+        *top,
+        "Sl Description HSN Qty Rate Amount",
+        *rows,
+        f"Sub Total {subtotal:,.2f}",
+        f"CGST @ 9% {tax:,.2f}",
+        f"SGST @ 9% {tax:,.2f}",
+        f"Grand Total Rs. {total:,.2f}",
+    ]
+    return lines, {"total": total, "date": day.isoformat(), "vendor": vendor, "items": truth_items}
+
+
+def statement_lines(rng: random.Random, n: int) -> list[str]:
+    balance = rng.uniform(10_000, 500_000)
+    lines = ["HDFC Bank", f"Account Statement No. {n}", "Period: 01/03/2024 to 31/03/2024", "Date Narration Amount Balance"]
+    for day in range(1, rng.randint(5, 15)):
+        amount = rng.uniform(-20_000, 20_000)
+        balance += amount
+        lines.append(f"{day:02d}/03/2024 UPI/NEFT transfer {amount:,.2f} {balance:,.2f}")
+    return lines
+
+
+def corpus(
+    documents: int,
+    scan_fraction: float,
+    statement_fraction: float,
+    seed: int
+) -> list[tuple[str, bytes, Optional[dict]]]:
+    """(kind, PDF, ground truth) per document; statements have no ground truth."""
+    rng = random.Random(seed)
+    result = []
+    for n in range(documents):
+        draw = rng.random()
+        if draw < scan_fraction:
+            lines, truth = invoice_lines(rng, n, "invoice")
+            result.append(("scan", scanned_pdf(lines), truth))
+        elif draw < scan_fraction + statement_fraction:
+            result.append(("digital statement", text_pdf(statement_lines(rng, n)), None))
+        else:
+            kind = "invoice" if rng.random() < 0.8 else "receipt"
+            lines, truth = invoice_lines(rng, n, kind)
+            result.append((f"digital {kind}", text_pdf(lines), truth))
+    return result
+
+
+def field_matches(extracted: ExtractedDocumentData, truth: dict) -> dict[str, bool]:
+    """Whether each locally extracted field equals the ground truth."""
+    items = [(item["description"], item["quantity"], round(item["total"], 2)) for item in extracted.line_items]
+    return {
+        "total": extracted.total_amount is not None and abs(extracted.total_amount - truth["total"]) < 0.01,
+        "date": extracted.date == truth["date"],
+        "vendor": extracted.vendor_name == truth["vendor"],
+        "items": items == truth["items"],
+    }
+
+
+async def run(
+    agent: VisualEyeAgent,
+    documents: list[tuple[str, bytes, Optional[dict]]]
+) -> list[tuple[str, str, float, ExtractedDocumentData]]:
+    """(kind, tier, seconds, extracted) per document, one at a time."""
+    results = []
+    for n, (kind, content, _) in enumerate(documents):
+        start = time.perf_counter()
+        extracted = await agent.process_document(content, f"doc-{n}.pdf", "application/pdf")
+        results.append((kind, extracted.extraction_tier or "failed", time.perf_counter() - start, extracted))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=40)
+    parser.add_argument("--scan-fraction", type=float, default=0.25, help="Image-only PDFs")
+    parser.add_argument("--statement-fraction", type=float, default=0.1, help="Digital bank statements")
+    parser.add_argument("--latency", type=float, default=1.5, help="Fake Bedrock response time (seconds)")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    documents = corpus(args.documents, args.scan_fraction, args.statement_fraction, args.seed)
+    with FakeBedrock(latency=args.latency) as fake:
+        tiered = asyncio.run(run(VisualEyeAgent(endpoint_url=fake.url, text_tier=True), documents))
+        tiered_requests = fake.requests
+        model_only = asyncio.run(run(VisualEyeAgent(endpoint_url=fake.url, text_tier=False), documents))
+        model_requests = fake.requests - tiered_requests
+
+    by_kind = defaultdict(list)
+    for (kind, tier, seconds, _), (_, _, baseline, _) in zip(tiered, model_only):
+        by_kind[kind].append((tier, seconds, baseline))
+
+    print(f"{args.documents} PDFs, fake model latency {args.latency:.2f} s (seconds per document)")
+    print(f"{'document':>18} {'count':>6} {'local':>6} {'tiered p50':>11} {'model-only p50':>15}")
+    for kind, rows in sorted(by_kind.items()):
+        local = sum(tier == "text" for tier, _, _ in rows)
+        print(f"{kind:>18} {len(rows):>6} {local:>6} {np.median([r[1] for r in rows]):>11.3f} "
+              f"{np.median([r[2] for r in rows]):>15.3f}")
+
+    local = sum(tier == "text" for _, tier, _, _ in tiered)
+    tiered_total = sum(seconds for _, _, seconds, _ in tiered)
+    model_total = sum(seconds for _, _, seconds, _ in model_only)
+    local_seconds = [seconds for _, tier, seconds, _ in tiered if tier == "text"]
+    matches = [
+        field_matches(extracted, truth)
+        for (_, tier, _, extracted), (_, _, truth) in zip(tiered, documents)
+        if tier == "text" and truth is not None
+    ]
+    accuracy = ", ".join(
+        f"{field} {sum(m[field] for m in matches) / len(matches):.0%}" for field in ("total", "date", "vendor", "items")
+    ) if matches else "n/a"
+    print(f"handled locally: {local}/{len(tiered)} ({local / len(tiered):.0%}), "
+          f"local p50 {np.median(local_seconds) * 1000 if local_seconds else 0:.1f} ms, "
+          f"accuracy vs ground truth: {accuracy}")
+    print(f"model requests: {tiered_requests} tiered vs {model_requests} model-only")
+    print(f"total latency: {tiered_total:.1f} s tiered vs {model_total:.1f} s model-only "
+          f"(saved {model_total - tiered_total:.1f} s, {1 - tiered_total / model_total:.0%})")
+
+
+if __name__ == "__main__":
+    main()
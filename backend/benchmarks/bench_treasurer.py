@@ -0,0 +1,80 @@
+"""
+Benchmark - TreasurerAgent dict path vs columnar path
+
+Run from the backend directory:
+    python -m benchmarks.bench_treasurer
+    python -m benchmarks.bench_treasurer --sizes 1000 100000 --dict-max 100000
+"""
+import argparse
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from app.services.agents.treasurer import (
+    TreasurerAgent, TYPE_CREDIT, TYPE_DEBIT, to_epoch_days
+)
+
+
+def make_columns(n: int, seed: int = 42) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Generate n synthetic transactions spread over the last year."""
+    rng = np.random.default_rng(seed)
+    now = to_epoch_days(datetime.now())
+    epoch_days = now - rng.uniform(0, 365, n)
+    amounts = np.round(rng.uniform(1000, 150000, n), 2)
+    types = np.where(rng.random(n) < 0.45, TYPE_CREDIT, TYPE_DEBIT).astype(np.int8)
+    return epoch_days, amounts, types
+
+
+def to_dicts(epoch_days: np.ndarray, amounts: np.ndarray, types: np.ndarray) -> list[dict]:
+    """Build the per-row dicts the original path consumes."""
+    epoch = datetime(1970, 1, 1)
+    return [
+        {
+            "date": epoch + timedelta(days=float(d)),
+            "amount": float(a),
+            "type": "credit" if t == TYPE_CREDIT else "debit"
+        }
+        for d, a, t in zip(epoch_days, amounts, types)
+    ]
+
+
+def best_of(fn, repeat: int) -> float:
+    """Return the best wall time in seconds over `repeat` runs."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+",
+                        default=[1_000, 10_000, 100_000, 1_000_000, 10_000_000])
+    parser.add_argument("--dict-max", type=int, default=1_000_000,
+                        help="Skip the dict path above this many rows")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    treasurer = TreasurerAgent()
+
+    print(f"{'rows':>12} {'dict (ms)':>12} {'columnar (ms)':>14} {'speedup':>9} {'match':>6}")
+    for n in args.sizes:
+        columns = make_columns(n)
+        columnar_s = best_of(lambda: treasurer.analyze_cashflow_columnar(*columns), args.repeat)
+
+        if n <= args.dict_max:
+            tx_dicts = to_dicts(*columns)
+            dict_s = best_of(lambda: treasurer.analyze_cashflow(tx_dicts), args.repeat)
+            match = treasurer.analyze_cashflow(tx_dicts) == treasurer.analyze_cashflow_columnar(*columns)
+            del tx_dicts
+            print(f"{n:>12,} {dict_s * 1000:>12.2f} {columnar_s * 1000:>14.2f} "
+                  f"{dict_s / columnar_s:>8.1f}x {str(match):>6}")
+        else:
+            print(f"{n:>12,} {'-':>12} {columnar_s * 1000:>14.2f} {'-':>9} {'-':>6}")
+
+
+if __name__ == "__main__":
+    main()
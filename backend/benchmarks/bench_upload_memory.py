@@ -0,0 +1,88 @@
+"""
+Benchmark - peak memory of building the Bedrock request for one document
+
+"before": read the upload into bytes, base64 it, decode to str, json.dumps
+the request and encode it for sending (what the upload path used to do).
+"after": hash and base64-encode straight from the spooled upload file into
+one preallocated body (app.services.uploads).
+
+Peak is measured with tracemalloc, so it counts Python allocations only.
+The spooled file is created before measuring, as the multipart parser
+already has it on disk.
+
+Run from the backend directory:
+    python -m benchmarks.bench_upload_memory
+    python -m benchmarks.bench_upload_memory --sizes-mb 1 10 40
+"""
+import argparse
+import base64
+import hashlib
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+from app.services.uploads import SPOOL_MEMORY_BYTES, base64_body, sha256_hex
+
+PLACEHOLDER = "@@DOCUMENT_BASE64@@"
+
+
+def request(data: str) -> dict:
+    return {
+        "anthropic_version": "bedrock-2023-05-31",
+        "max_tokens": 2048,
+        "messages": [{"role": "user", "content": [
+            {"type": "image", "source": {"type": "base64", "media_type": "application/pdf", "data": data}},
+            {"type": "text", "text": "Extract the fields..."}
+        ]}]
+    }
+
+
+def before(upload) -> bytes:
+    upload.seek(0)
+    content = upload.read()
+    hashlib.sha256(content).hexdigest()
+    data = base64.standard_b64encode(content).decode("utf-8")
+    return json.dumps(request(data)).encode()  # botocore sends bytes
+
+
+def after(upload) -> bytearray:
+    sha256_hex(upload)
+    prefix, suffix = json.dumps(request(PLACEHOLDER)).split(PLACEHOLDER)
+    return base64_body(prefix.encode(), upload, suffix.encode())
+
+
+def measure(fn, upload) -> tuple[float, float, bytes]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    body = fn(upload)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak, elapsed, body
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes-mb", type=float, nargs="+", default=[1, 5, 20])
+    args = parser.parse_args()
+
+    print(f"{'size (MB)':>10} {'path':>7} {'peak (MB)':>10} {'peak/size':>10} {'time (ms)':>10} {'same body':>10}")
+    for size_mb in args.sizes_mb:
+        size = int(size_mb * 1024 * 1024)
+        with tempfile.SpooledTemporaryFile(max_size=SPOOL_MEMORY_BYTES) as upload:
+            upload.write(b"%PDF-1.7\n" + os.urandom(size - 9))
+
+            peak_before, time_before, body_before = measure(before, upload)
+            peak_after, time_after, body_after = measure(after, upload)
+            same = body_before == body_after
+            del body_before, body_after
+
+            for path, peak, elapsed in (("before", peak_before, time_before), ("after", peak_after, time_after)):
+                print(f"{size_mb:>10.1f} {path:>7} {peak / 2**20:>10.1f} {peak / size:>9.2f}x "
+                      f"{elapsed * 1000:>10.1f} {str(same):>10}")
+
+
+if __name__ == "__main__":
+    main()
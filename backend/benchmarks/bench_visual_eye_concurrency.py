@@ -0,0 +1,85 @@
+"""
+Benchmark - event-loop responsiveness while Visual Eye documents are in flight
+
+Runs N documents against a local fake Bedrock endpoint and samples the
+event loop every 10 ms. "inline" calls the blocking boto3 client on the
+loop (the old behaviour); "pool" uses VisualEyeAgent.process_document,
+which runs the call on its bounded thread pool.
+
+Run from the backend directory:
+    python -m benchmarks.bench_visual_eye_concurrency
+    python -m benchmarks.bench_visual_eye_concurrency --documents 32 --latency 0.3 --concurrency 2 8
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+
+import numpy as np
+
+from benchmarks.fake_bedrock import FakeBedrock
+
+# The fake endpoint ignores signatures, but botocore still signs requests
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "fake")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "fake")
+
+from app.services.agents.visual_eye import VisualEyeAgent  # noqa: E402
+
+TICK = 0.01
+DOCUMENT = b"\x89PNG\r\n\x1a\n" + bytes(200_000)
+
+
+async def sample_lag(stop: asyncio.Event, lags: list[float]) -> None:
+    """Record how late each 10 ms sleep wakes up."""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(TICK)
+        lags.append(loop.time() - start - TICK)
+
+
+async def run(agent: VisualEyeAgent, mode: str, documents: int) -> tuple[float, list[float], int]:
+    stop = asyncio.Event()
+    lags: list[float] = []
+    sampler = asyncio.create_task(sample_lag(stop, lags))
+    await asyncio.sleep(TICK * 2)
+
+    async def inline() -> dict:
+        body = json.dumps({"anthropic_version": "bedrock-2023-05-31", "max_tokens": 2048, "messages": []})
+        return agent._invoke_model(body)
+
+    async def pooled():
+        return await agent.process_document(DOCUMENT, "invoice.png", "image/png")
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(inline() if mode == "inline" else pooled() for _ in range(documents)))
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await sampler
+    ok = sum(1 for r in results if isinstance(r, dict) or r.document_type == "Invoice")
+    return elapsed, lags, ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.5, help="Fake Bedrock response time (seconds)")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8])
+    args = parser.parse_args()
+
+    print(f"{'mode':>8} {'conc':>5} {'docs':>5} {'ok':>4} {'wall (s)':>9} {'docs/s':>7} "
+          f"{'lag p50 (ms)':>13} {'lag p99 (ms)':>13} {'lag max (ms)':>13} {'peak at server':>15}")
+    for mode, concurrency in [("inline", 1)] + [("pool", c) for c in args.concurrency]:
+        with FakeBedrock(latency=args.latency) as fake:
+            agent = VisualEyeAgent(endpoint_url=fake.url, max_concurrency=concurrency, preprocess=False)
+            elapsed, lags, ok = asyncio.run(run(agent, mode, args.documents))
+            lags_ms = np.array(lags) * 1000
+            print(f"{mode:>8} {concurrency:>5} {args.documents:>5} {ok:>4} {elapsed:>9.2f} "
+                  f"{args.documents / elapsed:>7.1f} {np.percentile(lags_ms, 50):>13.1f} "
+                  f"{np.percentile(lags_ms, 99):>13.1f} {lags_ms.max():>13.1f} {fake.max_in_flight:>15}")
+
+
+if __name__ == "__main__":
+    main()
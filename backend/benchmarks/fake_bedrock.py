@@ -0,0 +1,257 @@
+"""
+Local fake of the Bedrock Runtime InvokeModel APIs for benchmarks.
+
+Answers POST /model/{model_id}/invoke after a configurable delay (a fixed
+part plus a part per MB of request body, standing in for image tokens) with a
+Claude-style message whose text is a fixed extraction JSON, limited to the
+fields the prompt names and cut off at the request's max_tokens.
+
+POST /model/{model_id}/invoke-with-response-stream sends the same text as
+an AWS event stream of Claude content_block_delta chunks: the first after
+the fixed delay, the rest paced at `token_rate`. With a token rate set,
+/invoke also waits for the whole "generation" before answering, so the two
+modes finish at the same time.
+
+For load tests the fixed delay can be jittered (lognormal), a fraction of
+requests can fail with 500 InternalServerException, requests beyond a
+concurrency limit get 429 ThrottlingException (botocore retries both), and
+the completion text can be mixed with the shapes _parse_json_response has to
+cope with:
+    json       the bare extraction JSON
+    fenced     wrapped in a ```json markdown fence
+    prose      with a sentence before and after
+    truncated  cut off halfway (malformed; as if max_tokens ran out)
+"""
+import base64
+import binascii
+import json
+import random
+import struct
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+FAKE_EXTRACTION = {
+    "document_type": "Invoice",
+    "vendor_name": "Sharma Steel Traders",
+    "date": "2024-03-18",
+    "total_amount": 48380.0,
+    "tax": 7380.0,
+    "line_items": [
+        {"description": "Steel Sheets (1mm)", "quantity": 250, "unit_price": 85.0, "total": 21250.0},
+        {"description": "Steel Rods (10mm)", "quantity": 200, "unit_price": 92.0, "total": 18400.0}
+    ],
+    "full_text": "TAX INVOICE Sharma Steel Traders ..."
+}
+
+CHARS_PER_TOKEN = 4
+TOKENS_PER_CHUNK = 3
+
+
+def output_variants(text: str) -> dict[str, str]:
+    """Completion texts for each output shape."""
+    return {
+        "json": text,
+        "fenced": f"```json\n{text}\n```",
+        "prose": f"Here is the extracted data:\n\n{text}\n\nLet me know if you need anything else.",
+        "truncated": text[:len(text) // 2],
+    }
+
+
+def event_stream_message(payload: bytes, event_type: str = "chunk") -> bytes:
+    """Encode one AWS event stream message (application/vnd.amazon.eventstream)."""
+    headers = b""
+    for name, value in ((":event-type", event_type), (":content-type", "application/json"), (":message-type", "event")):
+        headers += struct.pack("!B", len(name)) + name.encode() + struct.pack("!BH", 7, len(value)) + value.encode()
+
+    total_length = 12 + len(headers) + len(payload) + 4
+    prelude = struct.pack("!II", total_length, len(headers))
+    message = prelude + struct.pack("!I", binascii.crc32(prelude)) + headers + payload
+    return message + struct.pack("!I", binascii.crc32(message))
+
+
+class FakeBedrock:
+    """Threaded HTTP server standing in for bedrock-runtime."""
+
+    def __init__(
+        self,
+        latency: float = 0.5,
+        latency_per_mb: float = 0.0,
+        token_rate: Optional[float] = None,
+        extraction: Optional[dict] = None,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        throttle_above: Optional[int] = None,
+        outputs: Optional[dict[str, float]] = None,
+        seed: int = 0,
+        host: str = "127.0.0.1",
+        port: int = 0
+    ):
+        self.latency = latency
+        self.latency_per_mb = latency_per_mb
+        self.token_rate = token_rate  # Output tokens per second (None = instant)
+        self.extraction = extraction or FAKE_EXTRACTION
+        self.text = json.dumps(self.extraction)
+        self.jitter = jitter  # Sigma of the lognormal factor on the fixed delay
+        self.error_rate = error_rate
+        self.throttle_above = throttle_above  # Concurrent requests allowed (None = unlimited)
+        self.outputs = outputs or {"json": 1.0}  # Output shape -> weight
+        self.variants = output_variants(self.text)
+
+        self.requests = 0
+        self.bytes_received = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.errors = 0
+        self.throttled = 0
+        self.served = {shape: 0 for shape in self.variants}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "FakeBedrock":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "throttled": self.throttled,
+            "errors": self.errors,
+            "max_in_flight": self.max_in_flight,
+            "served": {shape: count for shape, count in self.served.items() if count},
+        }
+
+    def completion(self, body: bytes, shape: str) -> str:
+        """Completion text for a request: the prompt's fields in the given shape, cut at max_tokens."""
+        try:
+            request = json.loads(body)
+            prompt = next(c["text"] for c in request["messages"][0]["content"] if c["type"] == "text")
+        except (ValueError, KeyError, IndexError, StopIteration):
+            return self.variants[shape]
+
+        fields = {key: value for key, value in self.extraction.items() if f'"{key}"' in prompt}
+        text = output_variants(json.dumps(fields or self.extraction))[shape]
+        return text[:request.get("max_tokens", len(text)) * CHARS_PER_TOKEN]
+
+    def generation_seconds(self, text: str) -> float:
+        """Time to "generate" text at the token rate."""
+        return len(text) / CHARS_PER_TOKEN / self.token_rate if self.token_rate else 0.0
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # Chunked event streams, like the real service
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                size = len(body)
+                with fake._lock:
+                    fake.requests += 1
+                    fake.bytes_received += size
+                    fake.in_flight += 1
+                    fake.max_in_flight = max(fake.max_in_flight, fake.in_flight)
+                    throttle = fake.throttle_above is not None and fake.in_flight > fake.throttle_above
+                    fail = not throttle and fake._random.random() < fake.error_rate
+                    delay = fake.latency * (fake._random.lognormvariate(0, fake.jitter) if fake.jitter else 1)
+                    shape = fake._random.choices(list(fake.outputs), weights=list(fake.outputs.values()))[0]
+                    if throttle:
+                        fake.throttled += 1
+                    elif fail:
+                        fake.errors += 1
+
+                try:
+                    if throttle:
+                        self._error(429, "ThrottlingException", "Too many requests, please wait before trying again.")
+                        return
+                    time.sleep(delay + fake.latency_per_mb * size / (1024 * 1024))
+                    if fail:
+                        self._error(500, "InternalServerException", "The server encountered an internal error.")
+                        return
+
+                    with fake._lock:
+                        fake.served[shape] += 1
+                    text = fake.completion(body, shape)
+                    if self.path.endswith("/invoke-with-response-stream"):
+                        self._stream(text)
+                    else:
+                        time.sleep(fake.generation_seconds(text))
+                        self._respond(text)
+                finally:
+                    with fake._lock:
+                        fake.in_flight -= 1
+
+            def _error(self, status: int, error_type: str, message: str):
+                body = json.dumps({"message": message}).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("x-amzn-ErrorType", error_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _respond(self, text: str):
+                body = json.dumps({
+                    "id": f"msg_fake_{fake.requests}",
+                    "type": "message",
+                    "role": "assistant",
+                    "content": [{"type": "text", "text": text}],
+                    "stop_reason": "end_turn",
+                    "usage": {"input_tokens": 1500, "output_tokens": len(text) // CHARS_PER_TOKEN}
+                }).encode()
+
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _stream(self, text: str):
+                self.send_response(200)
+                self.send_header("Content-Type", "application/vnd.amazon.eventstream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+
+                def send(event: dict):
+                    payload = json.dumps({"bytes": base64.b64encode(json.dumps(event).encode()).decode()})
+                    message = event_stream_message(payload.encode())
+                    self.wfile.write(b"%x\r\n%s\r\n" % (len(message), message))
+                    self.wfile.flush()
+
+                send({"type": "message_start", "message": {
+                    "id": f"msg_fake_{fake.requests}",
+                    "role": "assistant",
+                    "usage": {"input_tokens": 1500, "output_tokens": 1}
+                }})
+                send({"type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""}})
+                step = CHARS_PER_TOKEN * TOKENS_PER_CHUNK
+                for start in range(0, len(text), step):
+                    chunk = text[start:start + step]
+                    send({"type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": chunk}})
+                    time.sleep(fake.generation_seconds(chunk))
+                send({"type": "content_block_stop", "index": 0})
+                send({
+                    "type": "message_delta",
+                    "delta": {"stop_reason": "end_turn"},
+                    "usage": {"output_tokens": len(text) // CHARS_PER_TOKEN}
+                })
+                send({"type": "message_stop"})
+                self.wfile.write(b"0\r\n\r\n")
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
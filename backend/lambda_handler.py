@@ -2,8 +2,35 @@
 AWS Lambda Handler for Spivot Backend
 Uses Mangum to adapt FastAPI to AWS Lambda
 """
+import asyncio
 from mangum import Mangum
 from app.main import app
+from app.core.database import engine
+from app.services.document_queue import document_queue
+
+# Stop claiming uploads with this much of the invocation left (one extraction's worth)
+WORKER_RESERVE_SECONDS = 180
 
 # Create Lambda handler
 handler = Mangum(app, lifespan="off")
+
+
+def document_worker(event, context):
+    """
+    Document queue worker (scheduled, and invoked asynchronously per upload).
+    
+    Fails stale uploads, then extracts pending ones until the queue is
+    empty or the invocation is close to its timeout.
+    """
+    remaining = context.get_remaining_time_in_millis() / 1000 if context else 900
+    result = asyncio.run(_run_worker(max(0.0, remaining - WORKER_RESERVE_SECONDS)))
+    print(f"✅ Document worker: {result}")
+    return result
+
+
+async def _run_worker(max_seconds: float) -> dict:
+    try:
+        return await document_queue.run_worker(max_seconds=max_seconds)
+    finally:
+        # Pooled connections belong to this invocation's event loop
+        await engine.dispose()
@@ -1,7 +1,13 @@
 -- Enable RLS on all tables
 ALTER TABLE users ENABLE ROW LEVEL SECURITY;
 ALTER TABLE inventory ENABLE ROW LEVEL SECURITY;
+ALTER TABLE stock_movements ENABLE ROW LEVEL SECURITY;
 ALTER TABLE transactions ENABLE ROW LEVEL SECURITY;
+ALTER TABLE balance_snapshots ENABLE ROW LEVEL SECURITY;
+ALTER TABLE spivot_scores ENABLE ROW LEVEL SECURITY;
+ALTER TABLE forecast_models ENABLE ROW LEVEL SECURITY;
+ALTER TABLE forecast_records ENABLE ROW LEVEL SECURITY;
+ALTER TABLE forecast_accuracy ENABLE ROW LEVEL SECURITY;
 ALTER TABLE documents ENABLE ROW LEVEL SECURITY;
 ALTER TABLE agent_logs ENABLE ROW LEVEL SECURITY;
 
@@ -14,9 +20,27 @@ CREATE POLICY "Public users access" ON users FOR ALL USING (true);
 -- Inventory
 CREATE POLICY "Public inventory access" ON inventory FOR ALL USING (true);
 
+-- Stock Movements
+CREATE POLICY "Public stock_movements access" ON stock_movements FOR ALL USING (true);
+
 -- Transactions
 CREATE POLICY "Public transactions access" ON transactions FOR ALL USING (true);
 
+-- Balance Snapshots
+CREATE POLICY "Public balance_snapshots access" ON balance_snapshots FOR ALL USING (true);
+
+-- Spivot Scores
+CREATE POLICY "Public spivot_scores access" ON spivot_scores FOR ALL USING (true);
+
+-- Forecast Models
+CREATE POLICY "Public forecast_models access" ON forecast_models FOR ALL USING (true);
+
+-- Forecast Records
+CREATE POLICY "Public forecast_records access" ON forecast_records FOR ALL USING (true);
+
+-- Forecast Accuracy
+CREATE POLICY "Public forecast_accuracy access" ON forecast_accuracy FOR ALL USING (true);
+
 -- Documents
 CREATE POLICY "Public documents access" ON documents FOR ALL USING (true);
 
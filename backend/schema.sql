@@ -25,9 +25,24 @@ CREATE TABLE IF NOT EXISTS inventory (
     reorder_level NUMERIC DEFAULT 0,
     lead_time_days INTEGER DEFAULT 7,
     unit_cost NUMERIC DEFAULT 0,
+    daily_usage NUMERIC,
     last_updated TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
+-- Forecast daily usage (added after the initial schema)
+ALTER TABLE inventory ADD COLUMN IF NOT EXISTS daily_usage NUMERIC;
+
+-- Stock Movements (signed quantity changes; negative = consumed/sold)
+CREATE TABLE IF NOT EXISTS stock_movements (
+    id SERIAL PRIMARY KEY,
+    user_id INTEGER REFERENCES users(id) ON DELETE CASCADE,
+    inventory_id INTEGER REFERENCES inventory(id) ON DELETE CASCADE,
+    day DATE NOT NULL,
+    qty NUMERIC NOT NULL,
+    reason VARCHAR(50) DEFAULT 'sale',
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
 -- Transactions Table
 CREATE TABLE IF NOT EXISTS transactions (
     id SERIAL PRIMARY KEY,
@@ -39,6 +54,62 @@ CREATE TABLE IF NOT EXISTS transactions (
     description TEXT
 );
 
+-- Daily Balance Snapshots (maintained by the API alongside transactions)
+CREATE TABLE IF NOT EXISTS balance_snapshots (
+    user_id INTEGER REFERENCES users(id) ON DELETE CASCADE,
+    day DATE NOT NULL,
+    inflow NUMERIC DEFAULT 0,
+    outflow NUMERIC DEFAULT 0,
+    balance NUMERIC DEFAULT 0,
+    PRIMARY KEY (user_id, day)
+);
+
+-- Spivot Scores (written back by portfolio batch scoring)
+CREATE TABLE IF NOT EXISTS spivot_scores (
+    user_id INTEGER PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+    score INTEGER NOT NULL,
+    cash_consistency NUMERIC DEFAULT 0,
+    revenue_growth NUMERIC DEFAULT 0,
+    vendor_payment_history NUMERIC DEFAULT 0,
+    risk_level VARCHAR(20) NOT NULL,
+    computed_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Forecast Models (fitted Prophet state per user and series)
+CREATE TABLE IF NOT EXISTS forecast_models (
+    user_id INTEGER REFERENCES users(id) ON DELETE CASCADE,
+    series VARCHAR(100) NOT NULL,
+    state JSONB NOT NULL,
+    last_date DATE NOT NULL,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (user_id, series)
+);
+
+-- Forecast Records (production forecasts awaiting their actuals)
+CREATE TABLE IF NOT EXISTS forecast_records (
+    user_id INTEGER REFERENCES users(id) ON DELETE CASCADE,
+    series VARCHAR(100) NOT NULL,
+    target_day DATE NOT NULL,
+    predicted NUMERIC NOT NULL,
+    issued_on DATE NOT NULL,
+    PRIMARY KEY (user_id, series, target_day)
+);
+
+-- Forecast Accuracy (backtest metrics and running live accuracy)
+CREATE TABLE IF NOT EXISTS forecast_accuracy (
+    user_id INTEGER REFERENCES users(id) ON DELETE CASCADE,
+    series VARCHAR(100) NOT NULL,
+    backtest_mape NUMERIC,
+    backtest_wape NUMERIC,
+    backtest_origins INTEGER DEFAULT 0,
+    backtest_fit_ms NUMERIC,
+    backtested_at TIMESTAMP WITH TIME ZONE,
+    live_abs_error NUMERIC DEFAULT 0,
+    live_abs_actual NUMERIC DEFAULT 0,
+    live_count INTEGER DEFAULT 0,
+    PRIMARY KEY (user_id, series)
+);
+
 -- Documents Table
 CREATE TABLE IF NOT EXISTS documents (
     id SERIAL PRIMARY KEY,
@@ -48,10 +119,30 @@ CREATE TABLE IF NOT EXISTS documents (
     document_type VARCHAR(100),
     extracted_json JSONB,
     status VARCHAR(50) DEFAULT 'pending' CHECK (status IN ('pending', 'processing', 'completed', 'failed')),
+    content_hash VARCHAR(64),
+    extraction_version VARCHAR(32),
+    extraction_ms NUMERIC,
+    content BYTEA,
+    content_url TEXT,
+    mime_type VARCHAR(100),
+    extraction_profile VARCHAR(32),
+    claimed_at TIMESTAMP WITH TIME ZONE,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
     processed_at TIMESTAMP WITH TIME ZONE
 );
 
+-- Extraction dedup (added after the initial schema)
+ALTER TABLE documents ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64);
+ALTER TABLE documents ADD COLUMN IF NOT EXISTS extraction_version VARCHAR(32);
+ALTER TABLE documents ADD COLUMN IF NOT EXISTS extraction_ms NUMERIC;
+
+-- Processing queue: pending uploads wait in their row until a worker claims them
+ALTER TABLE documents ADD COLUMN IF NOT EXISTS content BYTEA;
+ALTER TABLE documents ADD COLUMN IF NOT EXISTS content_url TEXT;
+ALTER TABLE documents ADD COLUMN IF NOT EXISTS mime_type VARCHAR(100);
+ALTER TABLE documents ADD COLUMN IF NOT EXISTS extraction_profile VARCHAR(32);
+ALTER TABLE documents ADD COLUMN IF NOT EXISTS claimed_at TIMESTAMP WITH TIME ZONE;
+
 -- Agent Logs Table
 CREATE TABLE IF NOT EXISTS agent_logs (
     id SERIAL PRIMARY KEY,
@@ -70,9 +161,15 @@ ON CONFLICT (id) DO NOTHING;
 
 -- Create indexes for better performance
 CREATE INDEX IF NOT EXISTS idx_inventory_user ON inventory(user_id);
+-- Reorder gap: stock minus daily_usage x (lead time + 3 safety-stock days); must match inventory_reorder_gap()
+CREATE INDEX IF NOT EXISTS idx_inventory_reorder_gap ON inventory
+    (user_id, (qty - coalesce(daily_usage, reorder_level / 10.0) * (lead_time_days + 3)));
+CREATE INDEX IF NOT EXISTS idx_stock_movements_user_day ON stock_movements(user_id, day);
 CREATE INDEX IF NOT EXISTS idx_transactions_user ON transactions(user_id);
 CREATE INDEX IF NOT EXISTS idx_transactions_date ON transactions(date);
 CREATE INDEX IF NOT EXISTS idx_documents_user ON documents(user_id);
+CREATE INDEX IF NOT EXISTS idx_documents_content ON documents(user_id, content_hash, extraction_version);
+CREATE INDEX IF NOT EXISTS idx_documents_status ON documents(status, id);
 CREATE INDEX IF NOT EXISTS idx_agent_logs_timestamp ON agent_logs(timestamp);
 
 -- RLS Policies (Optional - enable if you want row-level security)
@@ -8,6 +8,10 @@ import { DashboardMetrics, CashflowAnalysis, InventoryItem, Transaction, AgentLo
 // Backend API URL for AI agent operations
 const BACKEND_API_URL = process.env.NEXT_PUBLIC_API_URL || ''
 
+// Background document extraction: final statuses, and polling interval when the event stream drops
+const FINAL_DOCUMENT_STATUSES = ['completed', 'failed']
+const DOCUMENT_POLL_MS = 2000
+
 // ============ Database Operations (Supabase Direct) ============
 
 export async function getInventory(userId: number = 1): Promise<InventoryItem[]> {
@@ -163,6 +167,39 @@ export async function uploadDocument(file: File, userId: number = 1) {
   })
   
   if (!res.ok) throw new Error('Failed to upload document')
+  const job = await res.json()
+  if (res.status !== 202) return job  // Same file uploaded before: extraction returned right away
+  
+  // Extraction runs in the background: wait for the final status event, then read the document
+  await new Promise<void>((resolve) => {
+    const events = new EventSource(`${BACKEND_API_URL}${job.events_url}?user_id=${userId}`)
+    events.addEventListener('status', (event) => {
+      const { status } = JSON.parse((event as MessageEvent).data)
+      if (FINAL_DOCUMENT_STATUSES.includes(status)) {
+        events.close()
+        resolve()
+      }
+    })
+    // The stream can be cut while the worker is still extracting (e.g. the API
+    // Gateway timeout): fall back to polling the document
+    events.onerror = () => {
+      events.close()
+      resolve()
+    }
+  })
+  
+  let doc = await getDocument(job.id, userId)
+  while (!FINAL_DOCUMENT_STATUSES.includes(doc.status)) {
+    await new Promise((resolve) => setTimeout(resolve, DOCUMENT_POLL_MS))
+    doc = await getDocument(job.id, userId)
+  }
+  if (doc.status === 'failed') throw new Error('Document processing failed')
+  return { id: doc.id, file_name: doc.file_name, status: doc.status, ...doc.extracted_json }
+}
+
+async function getDocument(id: number, userId: number) {
+  const res = await fetch(`${BACKEND_API_URL}/documents/${id}?user_id=${userId}`)
+  if (!res.ok) throw new Error('Failed to load document')
   return res.json()
 }
 